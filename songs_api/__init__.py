@@ -14,6 +14,7 @@ from songs_api.api.errors import (
     ConflictError,
     InternalServerError,
     NotFoundError,
+    ServiceUnavailableError,
     UnauthorizedError,
     ValidationError,
     json_error,
@@ -21,12 +22,24 @@ from songs_api.api.errors import (
 from songs_api.api.v1 import v1_bp
 from songs_api.constants import HTTPStatusCode, SwaggerConfig
 from songs_api.infrastructure import (
+    RatingQueue,
     configure_logging,
     create_limiter,
     ensure_indexes,
     init_cache,
+    init_catalog,
     init_db,
+    init_idempotency_store,
+    init_leaderboards,
+    init_password_hasher,
+    init_rating_buffer,
+    init_rating_prior,
+    init_rating_shards,
+    init_rating_stats_hub,
+    init_read_routing,
+    init_song_index,
 )
+from songs_api.security.jwt_auth import init_verified_token_cache
 from songs_api.settings import Settings
 
 
@@ -95,6 +108,32 @@ def create_app(settings: Settings | None = None) -> Flask:
 
     init_db(mongo_uri=app_settings.mongo_uri, db_name=app_settings.mongo_db_name)
 
+    init_read_routing(app_settings, cache=cache)
+    init_leaderboards(cache)
+    init_rating_prior(app_settings)
+    init_rating_shards(app_settings)
+    init_idempotency_store(app_settings)
+    init_password_hasher(app_settings)
+    init_verified_token_cache(app_settings)
+    init_rating_stats_hub(app_settings, cache=cache)
+
+    rating_buffer = init_rating_buffer(app_settings, cache=cache)
+    if isinstance(rating_buffer, RatingQueue):
+        logger.info("Ratings are queued in Redis for the rating consumer (make consume-ratings)")
+    elif rating_buffer:
+        logger.info("Ratings are written through the write-behind buffer")
+
+    song_index = init_song_index(app_settings)
+    if song_index:
+        try:
+            song_index.load()
+        except Exception as e:
+            logger.warning(f"Song ID index load failed: {e}. Existence checks will query MongoDB.")
+
+    catalog = init_catalog(app_settings)
+    if catalog.enabled:
+        logger.info("Serving song reads from the in-memory catalog")
+
     @app.before_request
     def log_request():
         logger.info(f"{request.method} {request.path}", extra={"remote_addr": request.remote_addr})
@@ -118,6 +157,7 @@ def create_app(settings: Settings | None = None) -> Flask:
     @app.errorhandler(ConflictError)
     @app.errorhandler(ValidationError)
     @app.errorhandler(InternalServerError)
+    @app.errorhandler(ServiceUnavailableError)
     @app.errorhandler(ApiError)
     def _handle_api_error(err: ApiError):
         logger.error(f"API error: {err.message}", extra={"status_code": err.status_code})
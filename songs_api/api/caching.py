@@ -10,7 +10,10 @@ from songs_api.infrastructure import cache_key, get_cache
 
 
 def cached_response(prefix: str, ttl: int = 300):
-    """Cache route responses using request args and kwargs as cache key."""
+    """Cache route responses using request args and kwargs as cache key.
+
+    Apply it below `@inject(AuthUser, ...)` so every request, cache hits included, is authenticated first.
+    """
 
     def decorator(func: Callable) -> Callable:
         @wraps(func)
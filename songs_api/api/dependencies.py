@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from flask import request
+from flask import g, request
 
 from songs_api.api.errors import UnauthorizedError
 from songs_api.security.jwt_auth import verify_access_token
@@ -14,7 +14,11 @@ class AuthUser:
 
     @classmethod
     def from_request(cls) -> AuthUser:
-        """Extract and validate JWT token from Authorization header."""
+        """Extract and validate JWT token from Authorization header, once per request."""
+        user = g.get("auth_user")
+        if user is not None:
+            return user
+
         auth_header = request.headers.get("Authorization", "").strip()
 
         if not auth_header:
@@ -28,5 +32,5 @@ class AuthUser:
         if not token:
             raise UnauthorizedError(message="Missing token")
 
-        username = verify_access_token(token)
-        return cls(username=username)
+        g.auth_user = user = cls(username=verify_access_token(token))
+        return user
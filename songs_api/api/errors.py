@@ -46,6 +46,11 @@ class InternalServerError(ApiError):
     status_code: int = HTTPStatusCode.INTERNAL_SERVER_ERROR
 
 
+@dataclass(frozen=True)
+class ServiceUnavailableError(ApiError):
+    status_code: int = HTTPStatusCode.SERVICE_UNAVAILABLE
+
+
 def json_error(err: ApiError) -> tuple:
     resp = jsonify({"error": err.message})
     if err.status_code == HTTPStatusCode.UNAUTHORIZED:
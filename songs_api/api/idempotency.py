@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from flask import jsonify, make_response, request
+
+from songs_api.api.dependencies import AuthUser
+from songs_api.api.errors import BadRequestError, ConflictError, ValidationError
+from songs_api.constants import IdempotencyDefaults
+from songs_api.infrastructure import get_idempotency_store
+
+
+def idempotent(prefix: str):
+    """Replay the stored response when a request repeats its `Idempotency-Key` header.
+
+    Keys are scoped to the route and the authenticated user. Only successful responses are
+    stored; if the handler raises, the key is released so the client can retry.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            store = get_idempotency_store()
+            key = request.headers.get(IdempotencyDefaults.HEADER)
+            if store is None or key is None:
+                return func(*args, **kwargs)
+
+            if not key or len(key) > IdempotencyDefaults.MAX_KEY_LENGTH:
+                raise BadRequestError(
+                    message=f"{IdempotencyDefaults.HEADER} must be 1-{IdempotencyDefaults.MAX_KEY_LENGTH} characters"
+                )
+            scoped_key = f"{prefix}:{AuthUser.from_request().username}:{key}"
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+            owner = uuid.uuid4().hex
+
+            earlier = store.reserve(scoped_key, fingerprint, owner)
+            if earlier is not None:
+                if earlier.fingerprint != fingerprint:
+                    raise ValidationError(
+                        message=f"{IdempotencyDefaults.HEADER} was already used for a different request"
+                    )
+                if earlier.pending:
+                    raise ConflictError(
+                        message=f"A request with this {IdempotencyDefaults.HEADER} is still in progress"
+                    )
+                response = jsonify(earlier.body)
+                response.status_code = earlier.status_code
+                response.headers[IdempotencyDefaults.REPLAYED_HEADER] = "true"
+                return response
+
+            try:
+                response = make_response(func(*args, **kwargs))
+            except Exception:
+                store.release(scoped_key, owner)
+                raise
+
+            body = response.get_json(silent=True)
+            if response.status_code < 400 and body is not None:
+                store.complete(scoped_key, owner, response.status_code, body)
+            else:
+                store.release(scoped_key, owner)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -47,6 +47,8 @@ def register_auth_routes(bp: Blueprint) -> None:
             description: Invalid credentials
           422:
             description: Validation error
+          503:
+            description: Password hashing is at capacity, retry shortly
         """
         access_token = auth_service.login(username=data.username, password=data.password)
 
@@ -94,6 +96,8 @@ def register_auth_routes(bp: Blueprint) -> None:
             description: Username already exists
           422:
             description: Validation error
+          503:
+            description: Password hashing is at capacity, retry shortly
         """
         result = auth_service.register(username=data.username, password=data.password)
         response = RegisterResponse(**result)
@@ -1,14 +1,28 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 from songs_api.api.caching import cached_response
 from songs_api.api.dependencies import AuthUser
 from songs_api.api.errors import BadRequestError
+from songs_api.api.idempotency import idempotent
+from songs_api.constants import ExportFormat, RatingStreamDefaults
+from songs_api.repositories import SongListQuery
 from songs_api.schemas import (
     AddRatingRequest,
-    PaginationQueryParams,
+    AddRatingsBatchRequest,
+    DifficultyDistributionQueryParams,
+    ExportQueryParams,
+    ImportQueryParams,
+    RankedSongsQueryParams,
+    RatingAcceptedResponse,
+    RatingStatsManyQueryParams,
     SearchQueryParams,
+    SongsListQueryParams,
+    TopSongsQueryParams,
+    TrendingQueryParams,
 )
 from songs_api.services import RatingsService, SongsService
 from songs_api.utils.dependencies import inject
@@ -17,12 +31,15 @@ from songs_api.utils.validation import validate_query, validate_request
 
 def register_songs_routes(bp: Blueprint) -> None:
     @bp.route("/songs", methods=["GET"])
-    @validate_query(PaginationQueryParams)
-    @cached_response("songs:list", ttl=300)
+    @validate_query(SongsListQueryParams)
     @inject(AuthUser, SongsService)
-    def list_songs(query: PaginationQueryParams, auth: AuthUser, songs_service: SongsService):
+    @cached_response("songs:list", ttl=300)
+    def list_songs(query: SongsListQueryParams, auth: AuthUser, songs_service: SongsService):
         """
-        List songs with pagination
+        List songs with pagination, filters and sorting
+        Only index-backed combinations are accepted: no filters (sort by id), `level` with an
+        optional difficulty range (sort by difficulty), or `artist` with an optional release
+        date range (sort by released).
         ---
         tags:
           - Songs
@@ -39,20 +56,69 @@ def register_songs_routes(bp: Blueprint) -> None:
             type: integer
             default: 20
             description: Number of items per page (max 100)
+          - in: query
+            name: level
+            type: integer
+            required: false
+            description: Filter by level
+          - in: query
+            name: difficulty_min
+            type: number
+            required: false
+            description: Minimum difficulty (requires level)
+          - in: query
+            name: difficulty_max
+            type: number
+            required: false
+            description: Maximum difficulty (requires level)
+          - in: query
+            name: artist
+            type: string
+            required: false
+            description: Filter by exact artist name
+          - in: query
+            name: released_from
+            type: string
+            format: date
+            required: false
+            description: Earliest release date (requires artist)
+          - in: query
+            name: released_to
+            type: string
+            format: date
+            required: false
+            description: Latest release date (requires artist)
+          - in: query
+            name: sort
+            type: string
+            required: false
+            enum: [id, -id, difficulty, -difficulty, released, -released]
+            description: Sort order, must match the filters used
         responses:
           200:
             description: Paginated list of songs
+          400:
+            description: Filter/sort combination is not index-backed
           401:
             description: Unauthorized - missing or invalid JWT token
           422:
             description: Validation error
         """
-        response = songs_service.list_songs(page=query.page, page_size=query.page_size)
+        list_query = SongListQuery(
+            level=query.level,
+            artist=query.artist,
+            difficulty_min=query.difficulty_min,
+            difficulty_max=query.difficulty_max,
+            released_from=query.released_from,
+            released_to=query.released_to,
+            sort=query.sort,
+        )
+        response = songs_service.list_songs(page=query.page, page_size=query.page_size, query=list_query)
         return jsonify(response.model_dump())
 
     @bp.route("/songs/difficulty/average", methods=["GET"])
-    @cached_response("songs:avg_difficulty", ttl=600)
     @inject(AuthUser, SongsService)
+    @cached_response("songs:avg_difficulty", ttl=600)
     def average_difficulty(auth: AuthUser, songs_service: SongsService):
         """
         Get average difficulty of songs, optionally filtered by level
@@ -84,10 +150,127 @@ def register_songs_routes(bp: Blueprint) -> None:
         response = songs_service.get_average_difficulty(level=level)
         return jsonify(response.model_dump())
 
+    @bp.route("/songs/difficulty/distribution", methods=["GET"])
+    @validate_query(DifficultyDistributionQueryParams)
+    @inject(AuthUser, SongsService)
+    @cached_response("songs:difficulty_distribution", ttl=600)
+    def difficulty_distribution(query: DifficultyDistributionQueryParams, auth: AuthUser, songs_service: SongsService):
+        """
+        Get difficulty histograms and p50/p90/p99 percentiles per level
+        All histograms share the same fixed bin edges so levels can be compared directly.
+        ---
+        tags:
+          - Songs
+        security:
+          - Bearer: []
+        parameters:
+          - in: query
+            name: level
+            type: integer
+            required: false
+            description: Restrict to a single level
+          - in: query
+            name: bins
+            type: integer
+            default: 10
+            description: Number of histogram bins (max 50)
+        responses:
+          200:
+            description: Difficulty distribution overall and per level
+          401:
+            description: Unauthorized
+          422:
+            description: Validation error
+        """
+        response = songs_service.get_difficulty_distribution(bins=query.bins, level=query.level)
+        return jsonify(response.model_dump())
+
+    @bp.route("/songs/export", methods=["GET"])
+    @validate_query(ExportQueryParams)
+    @inject(AuthUser, SongsService)
+    def export_songs(query: ExportQueryParams, auth: AuthUser, songs_service: SongsService):
+        """
+        Stream the whole catalog as NDJSON or CSV
+        Rows are read from a single server-side cursor and written as they arrive, so memory
+        use does not grow with the catalog size.
+        ---
+        tags:
+          - Songs
+        security:
+          - Bearer: []
+        produces:
+          - application/x-ndjson
+          - text/csv
+        parameters:
+          - in: query
+            name: format
+            type: string
+            enum: [ndjson, csv]
+            default: ndjson
+            description: Output format
+          - in: query
+            name: include_ratings
+            type: boolean
+            default: false
+            description: Add rating_count/average/lowest/highest columns
+        responses:
+          200:
+            description: Streamed export, one song per line
+          401:
+            description: Unauthorized
+          422:
+            description: Validation error
+        """
+        mimetype = "text/csv" if query.format == ExportFormat.CSV else "application/x-ndjson"
+        chunks = songs_service.export_songs(export_format=query.format, include_ratings=query.include_ratings)
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename=songs.{query.format.value}"},
+        )
+
+    @bp.route("/songs/import", methods=["POST"])
+    @validate_query(ImportQueryParams)
+    @inject(AuthUser, SongsService)
+    def import_songs(query: ImportQueryParams, auth: AuthUser, songs_service: SongsService):
+        """
+        Bulk import songs from a streamed NDJSON body
+        Rows are validated as they are read and inserted in unordered batches; invalid or
+        rejected rows are reported by line number without aborting the rest of the import.
+        ---
+        tags:
+          - Songs
+        security:
+          - Bearer: []
+        consumes:
+          - application/x-ndjson
+        parameters:
+          - in: query
+            name: batch_size
+            type: integer
+            default: 1000
+            description: Rows per insert batch (max 10000)
+          - in: body
+            name: body
+            required: true
+            description: One song per line, e.g. {"artist", "title", "difficulty", "level", "released"}
+            schema:
+              type: string
+        responses:
+          200:
+            description: Import summary with inserted/failed counts and per-row errors
+          401:
+            description: Unauthorized
+          422:
+            description: Validation error
+        """
+        response = songs_service.import_songs(request.stream, batch_size=query.batch_size)
+        return jsonify(response.model_dump())
+
     @bp.route("/songs/search", methods=["GET"])
     @validate_query(SearchQueryParams)
-    @cached_response("songs:search", ttl=600)
     @inject(AuthUser, SongsService)
+    @cached_response("songs:search", ttl=600)
     def search_songs(query: SearchQueryParams, auth: AuthUser, songs_service: SongsService):
         """
         Search songs by artist or title
@@ -129,6 +312,7 @@ def register_songs_routes(bp: Blueprint) -> None:
 
     @bp.route("/songs/ratings", methods=["POST"])
     @validate_request(AddRatingRequest)
+    @idempotent("ratings:add")
     @inject(AuthUser, RatingsService)
     def add_rating(data: AddRatingRequest, auth: AuthUser, ratings_service: RatingsService):
         """
@@ -139,6 +323,11 @@ def register_songs_routes(bp: Blueprint) -> None:
         security:
           - Bearer: []
         parameters:
+          - in: header
+            name: Idempotency-Key
+            type: string
+            required: false
+            description: Retries with the same key replay the original response instead of adding the rating again
           - in: body
             name: body
             required: true
@@ -155,21 +344,283 @@ def register_songs_routes(bp: Blueprint) -> None:
         responses:
           201:
             description: Rating added successfully
+          202:
+            description: Rating queued by the write-behind buffer (RATINGS_WRITE_MODE=write_behind)
           400:
-            description: Invalid request body
+            description: Invalid request body or Idempotency-Key
           401:
             description: Unauthorized
           404:
             description: Song not found
+          409:
+            description: A request with the same Idempotency-Key is still in progress
+          422:
+            description: Validation error, or Idempotency-Key reused with a different body
+          503:
+            description: Write-behind buffer is full, retry later
+        """
+        response = ratings_service.add_rating(song_id=data.song_id, rating=data.rating, username=auth.username)
+        status = 202 if isinstance(response, RatingAcceptedResponse) else 201
+        return jsonify(response.model_dump()), status
+
+    @bp.route("/songs/ratings/batch", methods=["POST"])
+    @validate_request(AddRatingsBatchRequest)
+    @idempotent("ratings:batch")
+    @inject(AuthUser, RatingsService)
+    def add_ratings_batch(data: AddRatingsBatchRequest, auth: AuthUser, ratings_service: RatingsService):
+        """
+        Add several ratings in one request
+        Song existence is checked with one query and all ratings are written together (in a
+        transaction when the deployment supports it). Each item gets its own result.
+        ---
+        tags:
+          - Ratings
+        security:
+          - Bearer: []
+        parameters:
+          - in: header
+            name: Idempotency-Key
+            type: string
+            required: false
+            description: Retries with the same key replay the original response instead of adding the ratings again
+          - in: body
+            name: body
+            required: true
+            schema:
+              type: object
+              properties:
+                ratings:
+                  type: array
+                  maxItems: 500
+                  items:
+                    type: object
+                    properties:
+                      song_id:
+                        type: string
+                      rating:
+                        type: integer
+                        minimum: 1
+                        maximum: 5
+        responses:
+          200:
+            description: Per-item results (created, queued or not_found) with updated stats
+          400:
+            description: Invalid request body or Idempotency-Key
+          401:
+            description: Unauthorized
+          409:
+            description: A request with the same Idempotency-Key is still in progress
+          422:
+            description: Validation error, or Idempotency-Key reused with a different body
+          503:
+            description: Write-behind buffer is full, retry later
+        """
+        response = ratings_service.add_ratings(data.ratings, username=auth.username)
+        return jsonify(response.model_dump())
+
+    @bp.route("/songs/ratings/stats", methods=["GET"])
+    @validate_query(RatingStatsManyQueryParams)
+    @inject(AuthUser, RatingsService)
+    def get_rating_stats_many(query: RatingStatsManyQueryParams, auth: AuthUser, ratings_service: RatingsService):
+        """
+        Get rating statistics for several songs
+        One request per page of songs instead of one per row. Entries cached by the
+        single-song endpoint are reused; the rest are read with one query.
+        ---
+        tags:
+          - Ratings
+        security:
+          - Bearer: []
+        parameters:
+          - in: query
+            name: ids
+            type: string
+            required: true
+            description: Comma-separated song IDs (max 100)
+        responses:
+          200:
+            description: Rating statistics keyed by song ID, plus IDs that do not exist
+          401:
+            description: Unauthorized
           422:
             description: Validation error
         """
-        response = ratings_service.add_rating(song_id=data.song_id, rating=data.rating)
-        return jsonify(response.model_dump()), 201
+        response = ratings_service.get_rating_stats_many(song_ids=query.ids, username=auth.username)
+        return jsonify(response.model_dump())
+
+    @bp.route("/songs/top", methods=["GET"])
+    @validate_query(TopSongsQueryParams)
+    @inject(AuthUser, RatingsService)
+    def top_songs(query: TopSongsQueryParams, auth: AuthUser, ratings_service: RatingsService):
+        """
+        Get the top-rated or most-rated songs
+        Served from Redis sorted sets kept up to date on every rating, with an indexed
+        MongoDB query as the fallback when Redis is unavailable.
+        ---
+        tags:
+          - Ratings
+        security:
+          - Bearer: []
+        parameters:
+          - in: query
+            name: by
+            type: string
+            enum: [average, count]
+            default: average
+            description: Rank by average rating or by number of ratings
+          - in: query
+            name: level
+            type: integer
+            required: false
+            description: Restrict to a single level
+          - in: query
+            name: limit
+            type: integer
+            default: 10
+            description: Number of songs to return (max 100)
+        responses:
+          200:
+            description: Songs ranked best first
+          401:
+            description: Unauthorized
+          422:
+            description: Validation error
+        """
+        response = ratings_service.get_top_songs(by=query.by, level=query.level, limit=query.limit)
+        return jsonify(response.model_dump())
+
+    @bp.route("/songs/ranked", methods=["GET"])
+    @validate_query(RankedSongsQueryParams)
+    @inject(AuthUser, RatingsService)
+    @cached_response("ratings:ranked", ttl=60)
+    def ranked_songs(query: RankedSongsQueryParams, auth: AuthUser, ratings_service: RatingsService):
+        """
+        Browse rated songs by Bayesian score
+        Each song's average is blended with the catalog-wide mean, weighted by
+        RATING_PRIOR_WEIGHT, so a handful of perfect ratings cannot outrank a song
+        with thousands of slightly lower ones.
+        ---
+        tags:
+          - Ratings
+        security:
+          - Bearer: []
+        parameters:
+          - in: query
+            name: level
+            type: integer
+            required: false
+            description: Restrict to a single level
+          - in: query
+            name: page
+            type: integer
+            default: 1
+          - in: query
+            name: page_size
+            type: integer
+            default: 20
+            description: Items per page (max 100)
+        responses:
+          200:
+            description: Songs ranked by Bayesian score, best first
+          401:
+            description: Unauthorized
+          422:
+            description: Validation error
+        """
+        response = ratings_service.get_ranked_songs(level=query.level, page=query.page, page_size=query.page_size)
+        return jsonify(response.model_dump())
+
+    @bp.route("/songs/trending", methods=["GET"])
+    @validate_query(TrendingQueryParams)
+    @inject(AuthUser, RatingsService)
+    @cached_response("ratings:trending", ttl=60)
+    def trending_songs(query: TrendingQueryParams, auth: AuthUser, ratings_service: RatingsService):
+        """
+        Get the songs rated most in the last hour or day
+        Ranked from per-song hourly and daily rollups: the current bucket plus the part of
+        the previous bucket still inside the window.
+        ---
+        tags:
+          - Ratings
+        security:
+          - Bearer: []
+        parameters:
+          - in: query
+            name: window
+            type: string
+            enum: [hour, day]
+            default: hour
+          - in: query
+            name: limit
+            type: integer
+            default: 10
+            description: Number of songs to return (max 100)
+        responses:
+          200:
+            description: Trending songs, most ratings first
+          401:
+            description: Unauthorized
+          422:
+            description: Validation error
+        """
+        response = ratings_service.get_trending_songs(window=query.window, limit=query.limit)
+        return jsonify(response.model_dump())
+
+    @bp.route("/songs/<song_id>/ratings/stream", methods=["GET"])
+    @inject(AuthUser, RatingsService)
+    def stream_rating_stats(auth: AuthUser, ratings_service: RatingsService, song_id: str):
+        """
+        Live rating statistics for a song (Server-Sent Events)
+        Sends a `stats` event with the current statistics, then another whenever a rating
+        changes them, at most once per RATING_STREAM_MIN_INTERVAL_SECONDS. Idle streams get a
+        keep-alive comment; streams end after RATING_STREAM_MAX_SECONDS and EventSource
+        clients reconnect. Best served by the gevent instance (make run-streams), whose workers
+        hold up to RATING_STREAM_MAX_CONNECTIONS streams each; threaded workers hold far fewer.
+        ---
+        tags:
+          - Ratings
+        security:
+          - Bearer: []
+        produces:
+          - text/event-stream
+        parameters:
+          - in: path
+            name: song_id
+            type: string
+            required: true
+            description: MongoDB ObjectId of the song
+        responses:
+          200:
+            description: Event stream of rating statistics
+          401:
+            description: Unauthorized
+          404:
+            description: Song not found
+          503:
+            description: Live rating stats are disabled, or this worker's stream limit is reached
+        """
+        events = ratings_service.stream_rating_stats(song_id=song_id, username=auth.username)
+
+        def chunks():
+            yield f"retry: {RatingStreamDefaults.RETRY_MS}\n\n"
+            for stats in events:
+                if stats is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"event: stats\ndata: {json.dumps(stats.model_dump())}\n\n"
+
+        response = Response(
+            stream_with_context(chunks()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        # Frees this worker's stream slot however the connection ends.
+        response.call_on_close(events.close)
+        return response
 
     @bp.route("/songs/<song_id>/ratings", methods=["GET"])
-    @cached_response("ratings:stats", ttl=300)
     @inject(AuthUser, RatingsService)
+    @cached_response("ratings:stats", ttl=300)
     def get_rating_stats(auth: AuthUser, ratings_service: RatingsService, song_id: str):
         """
         Get rating statistics for a song
@@ -192,5 +643,5 @@ def register_songs_routes(bp: Blueprint) -> None:
           404:
             description: Song not found
         """
-        response = ratings_service.get_rating_stats(song_id=song_id)
+        response = ratings_service.get_rating_stats(song_id=song_id, username=auth.username)
         return jsonify(response.model_dump())
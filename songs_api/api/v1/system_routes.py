@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 from flask import Blueprint, jsonify
+from loguru import logger
+
+from songs_api.api.errors import ServiceUnavailableError
+from songs_api.infrastructure import get_password_hasher, get_rating_buffer
 
 
 def register_system_routes(bp: Blueprint) -> None:
@@ -22,3 +26,61 @@ def register_system_routes(bp: Blueprint) -> None:
                   example: healthy
         """
         return jsonify({"status": "healthy"})
+
+    @bp.route("/metrics", methods=["GET"])
+    def metrics():
+        """
+        Rating write path and password hashing metrics
+        With RATINGS_WRITE_MODE=queue, `ratings` has the Redis Stream backlog: entries in the
+        stream, delivered but unacknowledged (`pending`) and not yet delivered (`lag`). With
+        write_behind, it has this worker's buffered ratings, consecutive failed flushes and
+        ratings dropped after repeated failures. Null in sync mode.
+        `password_hashing` has this worker's hashing queue depth, rejections and latency.
+        ---
+        tags:
+          - System
+        responses:
+          200:
+            description: Write path metrics
+            schema:
+              type: object
+              properties:
+                ratings:
+                  type: object
+                  properties:
+                    length:
+                      type: integer
+                    pending:
+                      type: integer
+                    lag:
+                      type: integer
+                    failed_flushes:
+                      type: integer
+                    dropped:
+                      type: integer
+                password_hashing:
+                  type: object
+                  properties:
+                    pending:
+                      type: integer
+                    capacity:
+                      type: integer
+                    completed:
+                      type: integer
+                    rejected:
+                      type: integer
+                    latency_ms_avg:
+                      type: number
+                    latency_ms_max:
+                      type: number
+          503:
+            description: The rating queue could not be reached
+        """
+        buffer = get_rating_buffer()
+        try:
+            ratings = buffer.metrics() if buffer else None
+        except Exception as e:
+            logger.warning(f"Rating queue metrics failed: {e}")
+            raise ServiceUnavailableError(message="Rating queue is unavailable") from e
+        hasher = get_password_hasher()
+        return jsonify({"ratings": ratings, "password_hashing": hasher.metrics() if hasher else None})
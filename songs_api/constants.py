@@ -25,12 +25,122 @@ class RatingRange:
     MAX = 5
 
 
+class RatingBatchDefaults:
+    MAX_ITEMS = 500
+    MAX_STATS_IDS = 100
+
+
+class RatingStreamDefaults:
+    # EventSource reconnect delay sent to clients when a stream ends.
+    RETRY_MS = 2000
+
+
+class IdempotencyDefaults:
+    HEADER = "Idempotency-Key"
+    REPLAYED_HEADER = "Idempotent-Replayed"
+    MAX_KEY_LENGTH = 255
+
+
+class RatingBatchStatus(str, Enum):
+    CREATED = "created"
+    QUEUED = "queued"
+    NOT_FOUND = "not_found"
+
+
+class LeaderboardBy(str, Enum):
+    AVERAGE = "average"
+    COUNT = "count"
+
+
+class LeaderboardDefaults:
+    LIMIT = 10
+    MAX_LIMIT = 100
+
+
+class TrendingWindow(str, Enum):
+    """Rollup bucket size; `/songs/trending?window=` ranks songs by ratings in the last such period."""
+
+    HOUR = "hour"
+    DAY = "day"
+
+
+class TrendingDefaults:
+    LIMIT = 10
+    MAX_LIMIT = 100
+    # Rollup buckets older than this are removed by the TTL index.
+    HOUR_RETENTION_HOURS = 48
+    DAY_RETENTION_DAYS = 30
+
+
 class PaginationDefaults:
     PAGE = 1
     PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
 
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ExportDefaults:
+    BATCH_SIZE = 2000
+
+
+class ImportDefaults:
+    BATCH_SIZE = 1000
+    MAX_BATCH_SIZE = 10000
+    MAX_REPORTED_ERRORS = 100
+
+
+class DistributionDefaults:
+    BINS = 10
+    MAX_BINS = 50
+    PERCENTILES = (50, 90, 99)
+
+
+class SongSort(str, Enum):
+    """Sort orders accepted by the songs list; a leading `-` sorts descending."""
+
+    ID = "id"
+    ID_DESC = "-id"
+    DIFFICULTY = "difficulty"
+    DIFFICULTY_DESC = "-difficulty"
+    RELEASED = "released"
+    RELEASED_DESC = "-released"
+
+
+class RatingsWriteMode(str, Enum):
+    """How `POST /songs/ratings` persists a rating."""
+
+    SYNC = "sync"
+    WRITE_BEHIND = "write_behind"
+    # Appended to a Redis Stream; `songs_api.scripts.consume_ratings` writes them to MongoDB.
+    QUEUE = "queue"
+
+
+class SongsBackend(str, Enum):
+    """Where `SongsService` reads the songs catalog from."""
+
+    MONGO = "mongo"
+    CATALOG = "catalog"
+
+
+class ReadPreferenceMode(str, Enum):
+    PRIMARY = "primary"
+    PRIMARY_PREFERRED = "primaryPreferred"
+    SECONDARY = "secondary"
+    SECONDARY_PREFERRED = "secondaryPreferred"
+    NEAREST = "nearest"
+
+
+class ReadRoute(str, Enum):
+    """Groups of repository reads that share a configurable read preference."""
+
+    CATALOG = "catalog"
+    STATS = "stats"
+
+
 class SwaggerConfig:
     ENDPOINT = "apispec"
     ROUTE = "/apispec.json"
@@ -51,3 +161,4 @@ class HTTPStatusCode(int, Enum):
     CONFLICT = 409
     UNPROCESSABLE_ENTITY = 422
     INTERNAL_SERVER_ERROR = 500
+    SERVICE_UNAVAILABLE = 503
@@ -2,11 +2,49 @@
 
 from __future__ import annotations
 
-from songs_api.infrastructure.cache import Cache, cache_key, cached, get_cache, init_cache
+from songs_api.infrastructure.cache import Cache, cache_key, cached, get_cache, init_cache, rating_stats_cache_key
+from songs_api.infrastructure.catalog import CatalogSnapshot, SongCatalog, get_catalog, init_catalog
 from songs_api.infrastructure.database import close_db, ensure_indexes, init_db
+from songs_api.infrastructure.idempotency import (
+    IdempotencyStore,
+    IdempotentResponse,
+    get_idempotency_store,
+    init_idempotency_store,
+)
+from songs_api.infrastructure.leaderboards import Leaderboards, get_leaderboards, init_leaderboards
 from songs_api.infrastructure.logging_config import configure_logging
+from songs_api.infrastructure.password_hasher import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    get_password_hasher,
+    init_password_hasher,
+)
 from songs_api.infrastructure.rate_limiter import create_limiter
+from songs_api.infrastructure.rating_buffer import (
+    RatingBuffer,
+    RatingBufferFullError,
+    get_rating_buffer,
+    init_rating_buffer,
+)
+from songs_api.infrastructure.rating_events import (
+    RatingStatsHub,
+    RatingStatsSubscription,
+    RatingStreamLimitError,
+    get_rating_stats_hub,
+    init_rating_stats_hub,
+)
+from songs_api.infrastructure.rating_prior import RatingPrior, get_rating_prior, init_rating_prior
+from songs_api.infrastructure.rating_queue import QueuedRating, RatingQueue, create_rating_queue
+from songs_api.infrastructure.rating_shards import RatingShards, get_rating_shards, init_rating_shards
+from songs_api.infrastructure.read_routing import (
+    CausalToken,
+    ReadRouter,
+    get_causal_tokens,
+    get_read_router,
+    init_read_routing,
+)
 from songs_api.infrastructure.resources import SystemResources
+from songs_api.infrastructure.song_index import SongIdIndex, get_song_index, init_song_index
 from songs_api.infrastructure.uow import UnitOfWork
 
 __all__ = [
@@ -15,11 +53,53 @@ __all__ = [
     "cached",
     "get_cache",
     "init_cache",
+    "rating_stats_cache_key",
+    "CatalogSnapshot",
+    "SongCatalog",
+    "get_catalog",
+    "init_catalog",
     "close_db",
     "ensure_indexes",
     "init_db",
+    "IdempotencyStore",
+    "IdempotentResponse",
+    "get_idempotency_store",
+    "init_idempotency_store",
+    "Leaderboards",
+    "get_leaderboards",
+    "init_leaderboards",
     "configure_logging",
     "create_limiter",
+    "PasswordHasher",
+    "PasswordHasherBusyError",
+    "get_password_hasher",
+    "init_password_hasher",
+    "RatingBuffer",
+    "RatingBufferFullError",
+    "get_rating_buffer",
+    "init_rating_buffer",
+    "RatingStatsHub",
+    "RatingStatsSubscription",
+    "RatingStreamLimitError",
+    "get_rating_stats_hub",
+    "init_rating_stats_hub",
+    "RatingPrior",
+    "get_rating_prior",
+    "init_rating_prior",
+    "QueuedRating",
+    "RatingQueue",
+    "create_rating_queue",
+    "RatingShards",
+    "get_rating_shards",
+    "init_rating_shards",
+    "CausalToken",
+    "ReadRouter",
+    "get_causal_tokens",
+    "get_read_router",
+    "init_read_routing",
     "SystemResources",
+    "SongIdIndex",
+    "get_song_index",
+    "init_song_index",
     "UnitOfWork",
 ]
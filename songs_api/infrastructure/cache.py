@@ -77,6 +77,35 @@ class Cache:
             logger.warning(f"Cache set failed for key {key}: {e}")
             return False
 
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Fetch several keys with one MGET; misses are left out of the result."""
+        if not self.enabled or not self.redis_client or not keys:
+            return {}
+
+        try:
+            values = self.redis_client.mget(keys)
+            return {key: json.loads(value) for key, value in zip(keys, values, strict=True) if value}
+        except Exception as e:
+            logger.warning(f"Cache get_many failed for {len(keys)} keys: {e}")
+            return {}
+
+    def set_many(self, items: dict[str, Any], ttl: int = 300) -> bool:
+        """Cache several JSON-serialisable values with one pipelined round trip."""
+        if not self.enabled or not self.redis_client or not items:
+            return False
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                if hasattr(value, "model_dump"):
+                    value = value.model_dump()
+                pipe.setex(key, ttl, json.dumps(value))
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Cache set_many failed for {len(items)} keys: {e}")
+            return False
+
     def delete(self, key: str) -> bool:
         if not self.enabled or not self.redis_client:
             return False
@@ -130,6 +159,11 @@ def cache_key(*args: Any, prefix: str = "") -> str:
     return key_string
 
 
+def rating_stats_cache_key(song_id: str) -> str:
+    """Key under which `cached_response` stores the `get_rating_stats` route response for a song."""
+    return cache_key("get_rating_stats", f"song_id={song_id}", prefix="ratings:stats")
+
+
 def cached(ttl: int = 300, key_prefix: str = "") -> Callable[[F], F]:
     """Cache function results using function name, args, and kwargs as key."""
 
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from loguru import logger
+
+from songs_api.constants import SongsBackend
+from songs_api.models.documents import CatalogVersion, Song
+from songs_api.repositories.songs_repository import (
+    CATALOG_VERSION_ID,
+    SongListQuery,
+    SongsRepository,
+    UnsupportedQueryError,
+)
+
+if TYPE_CHECKING:
+    from songs_api.settings import Settings
+
+_LOAD_BATCH_SIZE = 5000
+_LOAD_PROJECTION = {"artist": 1, "title": 1, "difficulty": 1, "level": 1, "released": 1}
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable columnar copy of the songs collection, rows in `_id` order.
+
+    Artist and title are interned: `artists`/`titles` hold the sorted unique values and the
+    `*_codes` arrays index into them, so string predicates run once per distinct value.
+    Exposes the same read methods as `SongsRepository`.
+    """
+
+    ids: np.ndarray
+    difficulty: np.ndarray
+    level: np.ndarray
+    released: np.ndarray
+    artist_codes: np.ndarray
+    title_codes: np.ndarray
+    artists: np.ndarray
+    titles: np.ndarray
+    artists_lower: np.ndarray
+    titles_lower: np.ndarray
+    version: tuple[int, str | None, int]
+    loaded_at: float
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def list_songs(self, skip: int, limit: int, query: SongListQuery | None = None) -> tuple[list[Song], int]:
+        query = query or SongListQuery()
+        plan = SongsRepository.plan_list_query(query)
+        if plan is None:
+            raise UnsupportedQueryError(f"Unsupported filter/sort combination: {sorted(query.filter_fields)}")
+        order_by, _ = plan
+
+        # Rows are in `_id` order, so a stable sort (reversed for descending) keeps the `id` tie-break.
+        rows = np.flatnonzero(self._list_mask(query))
+        sort_field = order_by[0].lstrip("-")
+        if sort_field != "id":
+            keys = self.difficulty[rows] if sort_field == "difficulty" else self.released[rows]
+            rows = rows[np.argsort(keys, kind="stable")]
+        if order_by[0].startswith("-"):
+            rows = rows[::-1]
+
+        return [self._song(i) for i in rows[skip : skip + limit]], len(rows)
+
+    def search_songs(self, query: str, skip: int, limit: int) -> tuple[list[Song], int]:
+        needle = query.lower()
+        artist_hits = np.char.find(self.artists_lower, needle) >= 0
+        title_hits = np.char.find(self.titles_lower, needle) >= 0
+        rows = np.flatnonzero(artist_hits[self.artist_codes] | title_hits[self.title_codes])
+        return [self._song(i) for i in rows[skip : skip + limit]], len(rows)
+
+    def get_average_difficulty(self, level: int | None = None) -> float | None:
+        values = self.difficulty if level is None else self.difficulty[self.level == level]
+        return float(values.mean()) if values.size else None
+
+    def get_difficulty_columns(self, level: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        if level is None:
+            return self.level, self.difficulty
+        mask = self.level == level
+        return self.level[mask], self.difficulty[mask]
+
+    def _list_mask(self, query: SongListQuery) -> np.ndarray:
+        mask = np.ones(len(self.ids), dtype=bool)
+        if query.level is not None:
+            mask &= self.level == query.level
+        if query.artist is not None:
+            code = int(np.searchsorted(self.artists, query.artist))
+            if code == len(self.artists) or self.artists[code] != query.artist:
+                return np.zeros(len(self.ids), dtype=bool)
+            mask &= self.artist_codes == code
+        if query.difficulty_min is not None:
+            mask &= self.difficulty >= query.difficulty_min
+        if query.difficulty_max is not None:
+            mask &= self.difficulty <= query.difficulty_max
+        if query.released_from is not None:
+            mask &= self.released >= np.datetime64(query.released_from, "D")
+        if query.released_to is not None:
+            mask &= self.released <= np.datetime64(query.released_to, "D")
+        return mask
+
+    def _song(self, i: int) -> Song:
+        return Song(
+            id=self.ids[i],
+            artist=str(self.artists[self.artist_codes[i]]),
+            title=str(self.titles[self.title_codes[i]]),
+            difficulty=float(self.difficulty[i]),
+            level=int(self.level[i]),
+            released=self.released[i].item(),
+        )
+
+
+class SongCatalog:
+    """Per-process in-memory songs catalog, refreshed from MongoDB when it changes.
+
+    At most once per `catalog_refresh_seconds` a read compares the collection version
+    (document count, newest `_id` and the counter bumped by in-place updates) with the
+    loaded snapshot and reloads on mismatch; snapshots older than `catalog_max_age_seconds`
+    are reloaded unconditionally, which also catches edits made outside the application.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.enabled = settings.songs_backend == SongsBackend.CATALOG
+        self.refresh_seconds = settings.catalog_refresh_seconds
+        self.max_age_seconds = settings.catalog_max_age_seconds
+        self._snapshot: CatalogSnapshot | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> CatalogSnapshot | None:
+        """Return the current snapshot, reloading if stale. None when disabled or never loaded."""
+        if not self.enabled:
+            return None
+
+        if self._snapshot is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return self._snapshot
+
+        with self._lock:
+            now = time.monotonic()
+            current = self._snapshot
+            if current is not None and now - self._checked_at < self.refresh_seconds:
+                return current
+            try:
+                version = self._read_version()
+                if current is None or current.version != version or now - current.loaded_at >= self.max_age_seconds:
+                    self._snapshot = self._load(version)
+                    logger.info(f"Song catalog loaded with {len(self._snapshot)} songs")
+            except Exception as e:
+                logger.warning(f"Song catalog refresh failed: {e}. Serving previous snapshot.")
+            self._checked_at = now
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force a version check on the next read, e.g. after this process wrote songs."""
+        self._checked_at = 0.0
+
+    @staticmethod
+    def _read_version() -> tuple[int, str | None, int]:
+        collection = Song._get_collection()
+        newest = collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        updates = CatalogVersion._get_collection().find_one({"_id": CATALOG_VERSION_ID})
+        return (
+            collection.estimated_document_count(),
+            str(newest["_id"]) if newest else None,
+            updates["version"] if updates else 0,
+        )
+
+    @staticmethod
+    def _load(version: tuple[int, str | None, int]) -> CatalogSnapshot:
+        ids, artists, titles, difficulty, level, released = [], [], [], [], [], []
+        cursor = Song._get_collection().find({}, _LOAD_PROJECTION).sort("_id", 1).batch_size(_LOAD_BATCH_SIZE)
+        for doc in cursor:
+            ids.append(doc["_id"])
+            artists.append(doc["artist"])
+            titles.append(doc["title"])
+            difficulty.append(doc["difficulty"])
+            level.append(doc["level"])
+            released.append(doc["released"])
+
+        artist_table, artist_codes = np.unique(np.array(artists, dtype=str), return_inverse=True)
+        title_table, title_codes = np.unique(np.array(titles, dtype=str), return_inverse=True)
+
+        return CatalogSnapshot(
+            ids=np.array(ids, dtype=object),
+            difficulty=np.array(difficulty, dtype=np.float64),
+            level=np.array(level, dtype=np.int64),
+            released=np.array(released, dtype="datetime64[D]"),
+            artist_codes=artist_codes,
+            title_codes=title_codes,
+            artists=artist_table,
+            titles=title_table,
+            artists_lower=np.char.lower(artist_table),
+            titles_lower=np.char.lower(title_table),
+            version=version,
+            loaded_at=time.monotonic(),
+        )
+
+
+_catalog_instance: SongCatalog | None = None
+
+
+def init_catalog(settings: Settings) -> SongCatalog:
+    global _catalog_instance
+    _catalog_instance = SongCatalog(settings)
+    return _catalog_instance
+
+
+def get_catalog() -> SongCatalog | None:
+    return _catalog_instance
@@ -1,7 +1,96 @@
 from __future__ import annotations
 
+import os
+import threading
+
 from mongoengine import connect, disconnect
 from mongoengine.connection import get_connection
+from pymongo import MongoClient
+from pymongo.monitoring import TopologyDescriptionChangedEvent, TopologyListener
+from pymongo.server_type import SERVER_TYPE
+from pymongo.topology_description import TOPOLOGY_TYPE
+
+_TRANSACTIONAL_TOPOLOGIES = (TOPOLOGY_TYPE.ReplicaSetWithPrimary, TOPOLOGY_TYPE.Sharded, TOPOLOGY_TYPE.LoadBalanced)
+_TRANSACTIONAL_SERVERS = (SERVER_TYPE.RSPrimary, SERVER_TYPE.Mongos)
+
+
+class TransactionSupport(TopologyListener):
+    """Per-process answer to "can this deployment run multi-document transactions?".
+
+    Fed by PyMongo's SDAM topology events, so it follows a standalone being converted to a
+    replica set (or a primary being lost) without a round trip per unit of work. While the
+    topology is still being discovered the answer comes from one `hello`, then is cached.
+    """
+
+    def __init__(self) -> None:
+        self._supported: bool | None = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def supported(self, client: MongoClient) -> bool:
+        if self._pid != os.getpid():
+            # Forked worker: the parent's answer may predate this process's own client.
+            self._pid, self._supported = os.getpid(), None
+        supported = self._supported
+        if supported is None:
+            with self._lock:
+                if self._supported is None:
+                    self._supported = self._probe(client)
+                supported = self._supported
+        return supported
+
+    def opened(self, event) -> None:
+        pass
+
+    def closed(self, event) -> None:
+        pass
+
+    def description_changed(self, event: TopologyDescriptionChangedEvent) -> None:
+        description = event.new_description
+        if description.topology_type in _TRANSACTIONAL_TOPOLOGIES:
+            self._supported = description.logical_session_timeout_minutes is not None
+        elif description.topology_type == TOPOLOGY_TYPE.Single:
+            # A direct connection is Single whatever it reaches, so decide from the server itself.
+            servers = list(description.server_descriptions().values())
+            server = servers[0] if servers else None
+            if server is None or server.server_type == SERVER_TYPE.Unknown:
+                self._supported = None
+            else:
+                self._supported = (
+                    server.server_type in _TRANSACTIONAL_SERVERS and server.logical_session_timeout_minutes is not None
+                )
+        else:
+            # Unknown or no primary: ask again on the next transactional unit of work.
+            self._supported = None
+
+    @staticmethod
+    def _probe(client: MongoClient) -> bool:
+        """
+        Return True if the connected MongoDB deployment supports multi-document transactions.
+
+        Transactions require:
+        - replica set member (including single-node replica set) OR mongos (sharded cluster)
+        - logical sessions enabled
+        """
+        try:
+            try:
+                hello = client.admin.command("hello")
+            except Exception:
+                # Older servers/drivers may use isMaster
+                hello = client.admin.command("ismaster")
+            is_replset_or_mongos = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+            has_sessions = hello.get("logicalSessionTimeoutMinutes") is not None
+
+            return is_replset_or_mongos and has_sessions
+        except Exception:
+            return False
+
+
+_transaction_support = TransactionSupport()
+
+
+def transactions_supported(client: MongoClient) -> bool:
+    return _transaction_support.supported(client)
 
 
 def init_db(mongo_uri: str, db_name: str) -> None:
@@ -22,6 +111,7 @@ def init_db(mongo_uri: str, db_name: str) -> None:
             retryReads=True,
             maxIdleTimeMS=60000,
             waitQueueTimeoutMS=10000,
+            event_listeners=[_transaction_support],
         )
 
 
@@ -31,9 +121,22 @@ def close_db() -> None:
 
 def ensure_indexes() -> None:
     """Create database indexes for all document models."""
-    from songs_api.models.documents import Rating, RatingStats, Song, User
+    from songs_api.models.documents import (
+        IdempotencyKey,
+        Rating,
+        RatingArchive,
+        RatingRollup,
+        RatingStats,
+        RatingStatsShard,
+        Song,
+        User,
+    )
 
     Song.ensure_indexes()
     Rating.ensure_indexes()
     RatingStats.ensure_indexes()
+    RatingStatsShard.ensure_indexes()
+    RatingRollup.ensure_indexes()
+    RatingArchive.ensure_indexes()
     User.ensure_indexes()
+    IdempotencyKey.ensure_indexes()
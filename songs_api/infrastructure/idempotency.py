@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from songs_api.models.documents import IdempotencyKey
+
+if TYPE_CHECKING:
+    from songs_api.settings import Settings
+
+
+@dataclass
+class IdempotentResponse:
+    """A reservation held by an earlier request with the same key, and its response once it finished."""
+
+    fingerprint: str
+    status_code: int | None = None
+    body: dict | None = None
+
+    @property
+    def pending(self) -> bool:
+        return self.status_code is None
+
+
+class IdempotencyStore:
+    """Responses of requests sent with an `Idempotency-Key`, kept `ttl_seconds` in `idempotency_keys`.
+
+    `reserve` inserts the key before the request runs; the `_id` uniqueness makes it atomic,
+    so of two concurrent duplicates only one runs and the other sees the reservation. A
+    reservation still unfinished after `lock_seconds` (its worker was killed) is taken over
+    by the next retry. Each reservation records its `owner`, and only the owner can complete
+    or release it, so a request outliving its lock cannot touch its successor's reservation.
+    """
+
+    def __init__(self, ttl_seconds: int, lock_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+
+    def reserve(self, key: str, fingerprint: str, owner: str) -> IdempotentResponse | None:
+        """Claim `key` for the request `owner`. Returns None if claimed, else the earlier request's record."""
+        coll = IdempotencyKey._get_collection()
+        now = datetime.now(UTC)
+        try:
+            coll.insert_one(
+                {
+                    "_id": key,
+                    "fingerprint": fingerprint,
+                    "owner": owner,
+                    "locked_until": now + timedelta(seconds=self.lock_seconds),
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                }
+            )
+            return None
+        except DuplicateKeyError:
+            pass
+
+        doc = coll.find_one({"_id": key})
+        if doc is not None and doc.get("status_code") is None and doc["locked_until"] <= now.replace(tzinfo=None):
+            # Abandoned reservation: take it over, conditional on the lock we saw.
+            taken = coll.find_one_and_update(
+                {"_id": key, "status_code": None, "locked_until": doc["locked_until"]},
+                {
+                    "$set": {
+                        "fingerprint": fingerprint,
+                        "owner": owner,
+                        "locked_until": now + timedelta(seconds=self.lock_seconds),
+                    }
+                },
+                return_document=ReturnDocument.AFTER,
+            )
+            if taken is not None:
+                return None
+            doc = coll.find_one({"_id": key})
+        if doc is None:
+            # Expired between the insert and the read.
+            return self.reserve(key, fingerprint, owner)
+        return IdempotentResponse(
+            fingerprint=doc["fingerprint"], status_code=doc.get("status_code"), body=doc.get("body")
+        )
+
+    def complete(self, key: str, owner: str, status_code: int, body: dict) -> None:
+        IdempotencyKey._get_collection().update_one(
+            {"_id": key, "owner": owner}, {"$set": {"status_code": status_code, "body": body}}
+        )
+
+    def release(self, key: str, owner: str) -> None:
+        """Drop an unfinished reservation so the client's retry runs the request again."""
+        IdempotencyKey._get_collection().delete_one({"_id": key, "owner": owner, "status_code": None})
+
+
+_idempotency_store_instance: IdempotencyStore | None = None
+
+
+def init_idempotency_store(settings: Settings) -> IdempotencyStore | None:
+    global _idempotency_store_instance
+    _idempotency_store_instance = (
+        IdempotencyStore(settings.idempotency_ttl_seconds, settings.idempotency_lock_seconds)
+        if settings.idempotency_ttl_seconds > 0
+        else None
+    )
+    return _idempotency_store_instance
+
+
+def get_idempotency_store() -> IdempotencyStore | None:
+    return _idempotency_store_instance
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from songs_api.constants import LeaderboardBy
+
+if TYPE_CHECKING:
+    from songs_api.infrastructure.cache import Cache
+    from songs_api.models.documents import RatingStats
+
+_KEY_PREFIX = "leaderboard"
+
+
+class Leaderboards:
+    """Top songs by average rating and by rating count, kept in Redis sorted sets.
+
+    There is one sorted set per metric overall and one per metric and level, updated
+    whenever a song's stats change, so a top-K read is a single O(log N + K) ZREVRANGE.
+    When Redis is unavailable reads return None and callers fall back to MongoDB.
+    """
+
+    def __init__(self, cache: Cache | None) -> None:
+        self.cache = cache
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cache and self.cache.enabled and self.cache.redis_client)
+
+    @staticmethod
+    def key(by: LeaderboardBy, level: int | None = None) -> str:
+        return f"{_KEY_PREFIX}:{by.value}" if level is None else f"{_KEY_PREFIX}:{by.value}:level:{level}"
+
+    def record(self, stats: Iterable[RatingStats]) -> None:
+        """Update the sorted sets for songs whose stats just changed."""
+        if not self.enabled:
+            return
+        try:
+            pipe = self.cache.redis_client.pipeline(transaction=False)
+            for item in stats:
+                self._add(pipe, item)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Leaderboard update failed: {e}")
+
+    def top(self, by: LeaderboardBy, level: int | None, limit: int) -> list[tuple[str, float]] | None:
+        """`(song_id, score)` best first, or None when Redis cannot answer."""
+        if not self.enabled:
+            return None
+        try:
+            return self.cache.redis_client.zrevrange(self.key(by, level), 0, limit - 1, withscores=True)
+        except Exception as e:
+            logger.warning(f"Leaderboard read failed: {e}")
+            return None
+
+    def rebuild(self, stats: Iterable[RatingStats], batch_size: int = 5000) -> int:
+        """Replace all leaderboards with the given stats. Returns the number of songs recorded."""
+        if not self.enabled:
+            return 0
+        redis_client = self.cache.redis_client
+        stale = list(redis_client.scan_iter(match=f"{_KEY_PREFIX}:*"))
+        if stale:
+            redis_client.delete(*stale)
+
+        recorded = 0
+        pipe = redis_client.pipeline(transaction=False)
+        for item in stats:
+            self._add(pipe, item)
+            recorded += 1
+            if recorded % batch_size == 0:
+                pipe.execute()
+        pipe.execute()
+        return recorded
+
+    def _add(self, pipe, stats: RatingStats) -> None:
+        if not stats.count:
+            return
+        scores = {LeaderboardBy.AVERAGE: stats.sum / stats.count, LeaderboardBy.COUNT: stats.count}
+        for by, score in scores.items():
+            pipe.zadd(self.key(by), {stats.song_id: score})
+            if stats.level is not None:
+                pipe.zadd(self.key(by, stats.level), {stats.song_id: score})
+
+
+_leaderboards_instance: Leaderboards | None = None
+
+
+def init_leaderboards(cache: Cache | None) -> Leaderboards:
+    global _leaderboards_instance
+    _leaderboards_instance = Leaderboards(cache)
+    return _leaderboards_instance
+
+
+def get_leaderboards() -> Leaderboards | None:
+    return _leaderboards_instance
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+if TYPE_CHECKING:
+    from songs_api.settings import Settings
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Raised when no hashing slot is free, or the hash did not finish within the timeout."""
+
+
+class PasswordHasher:
+    """Password hashing and verification on a dedicated process pool, off the request thread.
+
+    At most `max_pending` hashes are queued or running per web worker; beyond that callers
+    get `PasswordHasherBusyError` at once instead of waiting, so a burst of logins cannot
+    occupy every request thread. A slot is held until its hash finishes, also when the caller
+    timed out. With `workers=0` hashing runs inline (same bound).
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout_seconds: float) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool: ProcessPoolExecutor | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def metrics(self) -> dict[str, float | int]:
+        """This worker's hashing queue depth and latency (milliseconds) since start."""
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "capacity": self.max_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "latency_ms_avg": round(1000 * self._latency_total / self._completed, 1) if self._completed else 0.0,
+                "latency_ms_max": round(1000 * self._latency_max, 1),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pid == os.getpid():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusyError("Password hashing queue is full")
+        started = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+        if self.workers == 0:
+            try:
+                result = func(*args)
+            finally:
+                self._release()
+        else:
+            try:
+                future = self._executor().submit(func, *args)
+            except BrokenProcessPool as exc:
+                self._release()
+                self.close()
+                raise PasswordHasherBusyError("Password hashing pool restarted") from exc
+            # The slot stays taken until the hash really finishes, even after this caller gave up.
+            future.add_done_callback(lambda _: self._release())
+            try:
+                result = future.result(timeout=self.timeout_seconds)
+            except TimeoutError as exc:
+                future.cancel()
+                raise PasswordHasherBusyError("Password hashing timed out") from exc
+            except BrokenProcessPool as exc:
+                # A hashing process died; start a fresh pool for the next caller.
+                self.close()
+                raise PasswordHasherBusyError("Password hashing pool restarted") from exc
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._completed += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+        return result
+
+    def _release(self) -> None:
+        self._slots.release()
+        with self._lock:
+            self._pending -= 1
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                # Per process and spawned: a pool inherited across gunicorn's fork is unusable.
+                self._pid = os.getpid()
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+
+_password_hasher_instance: PasswordHasher | None = None
+
+
+def init_password_hasher(settings: Settings) -> PasswordHasher:
+    global _password_hasher_instance
+    if _password_hasher_instance is not None:
+        _password_hasher_instance.close()
+    _password_hasher_instance = PasswordHasher(
+        workers=settings.password_hash_workers,
+        max_pending=settings.password_hash_max_pending or max(2 * settings.password_hash_workers, 1),
+        timeout_seconds=settings.password_hash_timeout_seconds,
+    )
+    atexit.register(_password_hasher_instance.close)
+    return _password_hasher_instance
+
+
+def get_password_hasher() -> PasswordHasher | None:
+    return _password_hasher_instance
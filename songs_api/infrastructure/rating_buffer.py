@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from bson import ObjectId
+from loguru import logger
+
+from songs_api.constants import RatingsWriteMode
+from songs_api.infrastructure.cache import rating_stats_cache_key
+from songs_api.infrastructure.leaderboards import get_leaderboards
+from songs_api.infrastructure.rating_events import get_rating_stats_hub
+from songs_api.infrastructure.rating_prior import get_rating_prior
+from songs_api.infrastructure.resources import SystemResources
+from songs_api.infrastructure.song_index import get_song_index
+from songs_api.infrastructure.uow import UnitOfWork
+
+if TYPE_CHECKING:
+    from songs_api.infrastructure.cache import Cache
+    from songs_api.infrastructure.rating_queue import RatingQueue
+    from songs_api.settings import Settings
+
+# (rating_id, song_id, rating); the id is fixed when the rating is buffered.
+BufferedRating = tuple[ObjectId, str, int]
+RatingWriter = Callable[[list[BufferedRating]], None]
+
+_MAX_FLUSH_ATTEMPTS = 5
+_RETRY_BACKOFF_SECONDS = 0.5
+
+
+class RatingBufferFullError(RuntimeError):
+    """Raised when the buffer stays at capacity for longer than the put timeout."""
+
+
+class RatingBuffer:
+    """Per-worker write-behind buffer of `(song_id, rating)` pairs.
+
+    Each rating gets its raw rating `_id` when it is buffered, so a writer can recognise
+    ratings an earlier, failed attempt at the same batch already stored.
+
+    A background thread hands the buffered ratings to `writer` once `flush_size` of them are
+    pending or `flush_interval_seconds` have passed. At most `capacity` ratings are pending;
+    `add` waits up to `put_timeout_seconds` for a flush to free space and then raises
+    `RatingBufferFullError`, pushing back on clients instead of growing without bound.
+
+    A batch the writer fails on goes back to the front of the buffer (as far as capacity
+    allows) and is retried with exponential backoff from `retry_backoff_seconds`. After
+    `max_flush_attempts` consecutive failures it is dropped and counted in `metrics()`.
+    """
+
+    def __init__(
+        self,
+        writer: RatingWriter,
+        *,
+        flush_size: int,
+        flush_interval_seconds: float,
+        capacity: int,
+        put_timeout_seconds: float,
+        max_flush_attempts: int = _MAX_FLUSH_ATTEMPTS,
+        retry_backoff_seconds: float = _RETRY_BACKOFF_SECONDS,
+    ) -> None:
+        self.writer = writer
+        self.flush_size = flush_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.capacity = capacity
+        self.put_timeout_seconds = put_timeout_seconds
+        self.max_flush_attempts = max_flush_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._pending: list[BufferedRating] = []
+        self._failed_flushes = 0
+        self._retry_at = 0.0
+        self._dropped = 0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def metrics(self) -> dict[str, int]:
+        """Ratings buffered in this worker and not yet written, and ratings given up on after failed flushes."""
+        return {"pending": len(self), "failed_flushes": self._failed_flushes, "dropped": self._dropped}
+
+    def add(self, song_id: str, rating: int) -> None:
+        self.add_many([(song_id, rating)])
+
+    def add_many(self, ratings: list[tuple[str, int]]) -> None:
+        """Buffer all ratings or none of them."""
+        if len(ratings) > self.capacity:
+            raise RatingBufferFullError("More ratings than the buffer can hold")
+        with self._cond:
+            if self._closed:
+                raise RatingBufferFullError("Rating buffer is shut down")
+            self._ensure_flusher()
+            if len(self._pending) + len(ratings) > self.capacity:
+                self._cond.notify_all()
+                has_space = self._cond.wait_for(
+                    lambda: len(self._pending) + len(ratings) <= self.capacity, timeout=self.put_timeout_seconds
+                )
+                if not has_space:
+                    raise RatingBufferFullError("Rating buffer is full")
+            self._pending.extend((ObjectId(), song_id, rating) for song_id, rating in ratings)
+            if len(self._pending) >= self.flush_size:
+                self._cond.notify_all()
+
+    def flush(self) -> int:
+        """Write everything pending now. Returns the number of ratings handed to the writer."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+                self._cond.notify_all()
+            if not batch:
+                return 0
+            try:
+                self.writer(batch)
+            except Exception:
+                self._flush_failed(batch)
+                return 0
+            self._failed_flushes = 0
+            return len(batch)
+
+    def _flush_failed(self, batch: list[BufferedRating]) -> None:
+        self._failed_flushes += 1
+        if self._failed_flushes >= self.max_flush_attempts:
+            logger.exception(f"Dropping {len(batch)} buffered ratings after {self._failed_flushes} failed flushes")
+            self._dropped += len(batch)
+            self._failed_flushes = 0
+            return
+
+        delay = self.retry_backoff_seconds * 2 ** (self._failed_flushes - 1)
+        with self._cond:
+            # Back in front of anything buffered since, up to capacity; `add` keeps pushing back meanwhile.
+            kept = batch[: max(0, self.capacity - len(self._pending))]
+            self._pending[:0] = kept
+            self._retry_at = time.monotonic() + delay
+        self._dropped += len(batch) - len(kept)
+        logger.opt(exception=True).warning(
+            f"Failed to flush {len(batch)} buffered ratings (attempt {self._failed_flushes}), retrying in {delay:.1f}s"
+        )
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the flusher and write whatever is still pending (graceful shutdown)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            if self._pid != os.getpid():
+                # Copy inherited across fork; the process that buffered it flushes it.
+                self._pending = []
+                return
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+        if self._pending:
+            logger.error(f"Shutting down with {len(self._pending)} buffered ratings unwritten")
+            self._dropped += len(self._pending)
+            self._pending = []
+
+    def _ensure_flusher(self) -> None:
+        # Threads do not survive fork: a worker forked from a process that already buffered
+        # ratings drops the inherited copy (the parent flushes it) and starts its own flusher.
+        if self._pid == os.getpid():
+            return
+        if self._pid is not None:
+            self._pending = []
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="rating-buffer-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                backoff = self._retry_at - time.monotonic()
+                if backoff > 0:
+                    self._cond.wait_for(lambda: self._closed, timeout=backoff)
+                else:
+                    self._cond.wait_for(
+                        lambda: self._closed or len(self._pending) >= self.flush_size,
+                        timeout=self.flush_interval_seconds,
+                    )
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+
+def _ratings_writer(cache: Cache | None) -> RatingWriter:
+    def write(batch: list[BufferedRating]) -> None:
+        song_ids = {song_id for _, song_id, _ in batch}
+        resources = SystemResources(cache_service=cache, song_index=get_song_index(), rating_prior=get_rating_prior())
+        # A retried batch may be partly stored already: skip those ratings rather than count them
+        # twice. With transactions nothing is stored unless the whole batch was; without, stats a
+        # failed attempt left short are corrected from the raw ratings by `make reconcile-ratings`.
+        with UnitOfWork(resources, use_transactions=True) as uow:
+            stored = uow.ratings_repository.existing_rating_ids([rating_id for rating_id, _, _ in batch])
+            fresh = [entry for entry in batch if entry[0] not in stored]
+            levels = uow.songs_repository.get_levels(song_ids)
+            stats_by_song = uow.ratings_repository.bulk_add_ratings(
+                [(song_id, rating) for _, song_id, rating in fresh],
+                levels,
+                rating_ids=[rating_id for rating_id, _, _ in fresh],
+            )
+        if cache:
+            for song_id in song_ids:
+                cache.delete(rating_stats_cache_key(song_id))
+        leaderboards = get_leaderboards()
+        if leaderboards:
+            leaderboards.record(stats_by_song.values())
+        hub = get_rating_stats_hub()
+        if hub:
+            hub.publish(stats_by_song)
+
+    return write
+
+
+_rating_buffer: RatingBuffer | RatingQueue | None = None
+
+
+def init_rating_buffer(settings: Settings, cache: Cache | None = None) -> RatingBuffer | RatingQueue | None:
+    global _rating_buffer
+    if _rating_buffer is not None:
+        _rating_buffer.close()
+        _rating_buffer = None
+
+    if settings.ratings_write_mode == RatingsWriteMode.QUEUE:
+        from songs_api.infrastructure.rating_queue import create_rating_queue
+
+        _rating_buffer = create_rating_queue(settings)
+        return _rating_buffer
+
+    if settings.ratings_write_mode != RatingsWriteMode.WRITE_BEHIND:
+        return None
+
+    _rating_buffer = RatingBuffer(
+        _ratings_writer(cache),
+        flush_size=settings.rating_buffer_flush_size,
+        flush_interval_seconds=settings.rating_buffer_flush_seconds,
+        capacity=settings.rating_buffer_capacity,
+        put_timeout_seconds=settings.rating_buffer_put_timeout_seconds,
+    )
+    atexit.register(_rating_buffer.close)
+    return _rating_buffer
+
+
+def get_rating_buffer() -> RatingBuffer | RatingQueue | None:
+    return _rating_buffer
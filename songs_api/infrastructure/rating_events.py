@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from songs_api.infrastructure.cache import Cache
+    from songs_api.settings import Settings
+
+CHANNEL = "ratings:changed"
+_POLL_SECONDS = 1.0
+_RECONNECT_SECONDS = 1.0
+
+
+class RatingStreamLimitError(RuntimeError):
+    """Raised when this worker already serves its maximum number of open streams."""
+
+
+def _cooperative() -> bool:
+    """True under gunicorn's gevent worker, where a waiting stream holds a greenlet rather than a thread."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+class RatingStatsSubscription:
+    """One open stream's view of a song: a flag raised whenever the song's stats change."""
+
+    def __init__(self, hub: RatingStatsHub, song_id: str) -> None:
+        self.hub = hub
+        self.song_id = song_id
+        self._changed = threading.Event()
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the stats changed (True) or `timeout` passed (False); changes seen since coalesce."""
+        changed = self._changed.wait(timeout)
+        self._changed.clear()
+        return changed
+
+    def notify(self) -> None:
+        self._changed.set()
+
+    def __enter__(self) -> RatingStatsSubscription:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.hub.unsubscribe(self)
+
+
+class RatingStatsHub:
+    """Per-worker fan-out of "these songs' rating stats changed" to open SSE streams.
+
+    Writers `publish` song IDs on one Redis pub/sub channel; every worker runs one listener
+    thread on it and wakes only the local subscriptions for those songs, so a stream can be
+    served by any worker. Without Redis, notifications stay inside the process. Payloads
+    are not sent over pub/sub: `snapshot` loads a song's stats at most once per change per
+    worker, however many streams are open on it.
+
+    Streams are meant for a gevent worker (`make run-streams`), where an idle one costs a
+    greenlet and a socket, and a worker holds up to `max_streams`. On a gthread worker each
+    open stream holds a request thread, so there only `max_threaded_streams` are allowed,
+    keeping the remaining threads for the rest of the API. Beyond the limit `subscribe`
+    raises `RatingStreamLimitError`.
+    """
+
+    def __init__(
+        self,
+        cache: Cache | None,
+        *,
+        min_interval_seconds: float,
+        heartbeat_seconds: float,
+        max_stream_seconds: float,
+        max_streams: int,
+        max_threaded_streams: int,
+    ) -> None:
+        self.cache = cache
+        # Read by the stream generators: push at most every `min_interval_seconds`, send a
+        # comment after `heartbeat_seconds` of quiet, and end streams after `max_stream_seconds`
+        # (EventSource reconnects, which spreads long-lived connections over the workers).
+        self.min_interval_seconds = min_interval_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_stream_seconds = max_stream_seconds
+        self.max_streams = max_streams
+        self.max_threaded_streams = max_threaded_streams
+        self._open_streams = 0
+        self._subscriptions: dict[str, set[RatingStatsSubscription]] = {}
+        # song_id -> change counter; snapshots remember the counter they were loaded at.
+        self._versions: dict[str, int] = {}
+        self._snapshots: dict[str, tuple[int, Any]] = {}
+        self._loaders: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+
+    @property
+    def distributed(self) -> bool:
+        return bool(self.cache and self.cache.enabled and self.cache.redis_client)
+
+    def publish(self, song_ids: Iterable[str]) -> None:
+        """Announce that these songs' stats changed, to this and every other worker."""
+        song_ids = list(song_ids)
+        if not song_ids:
+            return
+        if not self.distributed:
+            self._notify(song_ids)
+            return
+        try:
+            self.cache.redis_client.publish(CHANNEL, ",".join(song_ids))
+        except Exception as e:
+            logger.warning(f"Rating change publish failed: {e}")
+            self._notify(song_ids)
+
+    def subscribe(self, song_id: str) -> RatingStatsSubscription:
+        if self.distributed:
+            self._ensure_listener()
+        subscription = RatingStatsSubscription(self, song_id)
+        limit = self.max_streams if _cooperative() else self.max_threaded_streams
+        with self._lock:
+            if self._open_streams >= limit:
+                raise RatingStreamLimitError(f"{self._open_streams} rating streams already open in this worker")
+            self._open_streams += 1
+            self._subscriptions.setdefault(song_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: RatingStatsSubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.song_id)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            self._open_streams -= 1
+            if not subscriptions:
+                del self._subscriptions[subscription.song_id]
+                self._versions.pop(subscription.song_id, None)
+                self._snapshots.pop(subscription.song_id, None)
+                self._loaders.pop(subscription.song_id, None)
+
+    def snapshot(self, song_id: str, load: Callable[[], Any]) -> Any:
+        """The song's current stats, loaded once per change and shared by this worker's streams."""
+        with self._lock:
+            loader = self._loaders.setdefault(song_id, threading.Lock())
+        with loader:
+            with self._lock:
+                version = self._versions.get(song_id, 0)
+                cached = self._snapshots.get(song_id)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            payload = load()
+            with self._lock:
+                # Stored under the version read before loading, so a change during the load reloads.
+                if song_id in self._subscriptions:
+                    self._snapshots[song_id] = (version, payload)
+            return payload
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def _notify(self, song_ids: Iterable[str]) -> None:
+        with self._lock:
+            woken = []
+            for song_id in song_ids:
+                subscriptions = self._subscriptions.get(song_id)
+                if subscriptions:
+                    self._versions[song_id] = self._versions.get(song_id, 0) + 1
+                    woken.extend(subscriptions)
+        for subscription in woken:
+            subscription.notify()
+
+    def _ensure_listener(self) -> None:
+        # Like the rating buffer's flusher: threads do not survive fork, so each worker starts its own.
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._listen, name="rating-stats-listener", daemon=True).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.cache.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Changes published while disconnected were missed: have every stream reload once.
+                with self._lock:
+                    subscribed = list(self._subscriptions)
+                self._notify(subscribed)
+                while True:
+                    # Short polls rather than listen(): the cache client's socket timeout would end a long read.
+                    message = pubsub.get_message(timeout=_POLL_SECONDS)
+                    if message and message["type"] == "message":
+                        self._notify(message["data"].split(","))
+            except Exception as e:
+                logger.warning(f"Rating change listener lost Redis, reconnecting: {e}")
+                time.sleep(_RECONNECT_SECONDS)
+
+
+_rating_stats_hub_instance: RatingStatsHub | None = None
+
+
+def init_rating_stats_hub(settings: Settings, cache: Cache | None = None) -> RatingStatsHub | None:
+    global _rating_stats_hub_instance
+    _rating_stats_hub_instance = (
+        RatingStatsHub(
+            cache,
+            min_interval_seconds=settings.rating_stream_min_interval_seconds,
+            heartbeat_seconds=settings.rating_stream_heartbeat_seconds,
+            max_stream_seconds=settings.rating_stream_max_seconds,
+            max_streams=settings.rating_stream_max_connections,
+            max_threaded_streams=settings.rating_stream_max_threaded_connections,
+        )
+        if settings.rating_stream_enabled
+        else None
+    )
+    return _rating_stats_hub_instance
+
+
+def get_rating_stats_hub() -> RatingStatsHub | None:
+    return _rating_stats_hub_instance
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from songs_api.constants import RatingRange
+from songs_api.models.documents import RatingStats, RatingTotals
+
+if TYPE_CHECKING:
+    from songs_api.settings import Settings
+
+_TOTALS_ID = "ratings"
+
+
+class RatingPrior:
+    """Catalog-wide mean rating used to shrink per-song averages toward it.
+
+    score = (weight * mean + sum) / (weight + count), so a song needs about `weight`
+    ratings before its own average dominates. Workers re-read the mean from the
+    `rating_totals` singleton at most every `refresh_seconds`, with one `find_one`; until
+    that document exists the midpoint of the rating range is used. The totals are
+    recomputed from `rating_stats`, and stored scores rescored, by
+    `make refresh-rating-prior`, never on the request path.
+    """
+
+    def __init__(self, weight: float, refresh_seconds: float) -> None:
+        self.weight = weight
+        self.refresh_seconds = refresh_seconds
+        self._mean = (RatingRange.MIN + RatingRange.MAX) / 2
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def mean(self) -> float:
+        loaded_at = self._loaded_at
+        if (loaded_at is None or time.monotonic() - loaded_at >= self.refresh_seconds) and self._lock.acquire(
+            blocking=False
+        ):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.warning(f"Rating prior reload failed, keeping mean {self._mean:.3f}: {e}")
+            finally:
+                self._loaded_at = time.monotonic()
+                self._lock.release()
+        return self._mean
+
+    def score(self, total: int, count: int) -> float:
+        return (self.weight * self.mean + total) / (self.weight + count)
+
+    def reload(self) -> None:
+        """Load the mean from the totals document."""
+        doc = RatingTotals._get_collection().find_one({"_id": _TOTALS_ID})
+        if doc and doc.get("count"):
+            self._mean = doc["sum"] / doc["count"]
+
+    def refresh(self) -> dict:
+        """Recompute the catalog-wide totals from `rating_stats`, store them and load the new mean."""
+        totals = next(
+            RatingStats._get_collection().aggregate(
+                [{"$group": {"_id": None, "count": {"$sum": "$count"}, "sum": {"$sum": "$sum"}}}]
+            ),
+            {"count": 0, "sum": 0},
+        )
+        doc = {"count": totals["count"], "sum": totals["sum"], "refreshed_at": time.time()}
+        RatingTotals._get_collection().update_one({"_id": _TOTALS_ID}, {"$set": doc}, upsert=True)
+        self.reload()
+        self._loaded_at = time.monotonic()
+        return doc
+
+
+_rating_prior_instance: RatingPrior | None = None
+
+
+def init_rating_prior(settings: Settings) -> RatingPrior:
+    global _rating_prior_instance
+    _rating_prior_instance = RatingPrior(
+        weight=settings.rating_prior_weight, refresh_seconds=settings.rating_prior_refresh_seconds
+    )
+    return _rating_prior_instance
+
+
+def get_rating_prior() -> RatingPrior | None:
+    return _rating_prior_instance
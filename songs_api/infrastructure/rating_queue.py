@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from bson import ObjectId
+from loguru import logger
+
+from songs_api.infrastructure.rating_buffer import RatingBufferFullError
+
+if TYPE_CHECKING:
+    from songs_api.settings import Settings
+
+
+@dataclass(frozen=True)
+class QueuedRating:
+    entry_id: str
+    song_id: str
+    rating: int
+
+    @property
+    def rating_id(self) -> ObjectId:
+        """`_id` for the stored `Rating`, derived from the stream entry ID.
+
+        A redelivered entry maps to the same `_id`, which is how the consumer skips entries
+        it already applied. Entry IDs are `<ms>-<seq>`, so the `_id` keeps the ObjectId
+        timestamp (seconds) and time order.
+        """
+        millis, seq = (int(part) for part in self.entry_id.split("-"))
+        return ObjectId(struct.pack(">IH", millis // 1000, millis % 1000) + seq.to_bytes(6, "big"))
+
+
+class RatingQueue:
+    """Ratings appended to a Redis Stream and applied to MongoDB by a separate consumer process.
+
+    Stands in for the write-behind `RatingBuffer` (`add`/`add_many`, `RatingBufferFullError`
+    when it cannot take more), but survives web worker restarts: entries stay in the stream
+    until a consumer in `group` has written and acknowledged them. Consumers that die
+    mid-batch leave their entries pending, and another consumer claims them after
+    `claim_idle_ms`, so delivery is at least once.
+    """
+
+    def __init__(self, redis_client: Any, *, stream: str, group: str, capacity: int) -> None:
+        self.redis_client = redis_client
+        self.stream = stream
+        self.group = group
+        self.capacity = capacity
+
+    def add(self, song_id: str, rating: int) -> None:
+        self.add_many([(song_id, rating)])
+
+    def add_many(self, ratings: list[tuple[str, int]]) -> None:
+        """Append all ratings or none of them."""
+        try:
+            if self.redis_client.xlen(self.stream) + len(ratings) > self.capacity:
+                raise RatingBufferFullError("Rating queue is full")
+            pipe = self.redis_client.pipeline(transaction=True)
+            for song_id, rating in ratings:
+                pipe.xadd(self.stream, {"song_id": song_id, "rating": rating})
+            pipe.execute()
+        except RatingBufferFullError:
+            raise
+        except Exception as e:
+            logger.warning(f"Rating queue append failed: {e}")
+            raise RatingBufferFullError("Rating queue is unavailable") from e
+
+    def ensure_group(self) -> None:
+        """Create the consumer group (and the stream) unless they exist."""
+        try:
+            self.redis_client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def read(self, consumer: str, count: int, block_ms: int, claim_idle_ms: int) -> list[QueuedRating]:
+        """Entries left pending by a stalled consumer first, then new ones (blocking up to `block_ms`)."""
+        claimed = self.redis_client.xautoclaim(
+            self.stream, self.group, consumer, min_idle_time=claim_idle_ms, start_id="0-0", count=count
+        )
+        entries = claimed[1]
+        if not entries:
+            response = self.redis_client.xreadgroup(
+                self.group, consumer, {self.stream: ">"}, count=count, block=block_ms
+            )
+            entries = response[0][1] if response else []
+        # Entries deleted while pending come back as (id, None).
+        return [
+            QueuedRating(entry_id, fields["song_id"], int(fields["rating"])) for entry_id, fields in entries if fields
+        ]
+
+    def ack(self, entry_ids: list[str]) -> None:
+        """Acknowledge applied entries and delete them so the stream only holds unapplied ratings."""
+        if not entry_ids:
+            return
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.xack(self.stream, self.group, *entry_ids)
+        pipe.xdel(self.stream, *entry_ids)
+        pipe.execute()
+
+    def metrics(self) -> dict[str, int | None]:
+        """Entries in the stream, delivered but unacknowledged, and not yet delivered (`lag`, Redis 7+)."""
+        length = self.redis_client.xlen(self.stream)
+        groups = self.redis_client.xinfo_groups(self.stream) if self.redis_client.exists(self.stream) else []
+        group = next((group for group in groups if group["name"] == self.group), None)
+        if group is None:
+            return {"length": length, "pending": 0, "lag": length}
+        return {"length": length, "pending": group["pending"], "lag": group.get("lag")}
+
+    def close(self) -> None:
+        """Nothing is held in the worker; entries are already durable in Redis."""
+
+
+def create_rating_queue(settings: Settings) -> RatingQueue:
+    import redis
+
+    return RatingQueue(
+        redis.from_url(settings.rating_queue_redis_url, decode_responses=True, socket_timeout=5),
+        stream=settings.rating_queue_stream,
+        group=settings.rating_queue_group,
+        capacity=settings.rating_queue_capacity,
+    )
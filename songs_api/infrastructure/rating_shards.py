@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from songs_api.settings import Settings
+
+_HOT_SECONDS = 60
+_MAX_TRACKED_SONGS = 10000
+
+
+class RatingShards:
+    """Decides which ratings go to sharded counters instead of the song's `RatingStats` document.
+
+    A song becomes hot in this worker once it gets `hot_writes_per_second` ratings within one
+    second, and stays hot for a minute after that. Ratings for hot songs `$inc` one of
+    `shard_count` counter documents picked at random, so concurrent writers (and transactions)
+    stop contending for one document; readers add the shards back in.
+    """
+
+    def __init__(self, shard_count: int, hot_writes_per_second: int) -> None:
+        self.shard_count = shard_count
+        self.hot_writes_per_second = hot_writes_per_second
+        # song_id -> [current second, writes in it, hot until]
+        self._rates: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def should_shard(self, song_id: str) -> bool:
+        """Record one write for the song and say whether it should go to a shard."""
+        now = time.monotonic()
+        second = int(now)
+        with self._lock:
+            rate = self._rates.get(song_id)
+            if rate is None:
+                if len(self._rates) >= _MAX_TRACKED_SONGS:
+                    self._forget_cold(now)
+                rate = self._rates[song_id] = [second, 0, 0.0]
+            if rate[0] != second:
+                rate[0], rate[1] = second, 0
+            rate[1] += 1
+            if rate[1] >= self.hot_writes_per_second:
+                rate[2] = now + _HOT_SECONDS
+            return rate[2] > now
+
+    def pick(self) -> int:
+        return random.randrange(self.shard_count)
+
+    def _forget_cold(self, now: float) -> None:
+        self._rates = {song_id: rate for song_id, rate in self._rates.items() if rate[2] > now}
+
+
+_rating_shards_instance: RatingShards | None = None
+
+
+def init_rating_shards(settings: Settings) -> RatingShards | None:
+    global _rating_shards_instance
+    _rating_shards_instance = (
+        RatingShards(settings.rating_stats_shards, settings.rating_hot_song_writes_per_second)
+        if settings.rating_stats_shards > 0
+        else None
+    )
+    return _rating_shards_instance
+
+
+def get_rating_shards() -> RatingShards | None:
+    return _rating_shards_instance
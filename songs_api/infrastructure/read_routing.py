@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import base64
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import bson
+from loguru import logger
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+from songs_api.constants import ReadPreferenceMode, ReadRoute
+
+if TYPE_CHECKING:
+    from pymongo.client_session import ClientSession
+    from pymongo.read_preferences import _ServerMode
+
+    from songs_api.infrastructure.cache import Cache
+    from songs_api.settings import Settings
+
+_SECONDARY_MODES = {
+    ReadPreferenceMode.PRIMARY_PREFERRED: PrimaryPreferred,
+    ReadPreferenceMode.SECONDARY: Secondary,
+    ReadPreferenceMode.SECONDARY_PREFERRED: SecondaryPreferred,
+    ReadPreferenceMode.NEAREST: Nearest,
+}
+
+
+def build_read_preference(mode: ReadPreferenceMode, max_staleness_seconds: int = -1) -> _ServerMode:
+    if mode == ReadPreferenceMode.PRIMARY:
+        return Primary()
+    return _SECONDARY_MODES[mode](max_staleness=max_staleness_seconds)
+
+
+class ReadRouter:
+    """Read preference per repository read route (catalog reads, rating stats reads)."""
+
+    def __init__(self, settings: Settings) -> None:
+        self._preferences: dict[ReadRoute, _ServerMode] = {
+            ReadRoute.CATALOG: build_read_preference(
+                settings.mongo_catalog_read_preference, settings.mongo_catalog_max_staleness_seconds
+            ),
+            ReadRoute.STATS: build_read_preference(
+                settings.mongo_stats_read_preference, settings.mongo_stats_max_staleness_seconds
+            ),
+        }
+
+    def preference(self, route: ReadRoute) -> _ServerMode | None:
+        """Return the configured preference, or None when it is primary (the driver default)."""
+        preference = self._preferences.get(route)
+        if preference is None or preference.mode == Primary().mode:
+            return None
+        return preference
+
+
+@dataclass(frozen=True)
+class CausalToken:
+    """Cluster and operation time of a write, used to make a later read observe it."""
+
+    cluster_time: dict[str, Any]
+    operation_time: bson.Timestamp
+
+    @classmethod
+    def from_session(cls, session: ClientSession) -> CausalToken | None:
+        if session.cluster_time is None or session.operation_time is None:
+            return None
+        return cls(cluster_time=session.cluster_time, operation_time=session.operation_time)
+
+    def apply(self, session: ClientSession) -> None:
+        session.advance_cluster_time(self.cluster_time)
+        session.advance_operation_time(self.operation_time)
+
+    def encode(self) -> str:
+        raw = bson.encode({"clusterTime": self.cluster_time, "operationTime": self.operation_time})
+        return base64.b64encode(raw).decode("ascii")
+
+    @classmethod
+    def decode(cls, value: str) -> CausalToken:
+        doc = bson.decode(base64.b64decode(value))
+        return cls(cluster_time=doc["clusterTime"], operation_time=doc["operationTime"])
+
+
+class CausalTokenStore:
+    """Remembers each user's latest write so their next stats read can be read-your-writes.
+
+    Tokens live in the Redis cache when it is enabled so any worker can serve the follow-up
+    read; otherwise they are kept per process.
+    """
+
+    def __init__(self, cache: Cache | None, ttl_seconds: int) -> None:
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self._local: dict[str, tuple[float, CausalToken]] = {}
+        self._lock = threading.Lock()
+
+    def remember(self, username: str, token: CausalToken) -> None:
+        if self.cache and self.cache.enabled:
+            self.cache.set(self._key(username), token.encode(), ttl=self.ttl_seconds)
+            return
+        with self._lock:
+            self._local[username] = (time.monotonic() + self.ttl_seconds, token)
+
+    def recall(self, username: str) -> CausalToken | None:
+        if self.cache and self.cache.enabled:
+            value = self.cache.get(self._key(username))
+            if not value:
+                return None
+            try:
+                return CausalToken.decode(value)
+            except Exception as e:
+                logger.warning(f"Discarding undecodable causal token for {username}: {e}")
+                return None
+
+        with self._lock:
+            entry = self._local.get(username)
+            if entry is None:
+                return None
+            expires_at, token = entry
+            if expires_at <= time.monotonic():
+                del self._local[username]
+                return None
+            return token
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return f"causal:{username}"
+
+
+_read_router: ReadRouter | None = None
+_causal_tokens: CausalTokenStore | None = None
+
+
+def init_read_routing(settings: Settings, cache: Cache | None = None) -> ReadRouter:
+    global _read_router, _causal_tokens
+    _read_router = ReadRouter(settings)
+    _causal_tokens = CausalTokenStore(cache, ttl_seconds=settings.causal_token_ttl_seconds)
+    return _read_router
+
+
+def get_read_router() -> ReadRouter | None:
+    return _read_router
+
+
+def get_causal_tokens() -> CausalTokenStore | None:
+    return _causal_tokens
@@ -4,15 +4,46 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from songs_api.infrastructure.cache import Cache
+    from songs_api.infrastructure.rating_buffer import RatingBuffer
+    from songs_api.infrastructure.rating_prior import RatingPrior
+    from songs_api.infrastructure.rating_queue import RatingQueue
+    from songs_api.infrastructure.rating_shards import RatingShards
+    from songs_api.infrastructure.read_routing import ReadRouter
+    from songs_api.infrastructure.song_index import SongIdIndex
 
 
 class SystemResources:
-    def __init__(self, cache_service: Cache | None = None):
+    def __init__(
+        self,
+        cache_service: Cache | None = None,
+        read_router: ReadRouter | None = None,
+        rating_buffer: RatingBuffer | RatingQueue | None = None,
+        song_index: SongIdIndex | None = None,
+        rating_prior: RatingPrior | None = None,
+        rating_shards: RatingShards | None = None,
+    ):
         self.cache_service = cache_service
+        self.read_router = read_router
+        self.rating_buffer = rating_buffer
+        self.song_index = song_index
+        self.rating_prior = rating_prior
+        self.rating_shards = rating_shards
 
     @classmethod
     def create_default(cls) -> SystemResources:
         from songs_api.infrastructure.cache import get_cache
+        from songs_api.infrastructure.rating_buffer import get_rating_buffer
+        from songs_api.infrastructure.rating_prior import get_rating_prior
+        from songs_api.infrastructure.rating_shards import get_rating_shards
+        from songs_api.infrastructure.read_routing import get_read_router
+        from songs_api.infrastructure.song_index import get_song_index
 
         cache = get_cache()
-        return cls(cache_service=cache)
+        return cls(
+            cache_service=cache,
+            read_router=get_read_router(),
+            rating_buffer=get_rating_buffer(),
+            song_index=get_song_index(),
+            rating_prior=get_rating_prior(),
+            rating_shards=get_rating_shards(),
+        )
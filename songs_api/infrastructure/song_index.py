@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import numpy as np
+from bson import ObjectId
+from loguru import logger
+
+from songs_api.models.documents import Song
+
+if TYPE_CHECKING:
+    from songs_api.settings import Settings
+
+_LOAD_BATCH_SIZE = 10000
+_MERGE_THRESHOLD = 10000
+
+
+class SongIdIndex:
+    """Per-worker exact map of song ObjectId -> level, used to answer "does this song exist?" in memory.
+
+    IDs loaded at startup live in a sorted array of 12-byte values (binary search) with a
+    parallel array of levels, ~14 bytes per song; IDs added later go to a small dict that is
+    merged into the arrays once it grows. A miss is not authoritative — another process may
+    have inserted the song — so callers fall back to MongoDB and `add` what they find.
+    """
+
+    def __init__(self) -> None:
+        # (sorted ids, levels) published as one tuple so readers never see a torn pair.
+        self._table: tuple[np.ndarray, np.ndarray] = (np.array([], dtype="S12"), np.array([], dtype=np.int16))
+        self._recent: dict[bytes, int] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._table[0]) + len(self._recent)
+
+    def __contains__(self, song_id: ObjectId) -> bool:
+        return self.level_of(song_id) is not None
+
+    def level_of(self, song_id: ObjectId) -> int | None:
+        key = song_id.binary
+        level = self._recent.get(key)
+        if level is not None:
+            return level
+        ids, levels = self._table
+        position = int(np.searchsorted(ids, key))
+        # Items of an "S12" array come back with trailing NUL bytes stripped.
+        if position < len(ids) and ids[position] == key.rstrip(b"\x00"):
+            return int(levels[position])
+        return None
+
+    def load(self) -> None:
+        ids, levels = [], []
+        for doc in Song._get_collection().find({}, {"_id": 1, "level": 1}).batch_size(_LOAD_BATCH_SIZE):
+            ids.append(doc["_id"].binary)
+            levels.append(doc["level"])
+        ids_array = np.array(ids, dtype="S12")
+        order = np.argsort(ids_array, kind="stable")
+        with self._lock:
+            self._table = (ids_array[order], np.array(levels, dtype=np.int16)[order])
+            self._recent = {}
+            self.loaded = True
+        logger.info(f"Song ID index loaded with {len(ids)} songs")
+
+    def add(self, songs: Iterable[tuple[ObjectId, int]]) -> None:
+        """Remember `(song_id, level)` pairs learned after the last load."""
+        with self._lock:
+            self._recent.update((song_id.binary, level) for song_id, level in songs)
+            if len(self._recent) < _MERGE_THRESHOLD:
+                return
+            ids, levels = self._table
+            ids = np.concatenate([ids, np.array(list(self._recent), dtype="S12")])
+            levels = np.concatenate([levels, np.array(list(self._recent.values()), dtype=np.int16)])
+            ids, first = np.unique(ids, return_index=True)
+            # Publish the arrays before clearing `_recent` so lock-free readers never miss an ID.
+            self._table = (ids, levels[first])
+            self._recent = {}
+
+
+_song_index_instance: SongIdIndex | None = None
+
+
+def init_song_index(settings: Settings) -> SongIdIndex | None:
+    global _song_index_instance
+    _song_index_instance = SongIdIndex() if settings.song_id_index_enabled else None
+    return _song_index_instance
+
+
+def get_song_index() -> SongIdIndex | None:
+    return _song_index_instance
@@ -3,8 +3,9 @@ from __future__ import annotations
 from typing import Protocol
 
 from mongoengine.connection import get_connection
-from pymongo.errors import OperationFailure
 
+from songs_api.infrastructure.database import transactions_supported
+from songs_api.infrastructure.read_routing import CausalToken
 from songs_api.infrastructure.resources import SystemResources
 from songs_api.repositories import RatingsRepository, SongsRepository, UsersRepository
 
@@ -15,49 +16,37 @@ class IUnitOfWork(Protocol):
 
 
 class UnitOfWork:
-    def __init__(self, resources: SystemResources | None = None, *, use_transactions: bool = False):
+    def __init__(
+        self,
+        resources: SystemResources | None = None,
+        *,
+        use_transactions: bool = False,
+        causal_token: CausalToken | None = None,
+    ):
         self._resources = resources or SystemResources.create_default()
         self._is_active = False
         self._use_transactions = use_transactions
+        self._causal_token = causal_token
 
         self._mongo_session = None
         self._tx_active = False
 
-        self.songs_repository = SongsRepository(self._resources.cache_service)
-        self.ratings_repository = RatingsRepository(self._resources.cache_service)
+        # Cluster/operation time of the last session this unit of work used, set on exit.
+        self.causal_token: CausalToken | None = None
+
+        read_router = self._resources.read_router
+        self.songs_repository = SongsRepository(
+            self._resources.cache_service, read_router=read_router, song_index=self._resources.song_index
+        )
+        self.ratings_repository = RatingsRepository(
+            self._resources.cache_service,
+            read_router=read_router,
+            rating_buffer=self._resources.rating_buffer,
+            rating_prior=self._resources.rating_prior,
+            rating_shards=self._resources.rating_shards,
+        )
         self.users_repository = UsersRepository(self._resources.cache_service)
 
-    @staticmethod
-    def _server_supports_transactions(client) -> bool:
-        """
-        Return True if the connected MongoDB deployment supports multi-document transactions.
-
-        Transactions require:
-        - replica set member (including single-node replica set) OR mongos (sharded cluster)
-        - logical sessions enabled
-        """
-        try:
-            try:
-                hello = client.admin.command("hello")
-            except Exception:
-                # Older servers/drivers may use isMaster
-                hello = client.admin.command("ismaster")
-            is_replset_or_mongos = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
-            has_sessions = hello.get("logicalSessionTimeoutMinutes") is not None
-
-            return is_replset_or_mongos and has_sessions
-        except Exception:
-            return False
-
-    @staticmethod
-    def _safe_abort_transaction(session) -> None:
-        if session is None:
-            return
-        try:
-            session.abort_transaction()
-        except Exception:
-            pass
-
     @staticmethod
     def _safe_end_session(session) -> None:
         if session is None:
@@ -69,23 +58,27 @@ class UnitOfWork:
 
     def _try_begin_transaction(self) -> None:
         client = get_connection(alias="default")
-        if not self._server_supports_transactions(client):
+        if not transactions_supported(client):
             return
 
+        # start_transaction() is client-side only; if the server rejects transactions after
+        # all, the error surfaces on the unit of work's first operation.
         session = None
         try:
             session = client.start_session()
             session.start_transaction()
-
-            # Validate that the server accepts transaction semantics.
-            # On standalone, the first command with a txnNumber will fail with IllegalOperation.
-            client.admin.command("ping", session=session)
-
             self._mongo_session = session
             self._tx_active = True
-        except OperationFailure:
-            self._safe_abort_transaction(session)
+        except Exception:
             self._safe_end_session(session)
+
+    def _begin_causal_session(self, token: CausalToken) -> None:
+        """Start a causally consistent session that will observe the write `token` came from."""
+        session = None
+        try:
+            session = get_connection(alias="default").start_session(causal_consistency=True)
+            token.apply(session)
+            self._mongo_session = session
         except Exception:
             self._safe_end_session(session)
 
@@ -95,11 +88,13 @@ class UnitOfWork:
         if self._use_transactions:
             # MongoDB transactions require a replica set (or sharded cluster).
             self._try_begin_transaction()
+        elif self._causal_token is not None:
+            self._begin_causal_session(self._causal_token)
 
-            if self._tx_active and self._mongo_session is not None:
-                self.songs_repository.mongo_session = self._mongo_session
-                self.ratings_repository.mongo_session = self._mongo_session
-                self.users_repository.mongo_session = self._mongo_session
+        if self._mongo_session is not None:
+            self.songs_repository.mongo_session = self._mongo_session
+            self.ratings_repository.mongo_session = self._mongo_session
+            self.users_repository.mongo_session = self._mongo_session
 
         return self
 
@@ -112,6 +107,7 @@ class UnitOfWork:
                     self._mongo_session.abort_transaction()
         finally:
             if self._mongo_session is not None:
+                self.causal_token = CausalToken.from_session(self._mongo_session)
                 self._mongo_session.end_session()
 
             # Clean up repository session pointers
@@ -1,6 +1,16 @@
 from __future__ import annotations
 
-from mongoengine import DateField, Document, FloatField, IntField, StringField
+from mongoengine import (
+    BooleanField,
+    DateField,
+    DateTimeField,
+    DictField,
+    Document,
+    FloatField,
+    IntField,
+    ObjectIdField,
+    StringField,
+)
 from werkzeug.security import check_password_hash, generate_password_hash
 
 
@@ -24,8 +34,11 @@ class Song(Document):
                 "default_language": "english",
                 "weights": {"artist": 10, "title": 10},
             },
-            ("level", "difficulty"),
-            ("artist", "released"),
+            # `_id` last: the tie-break that keeps pages stable is served by the index too.
+            ("level", "difficulty", "id"),
+            ("artist", "released", "id"),
+            # One song per (artist, title): seeding upserts on it and imports reject duplicates.
+            {"fields": ["artist", "title"], "unique": True},
         ],
     }
 
@@ -35,8 +48,11 @@ class Rating(Document):
 
     song_id = StringField(required=True)
     rating = IntField(required=True, min_value=1, max_value=5)
+    created_at = DateTimeField()
+    # Token of the compaction batch that claimed this rating for the archive (see `compact_ratings`).
+    compaction = ObjectIdField()
 
-    meta = {"collection": "ratings", "indexes": ["song_id"]}
+    meta = {"collection": "ratings", "indexes": ["song_id", {"fields": ["compaction"], "sparse": True}]}
 
 
 class RatingStats(Document):
@@ -47,8 +63,131 @@ class RatingStats(Document):
     sum = IntField(default=0)
     min = IntField(default=5)
     max = IntField(default=1)
+    # Count per star value, keyed "1".."5"; incremented together with `count`.
+    stars = DictField(field=IntField(), default=dict)
+    # Denormalised from Song and sum/count so leaderboards can fall back to an indexed sort.
+    level = IntField()
+    average = FloatField()
+    # Average shrunk toward the catalog-wide mean (see RatingPrior), for ranked browsing.
+    bayesian = FloatField()
+    # Ratings (shards included) that `average` and `bayesian` were computed from.
+    scored_count = IntField()
+    # Set once ratings for this song have gone to RatingStatsShard; readers then add the shards in.
+    sharded = BooleanField(default=False)
+    # Token of the last fold applied from each shard number, so an interrupted fold is applied once.
+    folds = DictField()
 
-    meta = {"collection": "rating_stats", "indexes": ["song_id"]}
+    meta = {
+        "collection": "rating_stats",
+        "indexes": [
+            "song_id",
+            "average",
+            "count",
+            "-bayesian",
+            ("level", "average"),
+            ("level", "count"),
+            ("level", "-bayesian"),
+        ],
+    }
+
+
+class RatingStatsShard(Document):
+    """One of several counter documents absorbing writes for a hot song; folded back periodically."""
+
+    song_id = StringField(required=True)
+    shard = IntField(required=True)
+    count = IntField(default=0)
+    sum = IntField(default=0)
+    min = IntField(default=5)
+    max = IntField(default=1)
+    stars = DictField(field=IntField(), default=dict)
+    # Counts a fold has taken out of this shard and is moving into the song's stats, with its token.
+    pending = DictField()
+
+    meta = {
+        "collection": "rating_stats_shards",
+        "indexes": [{"fields": ["song_id", "shard"], "unique": True}, "count"],
+    }
+
+
+class RatingRollup(Document):
+    """Ratings one song received in one hour or day bucket, for trending without scanning raw ratings."""
+
+    song_id = StringField(required=True)
+    window = StringField(required=True)
+    bucket = DateTimeField(required=True)
+    # Counter shard of a hot song's rollup (see `RatingShards`); None for everything else.
+    shard = IntField()
+    count = IntField(default=0)
+    sum = IntField(default=0)
+    expires_at = DateTimeField(required=True)
+
+    meta = {
+        "collection": "rating_rollups",
+        "indexes": [
+            {"fields": ["window", "bucket", "song_id", "shard"], "unique": True},
+            {"fields": ["expires_at"], "expireAfterSeconds": 0},
+        ],
+    }
+
+
+class RatingArchive(Document):
+    """Raw ratings past the retention window, folded into star counts per song and day."""
+
+    song_id = StringField(required=True)
+    day = DateTimeField(required=True)
+    count = IntField(default=0)
+    # Count per star value, keyed "1".."5", like RatingStats.stars.
+    stars = DictField(field=IntField(), default=dict)
+    # Token of the last compaction batch added in, so an interrupted batch is added once.
+    compaction = ObjectIdField()
+
+    meta = {
+        "collection": "rating_archive",
+        "indexes": [{"fields": ["song_id", "day"], "unique": True}],
+    }
+
+
+class IdempotencyKey(Document):
+    """Response to a request sent with an `Idempotency-Key`, replayed to retries until it expires."""
+
+    # "<route>:<username>:<key>"; inserting it is the atomic reservation.
+    id = StringField(primary_key=True)
+    # SHA-256 of the request body, so a key reused for a different request is rejected.
+    fingerprint = StringField(required=True)
+    # Request holding the reservation; only it may complete or release the key.
+    owner = StringField()
+    # Unset while the first request is still running.
+    status_code = IntField()
+    body = DictField()
+    locked_until = DateTimeField(required=True)
+    expires_at = DateTimeField(required=True)
+
+    meta = {
+        "collection": "idempotency_keys",
+        "indexes": [{"fields": ["expires_at"], "expireAfterSeconds": 0}],
+    }
+
+
+class RatingTotals(Document):
+    """Singleton with catalog-wide rating totals; the prior for Bayesian scores."""
+
+    id = StringField(primary_key=True)
+    count = IntField(default=0)
+    sum = IntField(default=0)
+    # Epoch seconds of the last recomputation from `rating_stats`.
+    refreshed_at = FloatField(default=0.0)
+
+    meta = {"collection": "rating_totals"}
+
+
+class CatalogVersion(Document):
+    """Singleton counter bumped by writers that change songs in place, which the catalog cannot see otherwise."""
+
+    id = StringField(primary_key=True)
+    version = IntField(default=0)
+
+    meta = {"collection": "catalog_version"}
 
 
 class User(Document):
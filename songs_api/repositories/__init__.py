@@ -1,7 +1,7 @@
 """Repository implementations for data access."""
 
 from songs_api.repositories.ratings_repository import RatingsRepository
-from songs_api.repositories.songs_repository import SongsRepository
+from songs_api.repositories.songs_repository import SongListQuery, SongsRepository, UnsupportedQueryError
 from songs_api.repositories.users_repository import UsersRepository
 
-__all__ = ["SongsRepository", "RatingsRepository", "UsersRepository"]
+__all__ = ["SongsRepository", "RatingsRepository", "UsersRepository", "SongListQuery", "UnsupportedQueryError"]
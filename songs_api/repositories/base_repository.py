@@ -4,11 +4,26 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from pymongo.client_session import ClientSession
+    from pymongo.read_preferences import _ServerMode
 
+    from songs_api.constants import ReadRoute
     from songs_api.infrastructure.cache import Cache
+    from songs_api.infrastructure.read_routing import ReadRouter
 
 
 class BaseRepository:
-    def __init__(self, cache_service: Cache | None = None, mongo_session: ClientSession | None = None):
+    def __init__(
+        self,
+        cache_service: Cache | None = None,
+        mongo_session: ClientSession | None = None,
+        read_router: ReadRouter | None = None,
+    ):
         self.cache = cache_service
         self.mongo_session = mongo_session
+        self.read_router = read_router
+
+    def _read_preference(self, route: ReadRoute) -> _ServerMode | None:
+        """Non-primary read preference configured for `route`, or None to use the driver default."""
+        if self.read_router is None:
+            return None
+        return self.read_router.preference(route)
@@ -1,54 +1,568 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING
 
-from songs_api.models.documents import Rating, RatingStats
+from bson import ObjectId
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from songs_api.constants import LeaderboardBy, ReadRoute, TrendingDefaults, TrendingWindow
+from songs_api.models.documents import Rating, RatingArchive, RatingRollup, RatingStats, RatingStatsShard
 from songs_api.repositories.base_repository import BaseRepository
 
 if TYPE_CHECKING:
     from pymongo.client_session import ClientSession
 
     from songs_api.infrastructure.cache import Cache
+    from songs_api.infrastructure.rating_buffer import RatingBuffer
+    from songs_api.infrastructure.rating_prior import RatingPrior
+    from songs_api.infrastructure.rating_queue import RatingQueue
+    from songs_api.infrastructure.rating_shards import RatingShards
+    from songs_api.infrastructure.read_routing import ReadRouter
+
+_BUCKET_SPAN = {TrendingWindow.HOUR: timedelta(hours=1), TrendingWindow.DAY: timedelta(days=1)}
+_BUCKET_RETENTION = {
+    TrendingWindow.HOUR: timedelta(hours=TrendingDefaults.HOUR_RETENTION_HOURS),
+    TrendingWindow.DAY: timedelta(days=TrendingDefaults.DAY_RETENTION_DAYS),
+}
+_DUPLICATE_KEY = 11000
 
 
 class RatingsRepository(BaseRepository):
-    def __init__(self, cache_service: Cache | None = None, mongo_session: ClientSession | None = None):
-        super().__init__(cache_service, mongo_session=mongo_session)
+    def __init__(
+        self,
+        cache_service: Cache | None = None,
+        mongo_session: ClientSession | None = None,
+        read_router: ReadRouter | None = None,
+        rating_buffer: RatingBuffer | RatingQueue | None = None,
+        rating_prior: RatingPrior | None = None,
+        rating_shards: RatingShards | None = None,
+    ):
+        super().__init__(cache_service, mongo_session=mongo_session, read_router=read_router)
+        self.rating_buffer = rating_buffer
+        self.rating_prior = rating_prior
+        self.rating_shards = rating_shards
 
-    def add_rating(self, song_id: str, rating: int) -> RatingStats:
-        # MongoEngine session support is not consistent across APIs/versions.
-        # In particular, QuerySet.update_one() does not accept `session=` in many versions.
-        # When a transaction session is active, we use the underlying PyMongo collections directly.
-        if self.mongo_session is None:
-            Rating(song_id=song_id, rating=rating).save()
-            RatingStats.objects(song_id=song_id).update_one(
-                inc__count=1,
-                inc__sum=rating,
-                min__min=rating,
-                max__max=rating,
-                set_on_insert__song_id=song_id,
-                upsert=True,
-            )
-            stats = RatingStats.objects(song_id=song_id).first()
+    def add_rating(self, song_id: str, rating: int, level: int | None = None) -> RatingStats | None:
+        """Record a rating and return the updated stats, or None if it was buffered for write-behind."""
+        if self.rating_buffer is not None:
+            self.rating_buffer.add(song_id, rating)
+            return None
+
+        # PyMongo directly: MongoEngine's QuerySet.update_one()/modify() do not accept `session=`
+        # consistently across versions. A single find_one_and_update updates the counters and
+        # scores and returns the post-update stats atomically, so there is no read-back and no
+        # window for a concurrent writer.
+        now = datetime.now(UTC)
+        Rating._get_collection().insert_one(
+            {"song_id": song_id, "rating": rating, "created_at": now}, session=self.mongo_session
+        )
+        if self.rating_shards is not None and self.rating_shards.should_shard(song_id):
+            stats = self._add_sharded_rating(song_id, rating, level)
+            self._add_to_rollups([(song_id, rating)], now, shard=self.rating_shards.pick())
             return stats
 
+        doc = RatingStats._get_collection().find_one_and_update(
+            {"song_id": song_id},
+            self._stats_pipeline({"count": 1, "sum": rating, f"stars.{rating}": 1}, rating, rating, level),
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            session=self.mongo_session,
+        )
+        self._add_to_rollups([(song_id, rating)], now)
+        stats = self._stats_from_doc(doc)
+        if stats.sharded:
+            # Cooled down with unfolded shards: scored from the merged stats instead.
+            self._store_scores(self._merge_shards([stats]))
+        return stats
+
+    def add_ratings(
+        self, ratings: list[tuple[str, int]], levels: dict[str, int] | None = None
+    ) -> dict[str, RatingStats] | None:
+        """Record several ratings and return the resulting stats per song, or None if they were buffered."""
+        if self.rating_buffer is not None:
+            self.rating_buffer.add_many(ratings)
+            return None
+
+        return self.bulk_add_ratings(ratings, levels)
+
+    def bulk_add_ratings(
+        self,
+        ratings: list[tuple[str, int]],
+        levels: dict[str, int] | None = None,
+        rating_ids: list[ObjectId] | None = None,
+    ) -> dict[str, RatingStats]:
+        """Insert raw ratings with `insert_many` and apply one coalesced stats update per song in a `bulk_write`.
+
+        `rating_ids`, parallel to `ratings`, sets the `_id` of each raw rating (see
+        `existing_rating_ids`). Returns the resulting stats per song.
+        """
+        if not ratings:
+            return {}
+        levels = levels or {}
+
+        increments: dict[str, dict[str, int]] = {}
+        bounds: dict[str, tuple[int, int]] = {}
+        for song_id, rating in ratings:
+            inc = increments.setdefault(song_id, {"count": 0, "sum": 0})
+            inc["count"] += 1
+            inc["sum"] += rating
+            inc[f"stars.{rating}"] = inc.get(f"stars.{rating}", 0) + 1
+            low, high = bounds.get(song_id, (rating, rating))
+            bounds[song_id] = (min(low, rating), max(high, rating))
+
+        now = datetime.now(UTC)
+        docs = [{"song_id": song_id, "rating": rating, "created_at": now} for song_id, rating in ratings]
+        if rating_ids is not None:
+            for doc, rating_id in zip(docs, rating_ids, strict=True):
+                doc["_id"] = rating_id
+        Rating._get_collection().insert_many(docs, ordered=False, session=self.mongo_session)
+        stats_coll = RatingStats._get_collection()
+        stats_coll.bulk_write(
+            [
+                UpdateOne(
+                    {"song_id": song_id},
+                    self._stats_pipeline(inc, *bounds[song_id], levels.get(song_id)),
+                    upsert=True,
+                )
+                for song_id, inc in increments.items()
+            ],
+            ordered=False,
+            session=self.mongo_session,
+        )
+
+        self._add_to_rollups(ratings, now)
+
+        # Read back from the primary (no read preference): this may run inside the write transaction.
+        cursor = stats_coll.find({"song_id": {"$in": list(increments)}}, session=self.mongo_session)
+        stats_by_song = {doc["song_id"]: self._stats_from_doc(doc) for doc in cursor}
+        self._store_scores([stats for stats in self._merge_shards(list(stats_by_song.values())) if stats.sharded])
+        return stats_by_song
+
+    def existing_rating_ids(self, rating_ids: list[ObjectId]) -> set[ObjectId]:
+        """Which of these raw rating `_id`s are already stored, to skip redelivered ratings."""
+        cursor = Rating._get_collection().find({"_id": {"$in": rating_ids}}, {"_id": 1}, session=self.mongo_session)
+        return {doc["_id"] for doc in cursor}
+
+    def fold_shards(self) -> int:
+        """Move the counts of sharded hot songs back into their `RatingStats` documents.
+
+        Safe to interrupt without transactions. A shard first moves what it holds into its own
+        `pending` field in one update, so ratings landing on it meanwhile stay in the shard.
+        The stats document then takes the pending counts in an update guarded by that fold's
+        token, and the shard drops `pending`; a run stopped between the steps is finished by
+        the next one without counting anything twice. Emptied shards are deleted and songs
+        left without shards are unflagged. Returns the number of songs folded.
+        """
+        shards_coll = RatingStatsShard._get_collection()
+        stats_coll = RatingStats._get_collection()
+        folded: set[str] = set()
+        cursor = shards_coll.find(
+            {"$or": [{"count": {"$gt": 0}}, {"pending": {"$exists": True}}]}, session=self.mongo_session
+        )
+        for doc in cursor:
+            pending = doc.get("pending") or self._claim_shard(doc)
+            if pending is None:
+                continue
+            inc = {"count": pending["count"], "sum": pending["sum"]}
+            inc.update((f"stars.{star}", count) for star, count in pending["stars"].items())
+            update = self._stats_update(doc["song_id"], inc, pending["min"], pending["max"], None)
+            update["$set"] = {f"folds.{doc['shard']}": pending["token"]}
+            try:
+                stats_coll.update_one(
+                    {"song_id": doc["song_id"], f"folds.{doc['shard']}": {"$ne": pending["token"]}},
+                    update,
+                    upsert=True,
+                    session=self.mongo_session,
+                )
+            except DuplicateKeyError:
+                pass  # The stats document took this fold before the run was interrupted.
+            shards_coll.update_one(
+                {"_id": doc["_id"], "pending.token": pending["token"]},
+                {"$unset": {"pending": ""}},
+                session=self.mongo_session,
+            )
+            folded.add(doc["song_id"])
+        shards_coll.delete_many({"count": 0, "pending": {"$exists": False}}, session=self.mongo_session)
+
+        if folded:
+            remaining = set(shards_coll.distinct("song_id", {"song_id": {"$in": list(folded)}}))
+            emptied = list(folded - remaining)
+            if emptied:
+                stats_coll.update_many(
+                    {"song_id": {"$in": emptied}}, {"$set": {"sharded": False}}, session=self.mongo_session
+                )
+                # A hot write flags its song after its shard `$inc`, so only a shard opened before
+                # the unflagging can have been missed here.
+                reopened = shards_coll.distinct("song_id", {"song_id": {"$in": emptied}})
+                if reopened:
+                    stats_coll.update_many(
+                        {"song_id": {"$in": reopened}}, {"$set": {"sharded": True}}, session=self.mongo_session
+                    )
+            cursor = stats_coll.find({"song_id": {"$in": list(folded)}}, session=self.mongo_session)
+            self._store_scores(self._merge_shards([self._stats_from_doc(doc) for doc in cursor]))
+        return len(folded)
+
+    def _claim_shard(self, doc: dict) -> dict | None:
+        """Move a shard's counts, as read, into its `pending` field; None if another fold claimed it first."""
+        stars = {star: count for star, count in doc.get("stars", {}).items() if count}
+        pending = {
+            "token": ObjectId(),
+            "count": doc["count"],
+            "sum": doc["sum"],
+            "stars": stars,
+            "min": doc["min"],
+            "max": doc["max"],
+        }
+        dec = {"count": -doc["count"], "sum": -doc["sum"]}
+        dec.update((f"stars.{star}", -count) for star, count in stars.items())
+        claimed = RatingStatsShard._get_collection().update_one(
+            {"_id": doc["_id"], "pending": {"$exists": False}},
+            {"$inc": dec, "$set": {"pending": pending}},
+            session=self.mongo_session,
+        )
+        return pending if claimed.modified_count else None
+
+    def rescore(self) -> int:
+        """Recompute every rated song's stored Bayesian score against the current prior.
+
+        One server-side `update_many` for songs on a single stats document; songs with counter
+        shards are merged and scored individually. Returns the number of songs rescored.
+        """
+        stats_coll = RatingStats._get_collection()
+        rescored = stats_coll.update_many(
+            {"count": {"$gt": 0}, "sharded": {"$ne": True}},
+            [{"$set": {"bayesian": self._bayesian_expression()}}],
+            session=self.mongo_session,
+        ).matched_count
+        cursor = stats_coll.find({"sharded": True}, session=self.mongo_session)
+        sharded = self._merge_shards([self._stats_from_doc(doc) for doc in cursor])
+        self._store_scores(sharded)
+        return rescored + sum(1 for stats in sharded if stats.count)
+
+    def compact_ratings(self, before: datetime, limit: int) -> int:
+        """Fold up to `limit` raw ratings older than `before` into daily archive buckets and delete them.
+
+        Oldest first by `_id`, whose timestamp also dates ratings stored before `created_at`
+        existed. Safe to interrupt without transactions: the batch is first claimed by setting
+        a token on its raw ratings, each archive bucket records the last token it took, and
+        the ratings are deleted last. A batch stopped part-way is finished, once, before the
+        next one is claimed. Returns the number of ratings compacted; 0 once none are left.
+        """
+        resumed = self.finish_compaction()
+        if resumed:
+            return resumed
+
+        ratings_coll = Rating._get_collection()
+        cursor = ratings_coll.find(
+            {"_id": {"$lt": ObjectId.from_datetime(before)}}, {"_id": 1}, session=self.mongo_session
+        )
+        ids = [doc["_id"] for doc in cursor.sort("_id", 1).limit(limit)]
+        if not ids:
+            return 0
+        token = ObjectId()
+        ratings_coll.update_many(
+            {"_id": {"$in": ids}, "compaction": {"$exists": False}},
+            {"$set": {"compaction": token}},
+            session=self.mongo_session,
+        )
+        return self._archive_batch(token)
+
+    def finish_compaction(self) -> int:
+        """Archive and delete the batch an interrupted `compact_ratings` claimed, if any. Returns its size."""
+        claimed = Rating._get_collection().find_one(
+            {"compaction": {"$exists": True}}, {"compaction": 1}, session=self.mongo_session
+        )
+        return self._archive_batch(claimed["compaction"]) if claimed else 0
+
+    def _archive_batch(self, token: ObjectId) -> int:
         ratings_coll = Rating._get_collection()
+        docs = list(
+            ratings_coll.find(
+                {"compaction": token}, {"song_id": 1, "rating": 1, "created_at": 1}, session=self.mongo_session
+            )
+        )
+        if not docs:
+            return 0
+
+        buckets: dict[tuple[str, datetime], dict[str, int]] = {}
+        for doc in docs:
+            day = self._bucket_start(TrendingWindow.DAY, doc.get("created_at") or doc["_id"].generation_time)
+            inc = buckets.setdefault((doc["song_id"], day), {"count": 0})
+            inc["count"] += 1
+            star = f"stars.{doc['rating']}"
+            inc[star] = inc.get(star, 0) + 1
+
+        try:
+            RatingArchive._get_collection().bulk_write(
+                [
+                    UpdateOne(
+                        {"song_id": song_id, "day": day, "compaction": {"$ne": token}},
+                        {"$inc": inc, "$set": {"compaction": token}},
+                        upsert=True,
+                    )
+                    for (song_id, day), inc in buckets.items()
+                ],
+                ordered=False,
+                session=self.mongo_session,
+            )
+        except BulkWriteError as exc:
+            # Duplicate keys are buckets that took this batch before the run was interrupted.
+            if any(error["code"] != _DUPLICATE_KEY for error in exc.details.get("writeErrors", [])):
+                raise
+        ratings_coll.delete_many({"compaction": token}, session=self.mongo_session)
+        return len(docs)
+
+    def top_rated(self, by: LeaderboardBy, level: int | None, limit: int) -> list[RatingStats]:
+        """Highest `average` or `count` first, served by the `(level, <field>)` and `<field>` indexes."""
         stats_coll = RatingStats._get_collection()
+        preference = self._read_preference(ReadRoute.STATS)
+        if preference:
+            stats_coll = stats_coll.with_options(read_preference=preference)
+        query = {"count": {"$gt": 0}}
+        if level is not None:
+            query["level"] = level
+        cursor = stats_coll.find(query, session=self.mongo_session).sort(by.value, DESCENDING).limit(limit)
+        return [self._stats_from_doc(doc) for doc in cursor]
 
-        ratings_coll.insert_one({"song_id": song_id, "rating": rating}, session=self.mongo_session)
-        stats_coll.update_one(
-            {"song_id": song_id},
-            {
-                "$inc": {"count": 1, "sum": rating},
-                "$min": {"min": rating},
-                "$max": {"max": rating},
-                "$setOnInsert": {"song_id": song_id},
-            },
+    def ranked(self, level: int | None, skip: int, limit: int) -> tuple[list[RatingStats], int]:
+        """Rated songs by Bayesian score, best first, served by the `bayesian` indexes."""
+        stats_coll = RatingStats._get_collection()
+        preference = self._read_preference(ReadRoute.STATS)
+        if preference:
+            stats_coll = stats_coll.with_options(read_preference=preference)
+        query = {"bayesian": {"$ne": None}}
+        if level is not None:
+            query["level"] = level
+        cursor = stats_coll.find(query, session=self.mongo_session).sort("bayesian", DESCENDING).skip(skip).limit(limit)
+        stats = [self._stats_from_doc(doc) for doc in cursor]
+        return stats, stats_coll.count_documents(query, session=self.mongo_session)
+
+    def trending(self, window: TrendingWindow, limit: int, now: datetime | None = None) -> list[dict]:
+        """Songs with the most ratings in the last `window`, from the current and previous rollup buckets.
+
+        The previous bucket is weighted by the part of it still inside the sliding window, so a
+        song's score estimates its ratings over the last hour/day without touching raw ratings.
+        Returns `{"song_id", "ratings", "count", "sum"}` dicts, highest `ratings` first.
+        """
+        now = self._utc(now or datetime.now(UTC))
+        current = self._bucket_start(window, now)
+        previous = current - _BUCKET_SPAN[window]
+        previous_weight = 1 - (now - current) / _BUCKET_SPAN[window]
+
+        rollups_coll = RatingRollup._get_collection()
+        preference = self._read_preference(ReadRoute.STATS)
+        if preference:
+            rollups_coll = rollups_coll.with_options(read_preference=preference)
+        weighted = {"$cond": [{"$eq": ["$bucket", current]}, 1, previous_weight]}
+        cursor = rollups_coll.aggregate(
+            [
+                {"$match": {"window": window.value, "bucket": {"$in": [current, previous]}}},
+                {
+                    "$group": {
+                        "_id": "$song_id",
+                        "ratings": {"$sum": {"$multiply": ["$count", weighted]}},
+                        "count": {"$sum": "$count"},
+                        "sum": {"$sum": "$sum"},
+                    }
+                },
+                {"$sort": {"ratings": DESCENDING, "_id": 1}},
+                {"$limit": limit},
+            ],
+            session=self.mongo_session,
+        )
+        return [
+            {"song_id": doc["_id"], "ratings": doc["ratings"], "count": doc["count"], "sum": doc["sum"]}
+            for doc in cursor
+        ]
+
+    def _add_sharded_rating(self, song_id: str, rating: int, level: int | None) -> RatingStats:
+        """`$inc` a random counter shard instead of the hot song's stats document, then read the merged stats.
+
+        The stats document is only written by the song's first sharded rating. Its stored
+        scores are left to `fold_shards`; the returned stats are scored in memory.
+        """
+        RatingStatsShard._get_collection().update_one(
+            {"song_id": song_id, "shard": self.rating_shards.pick()},
+            self._stats_update(song_id, {"count": 1, "sum": rating, f"stars.{rating}": 1}, rating, rating, None),
             upsert=True,
             session=self.mongo_session,
         )
+        stats_coll = RatingStats._get_collection()
+        doc = stats_coll.find_one({"song_id": song_id}, session=self.mongo_session)
+        if doc is None or not doc.get("sharded"):
+            # Only the first sharded write per song writes to its stats document.
+            flags = {"sharded": True} if level is None else {"sharded": True, "level": level}
+            doc = stats_coll.find_one_and_update(
+                {"song_id": song_id},
+                {"$set": flags, "$setOnInsert": {"song_id": song_id}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+                session=self.mongo_session,
+            )
+        stats = self._merge_shards([self._stats_from_doc(doc)])[0]
+        if self.rating_prior is not None and stats.count:
+            stats.bayesian = self.rating_prior.score(stats.sum, stats.count)
+        return stats
+
+    def _merge_shards(self, stats: list[RatingStats]) -> list[RatingStats]:
+        """Add the counter shards of sharded songs into their stats, in place."""
+        sharded = {item.song_id: item for item in stats if item.sharded}
+        if not sharded:
+            return stats
+
+        shards_coll = RatingStatsShard._get_collection()
+        preference = self._read_preference(ReadRoute.STATS)
+        if preference and self.mongo_session is None:
+            shards_coll = shards_coll.with_options(read_preference=preference)
+        for doc in shards_coll.find({"song_id": {"$in": list(sharded)}}, session=self.mongo_session):
+            item = sharded[doc["song_id"]]
+            parts = [doc] if doc.get("count") else []
+            # Counts a fold has taken out of the shard but not yet into the stats document.
+            pending = doc.get("pending")
+            if pending and item.folds.get(str(doc["shard"])) != pending["token"]:
+                parts.append(pending)
+            for part in parts:
+                item.min = min(item.min, part["min"]) if item.count else part["min"]
+                item.max = max(item.max, part["max"]) if item.count else part["max"]
+                item.count += part["count"]
+                item.sum += part["sum"]
+                stars = dict(item.stars)
+                for star, count in part.get("stars", {}).items():
+                    stars[star] = stars.get(star, 0) + count
+                item.stars = stars
+        for item in sharded.values():
+            item.average = item.sum / item.count if item.count else None
+        return stats
 
+    def _add_to_rollups(self, ratings: list[tuple[str, int]], now: datetime, shard: int | None = None) -> None:
+        """`$inc` the hourly and daily rollup of each rated song, one upsert per song and bucket.
+
+        Hot songs pass a counter `shard`, spreading their rollups over one document per shard;
+        `trending` sums them per song.
+        """
+        increments: dict[tuple[str, TrendingWindow], list[int]] = {}
+        for song_id, rating in ratings:
+            for window in TrendingWindow:
+                inc = increments.setdefault((song_id, window), [0, 0])
+                inc[0] += 1
+                inc[1] += rating
+
+        updates = []
+        for (song_id, window), (count, total) in increments.items():
+            bucket = self._bucket_start(window, now)
+            updates.append(
+                UpdateOne(
+                    {"window": window.value, "bucket": bucket, "song_id": song_id, "shard": shard},
+                    {
+                        "$inc": {"count": count, "sum": total},
+                        "$setOnInsert": {"expires_at": bucket + _BUCKET_SPAN[window] + _BUCKET_RETENTION[window]},
+                    },
+                    upsert=True,
+                )
+            )
+        RatingRollup._get_collection().bulk_write(updates, ordered=False, session=self.mongo_session)
+
+    @staticmethod
+    def _utc(moment: datetime) -> datetime:
+        # Naive UTC, which is how MongoDB hands dates back, so bucket comparisons match exactly.
+        return moment.astimezone(UTC).replace(tzinfo=None) if moment.tzinfo else moment
+
+    @classmethod
+    def _bucket_start(cls, window: TrendingWindow, moment: datetime) -> datetime:
+        start = cls._utc(moment).replace(minute=0, second=0, microsecond=0)
+        return start.replace(hour=0) if window == TrendingWindow.DAY else start
+
+    def _store_scores(self, stats: Iterable[RatingStats]) -> None:
+        """Persist `sum / count` and the Bayesian score for the indexed rankings.
+
+        `stats` must already include the song's counter shards. Guarded on `scored_count`, the
+        count the stored scores were computed from, so a slower writer cannot overwrite the
+        scores of a newer update; shard writes leave the document's own `count` unchanged.
+        """
+        updates = []
+        for item in stats:
+            if not item.count:
+                continue
+            scores = {"average": item.average, "scored_count": item.count}
+            if self.rating_prior is not None:
+                item.bayesian = self.rating_prior.score(item.sum, item.count)
+                scores["bayesian"] = item.bayesian
+            updates.append(UpdateOne({"_id": item.id, "scored_count": {"$not": {"$gt": item.count}}}, {"$set": scores}))
+        if updates:
+            RatingStats._get_collection().bulk_write(updates, ordered=False, session=self.mongo_session)
+
+    def _stats_pipeline(self, inc: dict[str, int], low: int, high: int, level: int | None) -> list[dict]:
+        """`_stats_update` as an update pipeline that also computes `average` and `bayesian` in the same write.
+
+        Sharded songs keep their stored scores: their own counters are partial, so they are
+        scored by `_store_scores` once the shards are merged.
+        """
+        counters = {field: {"$add": [{"$ifNull": [f"${field}", 0]}, value]} for field, value in inc.items()}
+        counters["min"] = {"$min": [{"$ifNull": ["$min", low]}, low]}
+        counters["max"] = {"$max": [{"$ifNull": ["$max", high]}, high]}
+        if level is not None:
+            counters["level"] = level
+
+        unsharded = {"$ne": [{"$ifNull": ["$sharded", False]}, True]}
+        scores = {
+            "average": {"$cond": [unsharded, {"$divide": ["$sum", "$count"]}, "$average"]},
+            "scored_count": {"$cond": [unsharded, "$count", "$scored_count"]},
+        }
+        if self.rating_prior is not None:
+            scores["bayesian"] = {"$cond": [unsharded, self._bayesian_expression(), "$bayesian"]}
+        return [{"$set": counters}, {"$set": scores}]
+
+    def _bayesian_expression(self) -> dict:
+        """`RatingPrior.score` as an aggregation expression over the document's `sum` and `count`."""
+        weight = self.rating_prior.weight
+        return {"$divide": [{"$add": [weight * self.rating_prior.mean, "$sum"]}, {"$add": [weight, "$count"]}]}
+
+    @staticmethod
+    def _stats_update(song_id: str, inc: dict[str, int], low: int, high: int, level: int | None) -> dict:
+        update = {
+            "$inc": inc,
+            "$min": {"min": low},
+            "$max": {"max": high},
+            "$setOnInsert": {"song_id": song_id},
+        }
+        if level is not None:
+            update["$set"] = {"level": level}
+        return update
+
+    def get_rating_stats(self, song_id: str) -> RatingStats | None:
+        preference = self._read_preference(ReadRoute.STATS)
+        if self.mongo_session is None:
+            queryset = RatingStats.objects.read_preference(preference) if preference else RatingStats.objects
+            stats = queryset(song_id=song_id).first()
+            return self._merge_shards([stats])[0] if stats else None
+
+        # A causally consistent session: route through PyMongo so the session is honoured.
+        stats_coll = RatingStats._get_collection()
+        if preference:
+            stats_coll = stats_coll.with_options(read_preference=preference)
         doc = stats_coll.find_one({"song_id": song_id}, session=self.mongo_session)
+        if doc is None:
+            return None
+        return self._merge_shards([self._stats_from_doc(doc)])[0]
+
+    def get_rating_stats_many(self, song_ids: list[str]) -> dict[str, RatingStats]:
+        """Stats for several songs with a single `$in` query, keyed by song ID."""
+        if not song_ids:
+            return {}
+        stats_coll = RatingStats._get_collection()
+        preference = self._read_preference(ReadRoute.STATS)
+        if preference:
+            stats_coll = stats_coll.with_options(read_preference=preference)
+        cursor = stats_coll.find({"song_id": {"$in": song_ids}}, session=self.mongo_session)
+        stats_by_song = {doc["song_id"]: self._stats_from_doc(doc) for doc in cursor}
+        self._merge_shards(list(stats_by_song.values()))
+        return stats_by_song
+
+    @staticmethod
+    def _stats_from_doc(doc: dict) -> RatingStats:
         return RatingStats(
             id=doc["_id"],
             song_id=doc["song_id"],
@@ -56,7 +570,10 @@ class RatingsRepository(BaseRepository):
             sum=doc.get("sum", 0),
             min=doc.get("min", 5),
             max=doc.get("max", 1),
+            stars=doc.get("stars", {}),
+            level=doc.get("level"),
+            average=doc["sum"] / doc["count"] if doc.get("count") else None,
+            bayesian=doc.get("bayesian"),
+            sharded=doc.get("sharded", False),
+            folds=doc.get("folds", {}),
         )
-
-    def get_rating_stats(self, song_id: str) -> RatingStats | None:
-        return RatingStats.objects(song_id=song_id).first()
@@ -1,55 +1,268 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date
 from typing import TYPE_CHECKING
 
+import numpy as np
+from bson import ObjectId
 from mongoengine import Q
+from pymongo.errors import BulkWriteError
 
-from songs_api.models.documents import Song
+from songs_api.constants import ReadRoute, SongSort
+from songs_api.models.documents import CatalogVersion, Song
 from songs_api.repositories.base_repository import BaseRepository
 
 if TYPE_CHECKING:
+    from mongoengine.queryset import QuerySet
     from pymongo.client_session import ClientSession
+    from pymongo.collection import Collection
 
     from songs_api.infrastructure.cache import Cache
+    from songs_api.infrastructure.read_routing import ReadRouter
+    from songs_api.infrastructure.song_index import SongIdIndex
+
+
+@dataclass(frozen=True)
+class SongListQuery:
+    """Filters and sort order for `SongsRepository.list_songs`. `sort=None` picks the shape's natural order."""
+
+    level: int | None = None
+    artist: str | None = None
+    difficulty_min: float | None = None
+    difficulty_max: float | None = None
+    released_from: date | None = None
+    released_to: date | None = None
+    sort: SongSort | None = None
+
+    @property
+    def filter_fields(self) -> frozenset[str]:
+        fields = set()
+        if self.level is not None:
+            fields.add("level")
+        if self.artist is not None:
+            fields.add("artist")
+        if self.difficulty_min is not None or self.difficulty_max is not None:
+            fields.add("difficulty")
+        if self.released_from is not None or self.released_to is not None:
+            fields.add("released")
+        return frozenset(fields)
+
+
+# Every supported (filter fields, sort field) shape and the index that serves it. Equality filters
+# come first and the range/sort field is the index suffix, so each shape is an index prefix scan with
+# no in-memory sort. `_id` closes every index so equal sort values still page in a fixed order.
+# Shapes not listed here would fall back to a collection scan and are rejected.
+LIST_QUERY_INDEXES: dict[tuple[frozenset[str], str], str] = {
+    (frozenset(), "id"): "_id_",
+    (frozenset({"level"}), "difficulty"): "level_1_difficulty_1__id_1",
+    (frozenset({"level", "difficulty"}), "difficulty"): "level_1_difficulty_1__id_1",
+    (frozenset({"artist"}), "released"): "artist_1_released_1__id_1",
+    (frozenset({"artist", "released"}), "released"): "artist_1_released_1__id_1",
+}
+
+
+_COLUMN_BATCH_SIZE = 5000
+_DUPLICATE_KEY = 11000
+CATALOG_VERSION_ID = "songs"
+
+
+def _with_id_tiebreak(order: str) -> tuple[str, ...]:
+    field = order.lstrip("-")
+    if field == "id":
+        return (order,)
+    return order, "-id" if order.startswith("-") else "id"
+
+
+def _write_error_message(error: dict) -> str:
+    if error.get("code") == _DUPLICATE_KEY:
+        return "A song with this artist and title already exists"
+    return error.get("errmsg", "Write error")
+
+
+class UnsupportedQueryError(ValueError):
+    """Raised when a list query shape is not backed by an index."""
 
 
 class SongsRepository(BaseRepository):
-    def __init__(self, cache_service: Cache | None = None, mongo_session: ClientSession | None = None):
-        super().__init__(cache_service, mongo_session=mongo_session)
+    def __init__(
+        self,
+        cache_service: Cache | None = None,
+        mongo_session: ClientSession | None = None,
+        read_router: ReadRouter | None = None,
+        song_index: SongIdIndex | None = None,
+    ):
+        super().__init__(cache_service, mongo_session=mongo_session, read_router=read_router)
+        self.song_index = song_index
+
+    @staticmethod
+    def plan_list_query(query: SongListQuery) -> tuple[tuple[str, ...], str] | None:
+        """Return `(order_by, index_name)` for an index-backed query shape, or None if unsupported.
+
+        `order_by` ends with `id` in the sort's direction, so ties page deterministically.
+        """
+        fields = query.filter_fields
+        if query.sort is None:
+            for (shape_fields, sort_field), index_name in LIST_QUERY_INDEXES.items():
+                if shape_fields == fields:
+                    return _with_id_tiebreak(sort_field), index_name
+            return None
 
-    def bulk_insert(self, songs: list[Song], *, load_bulk: bool = False) -> None:
+        sort_field = query.sort.value.lstrip("-")
+        index_name = LIST_QUERY_INDEXES.get((fields, sort_field))
+        if index_name is None:
+            return None
+        return _with_id_tiebreak(query.sort.value), index_name
+
+    def bulk_insert(self, songs: list[Song]) -> dict[int, str]:
+        """Insert songs with one unordered `insert_many`, returning `{index: error}` for rejected rows.
+
+        Unordered inserts continue past a failing document, so one bad row does not abort the
+        batch. Inserted songs get their generated `id` assigned.
+        """
         if not songs:
-            return
-        # Not all mongoengine versions support `session=` for QuerySet.insert().
-        if self.mongo_session is None:
-            Song.objects.insert(songs, load_bulk=load_bulk)
-            return
+            return {}
+        docs = [song.to_mongo().to_dict() for song in songs]
+        errors: dict[int, str] = {}
         try:
-            Song.objects.insert(songs, load_bulk=load_bulk, session=self.mongo_session)
-        except TypeError:
-            Song.objects.insert(songs, load_bulk=load_bulk)
+            Song._get_collection().insert_many(docs, ordered=False, session=self.mongo_session)
+        except BulkWriteError as exc:
+            errors = {err["index"]: _write_error_message(err) for err in exc.details.get("writeErrors", [])}
+
+        for index, (song, doc) in enumerate(zip(songs, docs, strict=True)):
+            if index not in errors:
+                song.id = doc["_id"]
+        if self.song_index is not None:
+            self.song_index.add((doc["_id"], doc["level"]) for index, doc in enumerate(docs) if index not in errors)
+        return errors
+
+    def bump_catalog_version(self) -> None:
+        """Record that songs changed in place, so in-memory catalogs reload on their next version check.
 
-    def list_songs(self, skip: int, limit: int) -> tuple[list[Song], int]:
-        total = Song.objects.count()
-        songs = list(Song.objects.skip(skip).limit(limit).order_by("id"))
+        Inserts change the collection's count and newest `_id` and need no bump.
+        """
+        CatalogVersion._get_collection().update_one(
+            {"_id": CATALOG_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True, session=self.mongo_session
+        )
+
+    def list_songs(self, skip: int, limit: int, query: SongListQuery | None = None) -> tuple[list[Song], int]:
+        query = query or SongListQuery()
+        plan = self.plan_list_query(query)
+        if plan is None:
+            raise UnsupportedQueryError(f"Unsupported filter/sort combination: {sorted(query.filter_fields)}")
+        order_by, index_name = plan
+
+        queryset = self._catalog_songs()(self._list_filter(query)).hint(index_name)
+        total = queryset.count()
+        songs = list(queryset.order_by(*order_by).skip(skip).limit(limit))
         return songs, total
 
     def search_songs(self, query: str, skip: int, limit: int) -> tuple[list[Song], int]:
         q_filter = Q(artist__icontains=query) | Q(title__icontains=query)
-        total = Song.objects(q_filter).count()
-        songs = list(Song.objects(q_filter).skip(skip).limit(limit).order_by("id"))
+        queryset = self._catalog_songs()(q_filter)
+        total = queryset.count()
+        songs = list(queryset.skip(skip).limit(limit).order_by("id"))
         return songs, total
 
     def get_average_difficulty(self, level: int | None = None) -> float | None:
-        queryset = Song.objects
+        queryset = self._catalog_songs()
         if level is not None:
             queryset = queryset.filter(level=level)
 
         result = queryset.average("difficulty")
         return float(result) if result is not None else None
 
+    def get_difficulty_columns(self, level: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return `(levels, difficulties)` arrays streamed from a projected cursor."""
+        spec = {} if level is None else {"level": level}
+        cursor = self._catalog_collection().find(
+            spec, {"level": 1, "difficulty": 1, "_id": 0}, batch_size=_COLUMN_BATCH_SIZE
+        )
+        levels, difficulties = [], []
+        for doc in cursor:
+            levels.append(doc["level"])
+            difficulties.append(doc["difficulty"])
+        return np.array(levels, dtype=np.int64), np.array(difficulties, dtype=np.float64)
+
+    def iter_song_batches(self, batch_size: int) -> Iterator[list[dict]]:
+        """Stream raw song documents in `_id` order, `batch_size` at a time, from one server-side cursor."""
+        cursor = self._catalog_collection().find({}, sort=[("_id", 1)], batch_size=batch_size)
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def exists(self, song_id: str) -> bool:
+        """Whether a song exists, answered from the in-memory ID index when it knows the song."""
+        return self.get_level(song_id) is not None
+
+    def get_level(self, song_id: str) -> int | None:
+        """The song's level, or None if there is no such song. Uses the ID index when it can."""
+        return self.get_levels({song_id}).get(song_id)
+
+    def get_levels(self, song_ids: set[str]) -> dict[str, int]:
+        """Level per existing song in `song_ids`, with one `$in` query for those the ID index lacks."""
+        levels: dict[str, int] = {}
+        unknown: list[ObjectId] = []
+        for song_id in song_ids:
+            if not ObjectId.is_valid(song_id):
+                continue
+            object_id = ObjectId(song_id)
+            level = self.song_index.level_of(object_id) if self.song_index is not None else None
+            if level is None:
+                unknown.append(object_id)
+            else:
+                levels[song_id] = level
+        if not unknown:
+            return levels
+
+        cursor = Song._get_collection().find({"_id": {"$in": unknown}}, {"level": 1}, session=self.mongo_session)
+        found = [(doc["_id"], doc["level"]) for doc in cursor]
+        if self.song_index is not None:
+            self.song_index.add(found)
+        levels.update((str(object_id), level) for object_id, level in found)
+        return levels
+
     def get_by_id(self, song_id: str) -> Song | None:
         try:
             return Song.objects(id=song_id).first()
         except Exception:
             return None
+
+    def get_by_ids(self, song_ids: list[str]) -> dict[str, Song]:
+        """Songs for several IDs with a single `$in` query, keyed by ID; invalid or unknown IDs are omitted."""
+        object_ids = [ObjectId(song_id) for song_id in song_ids if ObjectId.is_valid(song_id)]
+        if not object_ids:
+            return {}
+        return {str(song.id): song for song in self._catalog_songs()(id__in=object_ids)}
+
+    def _catalog_songs(self) -> QuerySet:
+        preference = self._read_preference(ReadRoute.CATALOG)
+        return Song.objects.read_preference(preference) if preference else Song.objects
+
+    def _catalog_collection(self) -> Collection:
+        preference = self._read_preference(ReadRoute.CATALOG)
+        collection = Song._get_collection()
+        return collection.with_options(read_preference=preference) if preference else collection
+
+    @staticmethod
+    def _list_filter(query: SongListQuery) -> Q:
+        q_filter = Q()
+        if query.level is not None:
+            q_filter &= Q(level=query.level)
+        if query.artist is not None:
+            q_filter &= Q(artist=query.artist)
+        if query.difficulty_min is not None:
+            q_filter &= Q(difficulty__gte=query.difficulty_min)
+        if query.difficulty_max is not None:
+            q_filter &= Q(difficulty__lte=query.difficulty_max)
+        if query.released_from is not None:
+            q_filter &= Q(released__gte=query.released_from)
+        if query.released_to is not None:
+            q_filter &= Q(released__lte=query.released_to)
+        return q_filter
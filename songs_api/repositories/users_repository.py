@@ -18,8 +18,12 @@ class UsersRepository(BaseRepository):
     def get_by_username(self, username: str) -> User | None:
         return User.objects(username=username).first()
 
-    def create_user(self, username: str, password: str) -> User:
+    def create_user(self, username: str, password: str | None = None, *, password_hash: str | None = None) -> User:
+        """Create a user from a plain password, or from a hash computed elsewhere (see `PasswordHasher`)."""
         user = User(username=username)
-        user.set_password(password)
+        if password_hash is not None:
+            user.password_hash = password_hash
+        else:
+            user.set_password(password)
         user.save(session=self.mongo_session)
         return user
@@ -2,9 +2,24 @@ from __future__ import annotations
 
 from datetime import date
 
-from pydantic import BaseModel, Field, field_serializer
-
-from songs_api.constants import PaginationDefaults, RatingRange, TokenType
+from pydantic import BaseModel, Field, field_serializer, field_validator, model_validator
+from pydantic_core import PydanticCustomError
+
+from songs_api.constants import (
+    DistributionDefaults,
+    ExportFormat,
+    ImportDefaults,
+    LeaderboardBy,
+    LeaderboardDefaults,
+    PaginationDefaults,
+    RatingBatchDefaults,
+    RatingBatchStatus,
+    RatingRange,
+    SongSort,
+    TokenType,
+    TrendingDefaults,
+    TrendingWindow,
+)
 
 
 class SongResponse(BaseModel):
@@ -44,6 +59,29 @@ class PaginationQueryParams(BaseModel):
     )
 
 
+class SongsListQueryParams(PaginationQueryParams):
+    """Query parameters for the songs list: pagination plus index-backed filters and sort."""
+
+    level: int | None = Field(default=None, description="Exact level")
+    artist: str | None = Field(default=None, min_length=1, description="Exact artist name")
+    difficulty_min: float | None = Field(default=None, description="Lower difficulty bound (inclusive)")
+    difficulty_max: float | None = Field(default=None, description="Upper difficulty bound (inclusive)")
+    released_from: date | None = Field(default=None, description="Earliest release date (inclusive)")
+    released_to: date | None = Field(default=None, description="Latest release date (inclusive)")
+    sort: SongSort | None = Field(default=None, description="Sort field, prefix with '-' for descending")
+
+    @model_validator(mode="after")
+    def check_ranges(self) -> SongsListQueryParams:
+        """Reject inverted ranges."""
+        if self.difficulty_min is not None and self.difficulty_max is not None:
+            if self.difficulty_min > self.difficulty_max:
+                raise PydanticCustomError("range_error", "difficulty_min must not be greater than difficulty_max")
+        if self.released_from is not None and self.released_to is not None:
+            if self.released_from > self.released_to:
+                raise PydanticCustomError("range_error", "released_from must not be after released_to")
+        return self
+
+
 class SearchQueryParams(BaseModel):
     """Query parameters for search."""
 
@@ -52,6 +90,57 @@ class SearchQueryParams(BaseModel):
     page_size: int = Field(default=PaginationDefaults.PAGE_SIZE, ge=1, le=PaginationDefaults.MAX_PAGE_SIZE)
 
 
+class ExportQueryParams(BaseModel):
+    """Query parameters for the catalog export."""
+
+    format: ExportFormat = Field(default=ExportFormat.NDJSON, description="Output format")
+    include_ratings: bool = Field(default=False, description="Join rating stats onto each song")
+
+
+class ImportQueryParams(BaseModel):
+    """Query parameters for the bulk song import."""
+
+    batch_size: int = Field(
+        default=ImportDefaults.BATCH_SIZE,
+        ge=1,
+        le=ImportDefaults.MAX_BATCH_SIZE,
+        description="Rows per insert_many batch",
+    )
+
+
+class SongImportRow(BaseModel):
+    """One NDJSON line of a song import."""
+
+    artist: str = Field(..., min_length=1)
+    title: str = Field(..., min_length=1)
+    difficulty: float = Field(..., ge=0)
+    level: int = Field(..., ge=1)
+    released: date = Field(default_factory=date.today)
+
+    @field_validator("released", mode="before")
+    @classmethod
+    def default_empty_released(cls, value: object) -> object:
+        # Same convention as the seed file: a blank release date means today.
+        return date.today() if value in ("", None) else value
+
+
+class SongImportError(BaseModel):
+    """A rejected import row, by 1-based line number."""
+
+    line: int
+    error: str
+
+
+class SongImportResponse(BaseModel):
+    """Summary of a bulk song import."""
+
+    inserted: int
+    failed: int
+    batches: int
+    errors: list[SongImportError]
+    errors_truncated: bool
+
+
 class SongsListResponse(BaseModel):
     """Response for paginated songs list."""
 
@@ -79,6 +168,43 @@ class AverageDifficultyResponse(BaseModel):
         return round(value, 3) if value is not None else None
 
 
+class DifficultyDistributionQueryParams(BaseModel):
+    """Query parameters for the difficulty distribution."""
+
+    level: int | None = Field(default=None, description="Restrict to a single level")
+    bins: int = Field(default=DistributionDefaults.BINS, ge=1, le=DistributionDefaults.MAX_BINS)
+
+
+class DifficultyDistribution(BaseModel):
+    """Histogram and percentiles of difficulty for one level (or all songs when level is None)."""
+
+    level: int | None
+    count: int
+    histogram: list[int]
+    p50: float | None
+    p90: float | None
+    p99: float | None
+
+    @field_serializer("p50", "p90", "p99")
+    def serialize_percentile(self, value: float | None) -> float | None:
+        """Round percentiles to 3 decimal places."""
+        return round(value, 3) if value is not None else None
+
+
+class DifficultyDistributionResponse(BaseModel):
+    """Response for difficulty distribution; every histogram shares `bin_edges`."""
+
+    level: int | None
+    bin_edges: list[float]
+    overall: DifficultyDistribution
+    levels: list[DifficultyDistribution]
+
+    @field_serializer("bin_edges")
+    def serialize_bin_edges(self, value: list[float]) -> list[float]:
+        """Round bin edges to 3 decimal places."""
+        return [round(edge, 3) for edge in value]
+
+
 class AddRatingRequest(BaseModel):
     """Request to add a rating."""
 
@@ -86,6 +212,20 @@ class AddRatingRequest(BaseModel):
     rating: int = Field(ge=RatingRange.MIN, le=RatingRange.MAX)
 
 
+class AddRatingsBatchRequest(BaseModel):
+    """Request to add several ratings at once, e.g. when syncing offline ratings."""
+
+    ratings: list[AddRatingRequest] = Field(..., min_length=1, max_length=RatingBatchDefaults.MAX_ITEMS)
+
+
+class RatingAcceptedResponse(BaseModel):
+    """Response for a rating queued by the write-behind buffer; stats update on the next flush."""
+
+    song_id: str
+    rating: int
+    queued: bool = True
+
+
 class RatingStatsResponse(BaseModel):
     """Response for rating statistics."""
 
@@ -94,6 +234,12 @@ class RatingStatsResponse(BaseModel):
     lowest: int | None
     highest: int | None
     count: int
+    histogram: list[int] = Field(
+        default_factory=lambda: [0] * (RatingRange.MAX - RatingRange.MIN + 1),
+        description="Number of ratings per star value, lowest star first",
+    )
+    median: float | None = None
+    p90: int | None = None
 
     @field_serializer("average")
     def serialize_average(self, value: float | None) -> float | None:
@@ -101,6 +247,134 @@ class RatingStatsResponse(BaseModel):
         return round(value, 3) if value is not None else None
 
 
+class RatingStatsManyQueryParams(BaseModel):
+    """Query parameters for rating stats of several songs."""
+
+    ids: list[str] = Field(
+        ..., min_length=1, max_length=RatingBatchDefaults.MAX_STATS_IDS, description="Comma-separated song IDs"
+    )
+
+    @field_validator("ids", mode="before")
+    @classmethod
+    def split_ids(cls, value: str | list[str]) -> list[str]:
+        """Accept `ids=a,b,c`; drop blanks and duplicates, keeping the first occurrence."""
+        if isinstance(value, str):
+            value = value.split(",")
+        return list(dict.fromkeys(song_id.strip() for song_id in value if song_id.strip()))
+
+
+class RatingStatsManyResponse(BaseModel):
+    """Rating statistics keyed by song ID; unknown IDs are listed in `not_found`."""
+
+    stats: dict[str, RatingStatsResponse]
+    not_found: list[str]
+
+
+class RatingBatchItemResult(BaseModel):
+    """Outcome of one item of a rating batch, by its position in the request."""
+
+    index: int
+    song_id: str
+    status: RatingBatchStatus
+    stats: RatingStatsResponse | None = None
+
+
+class AddRatingsBatchResponse(BaseModel):
+    """Response for a rating batch; `stats` reflect the whole batch."""
+
+    results: list[RatingBatchItemResult]
+    created: int
+    queued: int
+    not_found: int
+
+
+class TopSongsQueryParams(BaseModel):
+    """Query parameters for the song leaderboards."""
+
+    by: LeaderboardBy = Field(default=LeaderboardBy.AVERAGE, description="Rank by average rating or rating count")
+    level: int | None = Field(default=None, description="Restrict to a single level")
+    limit: int = Field(default=LeaderboardDefaults.LIMIT, ge=1, le=LeaderboardDefaults.MAX_LIMIT)
+
+
+class TopSongEntry(BaseModel):
+    """One leaderboard position."""
+
+    rank: int
+    song: SongResponse
+    average: float
+    count: int
+
+    @field_serializer("average")
+    def serialize_average(self, value: float) -> float:
+        """Round average rating to 3 decimal places."""
+        return round(value, 3)
+
+
+class TopSongsResponse(BaseModel):
+    """Response for the song leaderboards."""
+
+    by: LeaderboardBy
+    level: int | None
+    songs: list[TopSongEntry]
+
+
+class RankedSongsQueryParams(PaginationQueryParams):
+    """Query parameters for the Bayesian-ranked song listing."""
+
+    level: int | None = Field(default=None, description="Restrict to a single level")
+
+
+class RankedSongEntry(BaseModel):
+    """A song with its Bayesian score and the rating stats behind it."""
+
+    rank: int
+    song: SongResponse
+    score: float
+    average: float
+    count: int
+
+    @field_serializer("score", "average")
+    def serialize_score(self, value: float) -> float:
+        """Round scores to 3 decimal places."""
+        return round(value, 3)
+
+
+class RankedSongsResponse(BaseModel):
+    """Response for the Bayesian-ranked song listing."""
+
+    level: int | None
+    data: list[RankedSongEntry]
+    pagination: PaginationMeta
+
+
+class TrendingQueryParams(BaseModel):
+    """Query parameters for trending songs."""
+
+    window: TrendingWindow = Field(default=TrendingWindow.HOUR, description="Rank by ratings in the last hour or day")
+    limit: int = Field(default=TrendingDefaults.LIMIT, ge=1, le=TrendingDefaults.MAX_LIMIT)
+
+
+class TrendingSongEntry(BaseModel):
+    """A trending song; `ratings` estimates how many ratings it got in the last window."""
+
+    rank: int
+    song: SongResponse
+    ratings: float
+    average: float
+
+    @field_serializer("ratings", "average")
+    def serialize_rate(self, value: float) -> float:
+        """Round to 3 decimal places."""
+        return round(value, 3)
+
+
+class TrendingSongsResponse(BaseModel):
+    """Response for trending songs."""
+
+    window: TrendingWindow
+    songs: list[TrendingSongEntry]
+
+
 class LoginRequest(BaseModel):
     """Login request schema."""
 
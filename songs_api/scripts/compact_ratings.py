@@ -0,0 +1,67 @@
+"""Fold raw ratings older than the retention window into daily per-song archive buckets."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import UTC, datetime, timedelta
+
+from songs_api.infrastructure import UnitOfWork, ensure_indexes, init_db
+from songs_api.settings import Settings
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_RATINGS_PER_SECOND = 5000
+
+
+def compact_ratings(
+    retention_days: int = DEFAULT_RETENTION_DAYS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_ratings_per_second: float = DEFAULT_MAX_RATINGS_PER_SECOND,
+) -> int:
+    """Compact every rating older than `retention_days`, one batch per unit of work.
+
+    Each batch archives and deletes its ratings in one transaction where the deployment
+    supports them. Without transactions a batch is claimed before it is archived, so an
+    interrupted batch is finished by the next run and archived exactly once.
+    Batches are paced to stay under `max_ratings_per_second` (0 for no limit).
+    """
+    before = datetime.now(UTC) - timedelta(days=retention_days)
+    started = time.perf_counter()
+    total = 0
+    while True:
+        with UnitOfWork(use_transactions=True) as uow:
+            compacted = uow.ratings_repository.compact_ratings(before=before, limit=batch_size)
+        if not compacted:
+            break
+        total += compacted
+        print(f"Compacted {total} ratings", flush=True)
+
+        if max_ratings_per_second > 0:
+            # Sleep off whatever is ahead of the allowed rate so live writes keep their share.
+            ahead = total / max_ratings_per_second - (time.perf_counter() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    print(f"Compaction finished: {total} ratings older than {before:%Y-%m-%d} archived.")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS, help="Raw ratings to keep")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Ratings per archive/delete batch")
+    parser.add_argument(
+        "--max-per-second",
+        type=float,
+        default=DEFAULT_MAX_RATINGS_PER_SECOND,
+        help="Rate limit in ratings compacted per second (0 = unlimited)",
+    )
+    args = parser.parse_args()
+
+    settings = Settings()
+    init_db(mongo_uri=settings.mongo_uri, db_name=settings.mongo_db_name)
+    ensure_indexes()
+    compact_ratings(
+        retention_days=args.retention_days, batch_size=args.batch_size, max_ratings_per_second=args.max_per_second
+    )
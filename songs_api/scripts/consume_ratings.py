@@ -0,0 +1,184 @@
+"""Apply ratings queued in the Redis Stream (RATINGS_WRITE_MODE=queue) to MongoDB."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import time
+
+from loguru import logger
+from mongoengine.connection import get_connection
+from pymongo.errors import PyMongoError
+
+from songs_api.infrastructure import (
+    QueuedRating,
+    RatingQueue,
+    UnitOfWork,
+    create_rating_queue,
+    get_cache,
+    get_leaderboards,
+    get_rating_stats_hub,
+    init_cache,
+    init_db,
+    init_leaderboards,
+    init_rating_prior,
+    init_rating_stats_hub,
+    rating_stats_cache_key,
+)
+from songs_api.infrastructure.database import transactions_supported
+from songs_api.settings import Settings
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_BLOCK_MS = 1000
+DEFAULT_CLAIM_IDLE_MS = 60000
+METRICS_INTERVAL_SECONDS = 30
+TRANSACTION_ATTEMPTS = 5
+ERROR_BACKOFF_SECONDS = 0.5
+MAX_ERROR_BACKOFF_SECONDS = 10.0
+# Labels on errors after which the whole transaction can simply be run again.
+_RETRYABLE_LABELS = ("TransientTransactionError", "UnknownTransactionCommitResult")
+
+
+def require_transactions() -> None:
+    """Refuse to consume without multi-document transactions.
+
+    `apply_ratings` inserts a batch's ratings and then updates their songs' stats. Outside a
+    transaction, a crash between the two leaves the ratings stored; when the batch is
+    redelivered they are skipped as already applied, so the stats would stay short for good.
+    """
+    if not transactions_supported(get_connection(alias="default")):
+        raise SystemExit(
+            "Rating consumer needs MongoDB transactions (a replica set or mongos); "
+            "use RATINGS_WRITE_MODE=sync or write_behind with a standalone server"
+        )
+
+
+def apply_ratings(entries: list[QueuedRating]) -> int:
+    """Write a batch of queued ratings with one bulk write. Returns how many were new.
+
+    Each rating's `_id` comes from its stream entry ID, so entries redelivered after a
+    crash between the write and the ack are recognised and skipped. The check and the
+    write share a transaction (see `require_transactions`).
+    """
+    with UnitOfWork(use_transactions=True) as uow:
+        applied = uow.ratings_repository.existing_rating_ids([entry.rating_id for entry in entries])
+        fresh = [entry for entry in entries if entry.rating_id not in applied]
+        levels = uow.songs_repository.get_levels({entry.song_id for entry in fresh})
+        # Songs deleted after their ratings were queued are dropped.
+        fresh = [entry for entry in fresh if entry.song_id in levels]
+        stats_by_song = uow.ratings_repository.bulk_add_ratings(
+            [(entry.song_id, entry.rating) for entry in fresh],
+            levels,
+            rating_ids=[entry.rating_id for entry in fresh],
+        )
+
+    cache = get_cache()
+    if cache:
+        for song_id in stats_by_song:
+            cache.delete(rating_stats_cache_key(song_id))
+    leaderboards = get_leaderboards()
+    if leaderboards:
+        leaderboards.record(stats_by_song.values())
+    hub = get_rating_stats_hub()
+    if hub:
+        hub.publish(stats_by_song)
+    return len(fresh)
+
+
+def apply_ratings_with_retry(entries: list[QueuedRating]) -> int:
+    """`apply_ratings`, run again on transient transaction errors such as a WriteConflict between consumers.
+
+    Safe to repeat: ratings a committed attempt already stored are skipped by their `_id`.
+    """
+    attempt = 1
+    while True:
+        try:
+            return apply_ratings(entries)
+        except PyMongoError as exc:
+            if attempt >= TRANSACTION_ATTEMPTS or not any(exc.has_error_label(label) for label in _RETRYABLE_LABELS):
+                raise
+            logger.debug(f"Retrying rating batch after transient error (attempt {attempt}): {exc}")
+            attempt += 1
+
+
+def consume(
+    queue: RatingQueue,
+    consumer: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    block_ms: int = DEFAULT_BLOCK_MS,
+    claim_idle_ms: int = DEFAULT_CLAIM_IDLE_MS,
+    max_batches: int | None = None,
+) -> int:
+    """Read, apply and acknowledge batches until stopped (SIGTERM/SIGINT) or `max_batches` are done.
+
+    A failed read or write is logged and retried after a growing pause instead of ending the
+    consumer; the batch stays unacknowledged and is claimed again after `claim_idle_ms`.
+    """
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    if max_batches is None:
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+    queue.ensure_group()
+    applied = batches = failures = 0
+    next_report = time.monotonic() + METRICS_INTERVAL_SECONDS
+    while not stopping and (max_batches is None or batches < max_batches):
+        try:
+            entries = queue.read(consumer, count=batch_size, block_ms=block_ms, claim_idle_ms=claim_idle_ms)
+            if entries:
+                # Acknowledged only after the write, so a crash here means redelivery, not loss.
+                applied += apply_ratings_with_retry(entries)
+                queue.ack([entry.entry_id for entry in entries])
+            failures = 0
+        except Exception:
+            failures += 1
+            delay = min(ERROR_BACKOFF_SECONDS * 2 ** (failures - 1), MAX_ERROR_BACKOFF_SECONDS)
+            logger.exception(
+                f"Rating consumer {consumer}: batch failed ({failures} in a row), retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+        batches += 1
+
+        if time.monotonic() >= next_report:
+            logger.info(f"Rating consumer {consumer}: {applied} ratings applied, queue {queue.metrics()}")
+            next_report = time.monotonic() + METRICS_INTERVAL_SECONDS
+    return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}", help="Consumer name")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Ratings per bulk write")
+    parser.add_argument("--block-ms", type=int, default=DEFAULT_BLOCK_MS, help="How long a read waits for ratings")
+    parser.add_argument(
+        "--claim-idle-ms",
+        type=int,
+        default=DEFAULT_CLAIM_IDLE_MS,
+        help="Take over entries another consumer has held unacknowledged this long",
+    )
+    args = parser.parse_args()
+
+    settings = Settings()
+    init_db(mongo_uri=settings.mongo_uri, db_name=settings.mongo_db_name)
+    require_transactions()
+    cache = init_cache(settings)
+    init_leaderboards(cache)
+    init_rating_prior(settings)
+    # Publishes to the web workers' live stats streams (needs the Redis cache).
+    init_rating_stats_hub(settings, cache=cache)
+
+    total = consume(
+        create_rating_queue(settings),
+        args.consumer,
+        batch_size=args.batch_size,
+        block_ms=args.block_ms,
+        claim_idle_ms=args.claim_idle_ms,
+    )
+    print(f"Rating consumer {args.consumer} stopped after applying {total} ratings.")
@@ -0,0 +1,20 @@
+"""Fold the sharded rating counters of hot songs back into their rating stats."""
+
+from __future__ import annotations
+
+from songs_api.infrastructure import RatingPrior, init_db
+from songs_api.repositories import RatingsRepository
+from songs_api.settings import Settings
+
+
+def main() -> None:
+    settings = Settings()
+    init_db(mongo_uri=settings.mongo_uri, db_name=settings.mongo_db_name)
+
+    prior = RatingPrior(weight=settings.rating_prior_weight, refresh_seconds=settings.rating_prior_refresh_seconds)
+    folded = RatingsRepository(rating_prior=prior).fold_shards()
+    print(f"Folded rating shards for {folded} songs.")
+
+
+if __name__ == "__main__":
+    main()
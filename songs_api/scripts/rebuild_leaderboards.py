@@ -0,0 +1,69 @@
+"""Backfill the ranking fields on rating stats and rebuild the Redis leaderboards."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from pymongo import UpdateOne
+
+from songs_api.infrastructure import Leaderboards, RatingPrior, ensure_indexes, init_cache, init_db
+from songs_api.models.documents import RatingStats
+from songs_api.repositories import RatingsRepository, SongsRepository
+from songs_api.settings import Settings
+
+BATCH_SIZE = 2000
+
+
+def iter_backfilled_stats(prior: RatingPrior, batch_size: int = BATCH_SIZE) -> Iterator[RatingStats]:
+    """Set `level`, `average` and `bayesian` on every rating stats document, yielding the updated stats."""
+    stats_coll = RatingStats._get_collection()
+    songs_repository = SongsRepository()
+
+    ratings_repository = RatingsRepository()
+
+    def backfill(batch: list[RatingStats]) -> list[RatingStats]:
+        levels = songs_repository.get_levels({stats.song_id for stats in batch})
+        ratings_repository._merge_shards(batch)
+        updates = []
+        for stats in batch:
+            stats.level = levels.get(stats.song_id)
+            stats.bayesian = prior.score(stats.sum, stats.count)
+            fields = {"average": stats.average, "bayesian": stats.bayesian, "scored_count": stats.count}
+            if stats.level is not None:
+                fields["level"] = stats.level
+            guard = {"_id": stats.id, "scored_count": {"$not": {"$gt": stats.count}}}
+            updates.append(UpdateOne(guard, {"$set": fields}))
+        stats_coll.bulk_write(updates, ordered=False)
+        return batch
+
+    batch: list[RatingStats] = []
+    for doc in stats_coll.find({"count": {"$gt": 0}}).batch_size(batch_size):
+        batch.append(RatingsRepository._stats_from_doc(doc))
+        if len(batch) >= batch_size:
+            yield from backfill(batch)
+            batch = []
+    if batch:
+        yield from backfill(batch)
+
+
+def main() -> None:
+    settings = Settings()
+    init_db(mongo_uri=settings.mongo_uri, db_name=settings.mongo_db_name)
+    ensure_indexes()
+
+    # Recompute the global mean now so every song is rescored against the same prior.
+    prior = RatingPrior(weight=settings.rating_prior_weight, refresh_seconds=settings.rating_prior_refresh_seconds)
+    prior.refresh()
+    print(f"Global mean rating: {prior.mean:.3f}")
+
+    leaderboards = Leaderboards(init_cache(settings))
+    if leaderboards.enabled:
+        recorded = leaderboards.rebuild(iter_backfilled_stats(prior))
+        print(f"Leaderboards rebuilt with {recorded} songs.")
+    else:
+        backfilled = sum(1 for _ in iter_backfilled_stats(prior))
+        print(f"Backfilled {backfilled} rating stats; Redis is unavailable so only the MongoDB fallback is ready.")
+
+
+if __name__ == "__main__":
+    main()
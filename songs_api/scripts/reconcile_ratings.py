@@ -0,0 +1,273 @@
+"""Recompute rating stats from the raw ratings and correct any drift."""
+
+from __future__ import annotations
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from pymongo import DeleteOne, UpdateOne
+
+from songs_api.constants import RatingRange
+from songs_api.infrastructure import RatingPrior, init_db
+from songs_api.models.documents import Rating, RatingArchive, RatingStats, RatingStatsShard
+from songs_api.repositories import RatingsRepository
+from songs_api.settings import Settings
+
+DEFAULT_PARTITIONS_PER_WORKER = 4
+MAX_REPORTED_DRIFT = 10
+
+_STAT_FIELDS = ("count", "sum", "min", "max", "stars")
+
+SongIdRange = tuple[str | None, str | None]
+
+
+@dataclass
+class ReconcileResult:
+    songs: int = 0
+    ratings: int = 0
+    drifted: int = 0
+    corrected: int = 0
+    # Stats that changed between the read and the correction; re-run to pick them up.
+    skipped: int = 0
+    examples: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def ratings_per_second(self) -> float:
+        return self.ratings / self.elapsed if self.elapsed > 0 else 0.0
+
+    def merge(self, other: ReconcileResult) -> None:
+        self.songs += other.songs
+        self.ratings += other.ratings
+        self.drifted += other.drifted
+        self.corrected += other.corrected
+        self.skipped += other.skipped
+        self.examples.extend(other.examples[: MAX_REPORTED_DRIFT - len(self.examples)])
+
+
+def partition_song_ids(partitions: int) -> list[SongIdRange]:
+    """Split the song ID space into `partitions` ranges of about equal stats count.
+
+    Boundaries come from the `song_id` index on `rating_stats`; the first and last
+    ranges are open so songs that have ratings but no stats are still covered.
+    """
+    stats_coll = RatingStats._get_collection()
+    total = stats_coll.count_documents({})
+    step = math.ceil(total / partitions) if total else 0
+    if partitions <= 1 or step == 0:
+        return [(None, None)]
+
+    cursor = stats_coll.find({}, {"song_id": 1, "_id": 0}).sort("song_id", 1)
+    boundaries = [doc["song_id"] for position, doc in enumerate(cursor) if position and position % step == 0]
+    edges: list[str | None] = [None, *boundaries, None]
+    return list(zip(edges[:-1], edges[1:], strict=True))
+
+
+def expected_stats(song_ids: SongIdRange) -> dict[str, dict]:
+    """Stats per song computed from `ratings` with one `$group` over the range, plus the archive."""
+    stars = {
+        f"star_{star}": {"$sum": {"$cond": [{"$eq": ["$rating", star]}, 1, 0]}}
+        for star in range(RatingRange.MIN, RatingRange.MAX + 1)
+    }
+    cursor = Rating._get_collection().aggregate(
+        [
+            {"$match": _range_filter(song_ids)},
+            {
+                "$group": {
+                    "_id": "$song_id",
+                    "count": {"$sum": 1},
+                    "sum": {"$sum": "$rating"},
+                    "min": {"$min": "$rating"},
+                    "max": {"$max": "$rating"},
+                    **stars,
+                }
+            },
+        ],
+        allowDiskUse=True,
+    )
+    expected = {}
+    for doc in cursor:
+        expected[doc["_id"]] = {
+            "count": doc["count"],
+            "sum": doc["sum"],
+            "min": doc["min"],
+            "max": doc["max"],
+            "stars": {
+                str(star): doc[f"star_{star}"]
+                for star in range(RatingRange.MIN, RatingRange.MAX + 1)
+                if doc[f"star_{star}"]
+            },
+        }
+    for song_id, stars in archived_stars(song_ids).items():
+        expected[song_id] = _add_stars(expected.get(song_id), stars)
+    return expected
+
+
+def archived_stars(song_ids: SongIdRange) -> dict[str, dict[str, int]]:
+    """Star counts per song from the compacted `rating_archive` buckets in the range."""
+    stars = {f"star_{star}": {"$sum": f"$stars.{star}"} for star in range(RatingRange.MIN, RatingRange.MAX + 1)}
+    cursor = RatingArchive._get_collection().aggregate(
+        [{"$match": _range_filter(song_ids)}, {"$group": {"_id": "$song_id", **stars}}],
+        allowDiskUse=True,
+    )
+    return {
+        doc["_id"]: {
+            str(star): doc[f"star_{star}"]
+            for star in range(RatingRange.MIN, RatingRange.MAX + 1)
+            if doc.get(f"star_{star}")
+        }
+        for doc in cursor
+    }
+
+
+def reconcile_range(song_ids: SongIdRange, dry_run: bool = False) -> ReconcileResult:
+    """Diff one song ID range against `rating_stats` and apply corrections with one `bulk_write`.
+
+    The stored stats are read before the raw ratings are aggregated, and each correction is
+    conditional on the stats it was diffed against. A rating written while the job runs has
+    therefore changed the stats by the time the correction applies, so it is never
+    overwritten; that song is counted as skipped instead. So are songs with counter shards,
+    whose stats are only complete once the shards are added. Corrected stats are rescored.
+    """
+    result = ReconcileResult()
+    stats_coll = RatingStats._get_collection()
+    actual = {doc["song_id"]: doc for doc in stats_coll.find(_range_filter(song_ids))}
+    expected = expected_stats(song_ids)
+    settings = Settings()
+    prior = RatingPrior(weight=settings.rating_prior_weight, refresh_seconds=settings.rating_prior_refresh_seconds)
+    sharded = set(
+        RatingStatsShard._get_collection().distinct("song_id", {**_range_filter(song_ids), "count": {"$gt": 0}})
+    )
+
+    corrections = []
+    for song_id in sorted(expected.keys() | actual.keys()):
+        want, have = expected.get(song_id), actual.get(song_id)
+        result.songs += 1
+        result.ratings += want["count"] if want else 0
+        if song_id in sharded:
+            result.skipped += 1
+            continue
+        have_fields = {name: have.get(name, {} if name == "stars" else None) for name in _STAT_FIELDS} if have else None
+        if want == have_fields or (want is None and not have.get("count")):
+            continue
+
+        result.drifted += 1
+        if len(result.examples) < MAX_REPORTED_DRIFT:
+            result.examples.append(f"{song_id}: stored {have_fields} expected {want}")
+
+        if have is None:
+            guard = {"song_id": song_id}
+            corrections.append(
+                UpdateOne(guard, {"$setOnInsert": {"song_id": song_id, **_with_scores(want, prior)}}, upsert=True)
+            )
+        elif want is None:
+            corrections.append(DeleteOne({"_id": have["_id"], "count": have.get("count"), "sharded": {"$ne": True}}))
+        else:
+            guard = {"_id": have["_id"], "count": have.get("count"), "sum": have.get("sum"), "sharded": {"$ne": True}}
+            corrections.append(UpdateOne(guard, {"$set": _with_scores(want, prior)}))
+
+    if corrections and not dry_run:
+        outcome = stats_coll.bulk_write(corrections, ordered=False)
+        result.corrected = outcome.modified_count + outcome.upserted_count + outcome.deleted_count
+        result.skipped += len(corrections) - result.corrected
+    return result
+
+
+def reconcile_ratings(workers: int = 1, dry_run: bool = False, partitions: int | None = None) -> ReconcileResult:
+    """Reconcile all rating stats, one song ID range per task across a process pool."""
+    started = time.perf_counter()
+    if not dry_run:
+        # Fold hot songs' counter shards and finish any interrupted compaction batch first,
+        # so the stats can be compared with the raw and archived ratings.
+        repository = RatingsRepository()
+        repository.fold_shards()
+        repository.finish_compaction()
+    ranges = partition_song_ids(partitions or max(1, workers) * DEFAULT_PARTITIONS_PER_WORKER)
+
+    total = ReconcileResult()
+
+    def record(partial: ReconcileResult) -> None:
+        total.merge(partial)
+        total.elapsed = time.perf_counter() - started
+        print(
+            f"Checked {total.songs} songs / {total.ratings} ratings ({total.ratings_per_second:,.0f} ratings/s), "
+            f"{total.drifted} drifted",
+            flush=True,
+        )
+
+    if workers <= 1:
+        for song_ids in ranges:
+            record(reconcile_range(song_ids, dry_run))
+    else:
+        settings = Settings()
+        # Spawned, not forked: each worker opens its own MongoClient instead of inheriting ours.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_db,
+            initargs=(settings.mongo_uri, settings.mongo_db_name),
+        ) as pool:
+            for partial in pool.map(reconcile_range, ranges, [dry_run] * len(ranges)):
+                record(partial)
+
+    total.elapsed = time.perf_counter() - started
+    for example in total.examples:
+        print(f"  drift {example}")
+    action = "would correct" if dry_run else f"corrected {total.corrected}, skipped {total.skipped} of"
+    print(
+        f"Reconcile finished: {total.drifted} of {total.songs} songs drifted, {action} them "
+        f"in {total.elapsed:.1f}s ({total.ratings_per_second:,.0f} ratings/s)."
+    )
+    return total
+
+
+def _range_filter(song_ids: SongIdRange) -> dict:
+    low, high = song_ids
+    bounds = {}
+    if low is not None:
+        bounds["$gte"] = low
+    if high is not None:
+        bounds["$lt"] = high
+    return {"song_id": bounds} if bounds else {}
+
+
+def _add_stars(stats: dict | None, stars: dict[str, int]) -> dict | None:
+    if not stars:
+        return stats
+    merged = dict(stats["stars"]) if stats else {}
+    for star, count in stars.items():
+        merged[star] = merged.get(star, 0) + count
+    present = [int(star) for star, count in merged.items() if count]
+    return {
+        "count": sum(merged.values()),
+        "sum": sum(int(star) * count for star, count in merged.items()),
+        "min": min(present),
+        "max": max(present),
+        "stars": {str(star): merged[str(star)] for star in sorted(present)},
+    }
+
+
+def _with_scores(stats: dict, prior: RatingPrior) -> dict:
+    return {
+        **stats,
+        "average": stats["sum"] / stats["count"],
+        "bayesian": prior.score(stats["sum"], stats["count"]),
+        "scored_count": stats["count"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = inline)")
+    parser.add_argument("--partitions", type=int, default=None, help="Song ID ranges (default: 4 per worker)")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without writing corrections")
+    args = parser.parse_args()
+
+    settings = Settings()
+    init_db(mongo_uri=settings.mongo_uri, db_name=settings.mongo_db_name)
+    reconcile_ratings(workers=args.workers, dry_run=args.dry_run, partitions=args.partitions)
@@ -0,0 +1,23 @@
+"""Recompute the catalog-wide mean rating and rescore every song's Bayesian score against it."""
+
+from __future__ import annotations
+
+from songs_api.infrastructure import RatingPrior, init_db
+from songs_api.repositories import RatingsRepository
+from songs_api.settings import Settings
+
+
+def main() -> None:
+    settings = Settings()
+    init_db(mongo_uri=settings.mongo_uri, db_name=settings.mongo_db_name)
+
+    prior = RatingPrior(weight=settings.rating_prior_weight, refresh_seconds=settings.rating_prior_refresh_seconds)
+    prior.refresh()
+    print(f"Global mean rating: {prior.mean:.3f}")
+
+    rescored = RatingsRepository(rating_prior=prior).rescore()
+    print(f"Rescored {rescored} songs.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,146 @@
+"""Seed songs from an NDJSON file, streaming it in parallel-parsed batches."""
+
 from __future__ import annotations
 
+import argparse
 import json
-from datetime import date
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+
+from pymongo import UpdateOne
 
 from songs_api.infrastructure import ensure_indexes, init_db
 from songs_api.models.documents import Song
+from songs_api.repositories import SongsRepository
+from songs_api.schemas import SongImportRow
 from songs_api.settings import Settings
 
+DEFAULT_BATCH_SIZE = 5000
+# Fields the import fills in when a row leaves them blank; written only when a song is first inserted.
+DEFAULTED_FIELDS = ("released",)
 
-def seed_songs_from_file(file_path: str) -> None:
-    """Seed songs from a JSON file into MongoDB if the collection is empty."""
-    ensure_indexes()
 
-    existing_count = Song.objects.count()
-    if existing_count > 0:
-        print(f"Songs collection already has {existing_count} documents. Skipping seed.")
-        return
+@dataclass
+class SeedResult:
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    invalid: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
 
+def iter_line_batches(file_path: str, batch_size: int) -> Iterator[list[str]]:
+    """Yield non-blank lines of the file `batch_size` at a time without reading it all."""
+    batch: list[str] = []
     with open(file_path, encoding="utf-8") as f:
-        songs_data = [json.loads(line) for line in f if line.strip()]
-
-    songs = []
-    for data in songs_data:
-        released_str = data.get("released", "")
-        released_date = date.fromisoformat(released_str) if released_str else date.today()
-
-        song = Song(
-            artist=data["artist"],
-            title=data["title"],
-            difficulty=float(data["difficulty"]),
-            level=int(data["level"]),
-            released=released_date,
+        for line in f:
+            if not line.strip():
+                continue
+            batch.append(line)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def parse_batch(lines: list[str]) -> tuple[list[tuple[dict, dict]], int]:
+    """Validate raw lines into Mongo song documents. Runs in worker processes.
+
+    Each document comes with the defaulted fields split off, so a re-run does not overwrite
+    them (a blank release date would otherwise move to the day of every seed).
+    """
+    docs = []
+    invalid = 0
+    for line in lines:
+        try:
+            raw = json.loads(line)
+            row = SongImportRow.model_validate(raw)
+        except ValueError:  # JSON decode errors and pydantic ValidationError
+            invalid += 1
+            continue
+        doc = Song(**row.model_dump()).to_mongo().to_dict()
+        defaults = {field: doc.pop(field) for field in DEFAULTED_FIELDS if raw.get(field) in ("", None)}
+        docs.append((doc, defaults))
+    return docs, invalid
+
+
+def upsert_batch(docs: list[tuple[dict, dict]]) -> tuple[int, int]:
+    """Upsert songs keyed on (artist, title) so re-running the seed does not duplicate them."""
+    if not docs:
+        return 0, 0
+    requests = [
+        UpdateOne(
+            {"artist": doc["artist"], "title": doc["title"]},
+            {"$set": doc, "$setOnInsert": defaults} if defaults else {"$set": doc},
+            upsert=True,
         )
-        songs.append(song)
+        for doc, defaults in docs
+    ]
+    result = Song._get_collection().bulk_write(requests, ordered=False)
+    if result.modified_count:
+        SongsRepository().bump_catalog_version()
+    return result.upserted_count, result.modified_count
+
+
+def seed_songs_from_file(file_path: str, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1) -> SeedResult:
+    """Seed songs from an NDJSON file; safe to re-run or resume after an interruption.
+
+    Batches are parsed and validated in a process pool while the parent writes finished
+    batches, with at most `2 * workers` batches in flight to keep memory bounded.
+    """
+    ensure_indexes()
 
-    if songs:
-        Song.objects.insert(songs)
-        print(f"Seeded {len(songs)} songs into the database.")
+    result = SeedResult()
+    started = time.perf_counter()
+
+    def record(parsed: tuple[list[tuple[dict, dict]], int]) -> None:
+        docs, invalid = parsed
+        inserted, updated = upsert_batch(docs)
+        result.rows += len(docs) + invalid
+        result.inserted += inserted
+        result.updated += updated
+        result.invalid += invalid
+        result.elapsed = time.perf_counter() - started
+        print(f"Seeded {result.rows} rows ({result.rows_per_second:,.0f} rows/s)", flush=True)
+
+    batches = iter_line_batches(file_path, batch_size)
+    if workers <= 1:
+        for lines in batches:
+            record(parse_batch(lines))
     else:
-        print("No songs to seed.")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: deque[Future] = deque()
+            for lines in batches:
+                pending.append(pool.submit(parse_batch, lines))
+                if len(pending) >= 2 * workers:
+                    record(pending.popleft().result())
+            while pending:
+                record(pending.popleft().result())
+
+    result.elapsed = time.perf_counter() - started
+    print(
+        f"Seed finished: {result.inserted} inserted, {result.updated} updated, {result.invalid} invalid "
+        f"in {result.elapsed:.1f}s ({result.rows_per_second:,.0f} rows/s)."
+    )
+    return result
 
 
 if __name__ == "__main__":
     settings = Settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", default=settings.songs_json_path, help="NDJSON file with one song per line")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes (1 = inline)")
+    args = parser.parse_args()
+
     init_db(mongo_uri=settings.mongo_uri, db_name=settings.mongo_db_name)
-    seed_songs_from_file(settings.songs_json_path)
+    seed_songs_from_file(args.file, batch_size=args.batch_size, workers=args.workers)
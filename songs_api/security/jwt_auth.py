@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
 from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
 
 import jwt
 from flask import current_app
@@ -8,6 +14,66 @@ from flask import current_app
 from songs_api.api.errors import UnauthorizedError
 from songs_api.constants import JWTClaim
 
+if TYPE_CHECKING:
+    from songs_api.settings import Settings
+
+
+class VerifiedTokenCache:
+    """Per-worker LRU of tokens that already passed `jwt.decode`: digest -> (username, expiry).
+
+    Keys are an HMAC of the token under the signing secret, so raw tokens are never held and
+    rotating `JWT_SECRET_KEY` orphans every entry. An entry is dropped once its token's `exp`
+    passes; the next use then goes through `jwt.decode` and fails as expired.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str, secret_key: str, algorithm: str) -> bytes:
+        return hmac.new(f"{algorithm}:{secret_key}".encode(), token.encode(), hashlib.sha256).digest()
+
+    def get(self, digest: bytes) -> str | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            username, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return username
+
+    def put(self, digest: bytes, username: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[digest] = (username, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_verified_tokens_instance: VerifiedTokenCache | None = None
+
+
+def init_verified_token_cache(settings: Settings) -> VerifiedTokenCache | None:
+    global _verified_tokens_instance
+    _verified_tokens_instance = (
+        VerifiedTokenCache(settings.jwt_verified_token_cache_size)
+        if settings.jwt_verified_token_cache_size > 0
+        else None
+    )
+    return _verified_tokens_instance
+
+
+def get_verified_token_cache() -> VerifiedTokenCache | None:
+    return _verified_tokens_instance
+
 
 def create_access_token(username: str) -> str:
     """Create JWT access token with expiration."""
@@ -26,17 +92,32 @@ def create_access_token(username: str) -> str:
 
 
 def verify_access_token(token: str) -> str:
-    """Verify JWT token and return username. Raises UnauthorizedError if invalid."""
+    """Verify JWT token and return username. Raises UnauthorizedError if invalid.
+
+    Tokens seen before in this worker are answered from the verified-token cache until they expire.
+    """
     secret_key = str(current_app.config.get("JWT_SECRET_KEY", ""))
     algorithm = str(current_app.config.get("JWT_ALGORITHM", "HS256"))
 
+    verified_tokens = _verified_tokens_instance
+    digest = None
+    if verified_tokens is not None:
+        digest = verified_tokens.digest(token, secret_key, algorithm)
+        username = verified_tokens.get(digest)
+        if username is not None:
+            return username
+
     try:
         payload = jwt.decode(token, secret_key, algorithms=[algorithm])
-        username: str = payload.get(JWTClaim.SUBJECT.value, "")
+        username = payload.get(JWTClaim.SUBJECT.value, "")
         if not username:
             raise UnauthorizedError(message="Invalid token")
-        return username
     except jwt.ExpiredSignatureError as exc:
         raise UnauthorizedError(message="Token has expired") from exc
     except jwt.InvalidTokenError as exc:
         raise UnauthorizedError(message="Invalid token") from exc
+
+    expires_at = payload.get(JWTClaim.EXPIRATION.value)
+    if verified_tokens is not None and isinstance(expires_at, int | float):
+        verified_tokens.put(digest, username, float(expires_at))
+    return username
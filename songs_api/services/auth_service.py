@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from songs_api.api.errors import ConflictError, UnauthorizedError
-from songs_api.infrastructure import UnitOfWork
+from mongoengine.errors import NotUniqueError
+
+from songs_api.api.errors import ConflictError, ServiceUnavailableError, UnauthorizedError
+from songs_api.infrastructure import PasswordHasherBusyError, UnitOfWork, get_password_hasher
+from songs_api.models.documents import User
 from songs_api.security.jwt_auth import create_access_token
 
 
@@ -10,20 +13,50 @@ class AuthService:
         with UnitOfWork() as uow:
             user = uow.users_repository.get_by_username(username)
 
-            if not user:
-                raise UnauthorizedError(message="Invalid credentials")
+        if not user:
+            raise UnauthorizedError(message="Invalid credentials")
 
-            if not user.check_password(password):
-                raise UnauthorizedError(message="Invalid credentials")
+        if not self._check_password(user, password):
+            raise UnauthorizedError(message="Invalid credentials")
 
         return create_access_token(username=username)
 
     def register(self, username: str, password: str) -> dict[str, str]:
         with UnitOfWork() as uow:
             existing_user = uow.users_repository.get_by_username(username)
-            if existing_user:
-                raise ConflictError(message="Username already exists")
-
-            user = uow.users_repository.create_user(username=username, password=password)
+        if existing_user:
+            raise ConflictError(message="Username already exists")
+
+        # Hashed between the two units of work, so no session is held open while the pool works.
+        password_hash = self._hash_password(password)
+        try:
+            with UnitOfWork() as uow:
+                user = uow.users_repository.create_user(
+                    username=username, password=password, password_hash=password_hash
+                )
+        except NotUniqueError as exc:
+            # Registered concurrently while this request was hashing; the unique index decides.
+            raise ConflictError(message="Username already exists") from exc
 
         return {"message": "User registered successfully", "username": user.username}
+
+    @staticmethod
+    def _check_password(user: User, password: str) -> bool:
+        hasher = get_password_hasher()
+        if hasher is None:
+            return user.check_password(password)
+        try:
+            return hasher.verify(user.password_hash, password)
+        except PasswordHasherBusyError as exc:
+            raise ServiceUnavailableError(message="Too many sign-ins in progress, please retry shortly") from exc
+
+    @staticmethod
+    def _hash_password(password: str) -> str | None:
+        """Hash on the pool; None when there is no pool and the model hashes it inline."""
+        hasher = get_password_hasher()
+        if hasher is None:
+            return None
+        try:
+            return hasher.hash(password)
+        except PasswordHasherBusyError as exc:
+            raise ServiceUnavailableError(message="Too many sign-ins in progress, please retry shortly") from exc
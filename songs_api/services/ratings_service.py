@@ -1,56 +1,346 @@
 from __future__ import annotations
 
-from songs_api.api.errors import NotFoundError
-from songs_api.infrastructure import UnitOfWork, get_cache
-from songs_api.schemas import RatingStatsResponse
+import math
+import time
+from collections.abc import Iterator
+
+from songs_api.api.errors import NotFoundError, ServiceUnavailableError
+from songs_api.constants import LeaderboardBy, RatingBatchStatus, RatingRange, TrendingWindow
+from songs_api.infrastructure import (
+    RatingBufferFullError,
+    RatingStatsSubscription,
+    RatingStreamLimitError,
+    UnitOfWork,
+    get_cache,
+    get_causal_tokens,
+    get_leaderboards,
+    get_rating_buffer,
+    get_rating_stats_hub,
+    rating_stats_cache_key,
+)
+from songs_api.models.documents import RatingStats, Song
+from songs_api.schemas import (
+    AddRatingRequest,
+    AddRatingsBatchResponse,
+    RankedSongEntry,
+    RankedSongsResponse,
+    RatingAcceptedResponse,
+    RatingBatchItemResult,
+    RatingStatsManyResponse,
+    RatingStatsResponse,
+    SongResponse,
+    TopSongEntry,
+    TopSongsResponse,
+    TrendingSongEntry,
+    TrendingSongsResponse,
+)
 
 
 class RatingsService:
-    def add_rating(self, song_id: str, rating: int) -> RatingStatsResponse:
-        with UnitOfWork(use_transactions=True) as uow:
-            song = uow.songs_repository.get_by_id(song_id)
-            if not song:
+    def add_rating(
+        self, song_id: str, rating: int, username: str | None = None
+    ) -> RatingStatsResponse | RatingAcceptedResponse:
+        # Buffered ratings are written later in bulk, so a transaction would only cover the read.
+        buffered = get_rating_buffer() is not None
+
+        with UnitOfWork(use_transactions=not buffered) as uow:
+            level = uow.songs_repository.get_level(song_id)
+            if level is None:
                 raise NotFoundError(message="Song not found")
 
-            stats = uow.ratings_repository.add_rating(song_id=song_id, rating=rating)
+            try:
+                stats = uow.ratings_repository.add_rating(song_id=song_id, rating=rating, level=level)
+            except RatingBufferFullError as exc:
+                raise ServiceUnavailableError(message="Too many pending ratings, please retry shortly") from exc
+
+        if stats is None:
+            return RatingAcceptedResponse(song_id=song_id, rating=rating)
+
+        causal_tokens = get_causal_tokens()
+        if username and causal_tokens and uow.causal_token:
+            causal_tokens.remember(username, uow.causal_token)
 
         cache = get_cache()
         if cache:
-            cache.delete(f"ratings:stats:{song_id}")
+            cache.delete(rating_stats_cache_key(song_id))
 
-        average = stats.sum / stats.count if stats.count > 0 else None
+        leaderboards = get_leaderboards()
+        if leaderboards:
+            leaderboards.record([stats])
 
-        return RatingStatsResponse(
-            song_id=song_id,
-            average=average,
-            lowest=stats.min,
-            highest=stats.max,
-            count=stats.count,
+        hub = get_rating_stats_hub()
+        if hub:
+            hub.publish([song_id])
+
+        return self._stats_response(song_id, stats)
+
+    def add_ratings(self, items: list[AddRatingRequest], username: str | None = None) -> AddRatingsBatchResponse:
+        """Add a batch of ratings: one existence query, one insert, one stats `bulk_write`.
+
+        Items for unknown songs are reported as `not_found` without failing the rest.
+        """
+        buffered = get_rating_buffer() is not None
+
+        with UnitOfWork(use_transactions=not buffered) as uow:
+            known = uow.songs_repository.get_levels({item.song_id for item in items})
+            accepted = [(item.song_id, item.rating) for item in items if item.song_id in known]
+            stats_by_song = None
+            if accepted:
+                try:
+                    stats_by_song = uow.ratings_repository.add_ratings(accepted, levels=known)
+                except RatingBufferFullError as exc:
+                    raise ServiceUnavailableError(message="Too many pending ratings, please retry shortly") from exc
+
+        if stats_by_song is not None:
+            causal_tokens = get_causal_tokens()
+            if username and causal_tokens and uow.causal_token:
+                causal_tokens.remember(username, uow.causal_token)
+
+            cache = get_cache()
+            if cache:
+                for song_id in stats_by_song:
+                    cache.delete(rating_stats_cache_key(song_id))
+
+            leaderboards = get_leaderboards()
+            if leaderboards:
+                leaderboards.record(stats_by_song.values())
+
+            hub = get_rating_stats_hub()
+            if hub:
+                hub.publish(stats_by_song)
+
+        results = []
+        for index, item in enumerate(items):
+            if item.song_id not in known:
+                result = RatingBatchItemResult(index=index, song_id=item.song_id, status=RatingBatchStatus.NOT_FOUND)
+            elif stats_by_song is None:
+                result = RatingBatchItemResult(index=index, song_id=item.song_id, status=RatingBatchStatus.QUEUED)
+            else:
+                result = RatingBatchItemResult(
+                    index=index,
+                    song_id=item.song_id,
+                    status=RatingBatchStatus.CREATED,
+                    stats=self._stats_response(item.song_id, stats_by_song.get(item.song_id)),
+                )
+            results.append(result)
+
+        return AddRatingsBatchResponse(
+            results=results,
+            created=sum(result.status == RatingBatchStatus.CREATED for result in results),
+            queued=sum(result.status == RatingBatchStatus.QUEUED for result in results),
+            not_found=sum(result.status == RatingBatchStatus.NOT_FOUND for result in results),
         )
 
-    def get_rating_stats(self, song_id: str) -> RatingStatsResponse:
-        with UnitOfWork() as uow:
-            song = uow.songs_repository.get_by_id(song_id)
-            if not song:
+    def get_rating_stats(self, song_id: str, username: str | None = None) -> RatingStatsResponse:
+        # If this user rated recently, read through a causally consistent session so a
+        # secondary cannot return stats older than their own write.
+        causal_tokens = get_causal_tokens()
+        causal_token = causal_tokens.recall(username) if username and causal_tokens else None
+
+        with UnitOfWork(causal_token=causal_token) as uow:
+            if not uow.songs_repository.exists(song_id):
                 raise NotFoundError(message="Song not found")
 
             stats = uow.ratings_repository.get_rating_stats(song_id=song_id)
 
-        if not stats:
-            return RatingStatsResponse(
-                song_id=song_id,
-                average=None,
-                lowest=None,
-                highest=None,
-                count=0,
+        return self._stats_response(song_id, stats)
+
+    def stream_rating_stats(self, song_id: str, username: str | None = None) -> Iterator[RatingStatsResponse | None]:
+        """The song's stats now, then again after each change; None when a keep-alive is due.
+
+        Raises `NotFoundError` right away for an unknown song, before anything is streamed.
+        """
+        hub = get_rating_stats_hub()
+        if hub is None:
+            raise ServiceUnavailableError(message="Live rating stats are disabled")
+
+        # Subscribe before the first read so a change in between still produces an event.
+        try:
+            subscription = hub.subscribe(song_id)
+        except RatingStreamLimitError as exc:
+            raise ServiceUnavailableError(message="Too many live rating streams, please retry shortly") from exc
+        try:
+            initial = self.get_rating_stats(song_id=song_id, username=username)
+        except Exception:
+            hub.unsubscribe(subscription)
+            raise
+        events = self._stats_events(subscription, initial)
+        # Run up to the subscription's `with`, so closing the events unsubscribes even if the
+        # client leaves before the first one is sent.
+        next(events)
+        return events
+
+    def _stats_events(
+        self, subscription: RatingStatsSubscription, initial: RatingStatsResponse
+    ) -> Iterator[RatingStatsResponse | None]:
+        hub = subscription.hub
+        song_id = subscription.song_id
+        with subscription:
+            yield None  # Consumed by `stream_rating_stats`.
+            yield initial
+            deadline = time.monotonic() + hub.max_stream_seconds
+            while (remaining := deadline - time.monotonic()) > 0:
+                if not subscription.wait(min(hub.heartbeat_seconds, remaining)):
+                    yield None
+                    continue
+                yield hub.snapshot(song_id, lambda: self.get_rating_stats(song_id=song_id))
+                # Changes during the pause raise the flag once, so they go out as one event.
+                time.sleep(hub.min_interval_seconds)
+
+    def get_rating_stats_many(self, song_ids: list[str], username: str | None = None) -> RatingStatsManyResponse:
+        """Stats for several songs: per-song cache entries first, then one existence check and one `$in` read."""
+        cache = get_cache()
+        keys = {song_id: rating_stats_cache_key(song_id) for song_id in song_ids}
+        cached = cache.get_many(list(keys.values())) if cache else {}
+        stats = {song_id: RatingStatsResponse(**cached[key]) for song_id, key in keys.items() if key in cached}
+
+        missing = [song_id for song_id in song_ids if song_id not in stats]
+        not_found: list[str] = []
+        if missing:
+            causal_tokens = get_causal_tokens()
+            causal_token = causal_tokens.recall(username) if username and causal_tokens else None
+
+            with UnitOfWork(causal_token=causal_token) as uow:
+                known = uow.songs_repository.get_levels(set(missing))
+                stats_by_song = uow.ratings_repository.get_rating_stats_many([s for s in missing if s in known])
+
+            fresh = {}
+            for song_id in missing:
+                if song_id in known:
+                    fresh[song_id] = self._stats_response(song_id, stats_by_song.get(song_id))
+                else:
+                    not_found.append(song_id)
+            stats.update(fresh)
+            if cache:
+                # Same entries the single-song route caches, so writes invalidate both.
+                cache.set_many({keys[song_id]: response for song_id, response in fresh.items()}, ttl=300)
+
+        return RatingStatsManyResponse(
+            stats={song_id: stats[song_id] for song_id in song_ids if song_id in stats}, not_found=not_found
+        )
+
+    def get_top_songs(self, by: LeaderboardBy, level: int | None, limit: int) -> TopSongsResponse:
+        """Top songs by average rating or count, from the Redis leaderboards or the indexed MongoDB fallback."""
+        leaderboards = get_leaderboards()
+        ranked = leaderboards.top(by, level, limit) if leaderboards else None
+
+        with UnitOfWork() as uow:
+            if ranked:
+                stats_by_song = uow.ratings_repository.get_rating_stats_many([song_id for song_id, _ in ranked])
+                top_stats = [stats_by_song[song_id] for song_id, _ in ranked if song_id in stats_by_song]
+            else:
+                top_stats = uow.ratings_repository.top_rated(by=by, level=level, limit=limit)
+            songs = uow.songs_repository.get_by_ids([stats.song_id for stats in top_stats])
+
+        entries = []
+        for stats in top_stats:
+            song = songs.get(stats.song_id)
+            if song is None or not stats.count:
+                continue
+            entries.append(
+                TopSongEntry(
+                    rank=len(entries) + 1,
+                    song=self._song_response(song),
+                    average=stats.sum / stats.count,
+                    count=stats.count,
+                )
             )
+        return TopSongsResponse(by=by, level=level, songs=entries)
 
-        average = stats.sum / stats.count if stats.count > 0 else None
+    def get_ranked_songs(self, level: int | None, page: int, page_size: int) -> RankedSongsResponse:
+        """Rated songs ordered by Bayesian score with one index scan on `rating_stats`."""
+        with UnitOfWork() as uow:
+            ranked, total = uow.ratings_repository.ranked(level=level, skip=(page - 1) * page_size, limit=page_size)
+            songs = uow.songs_repository.get_by_ids([stats.song_id for stats in ranked])
+
+        data = [
+            RankedSongEntry(
+                rank=(page - 1) * page_size + position,
+                song=self._song_response(songs[stats.song_id]),
+                score=stats.bayesian,
+                average=stats.sum / stats.count,
+                count=stats.count,
+            )
+            for position, stats in enumerate(ranked, start=1)
+            if stats.song_id in songs
+        ]
+        return RankedSongsResponse(
+            level=level,
+            data=data,
+            pagination={
+                "page": page,
+                "page_size": page_size,
+                "total": total,
+                "total_pages": (total + page_size - 1) // page_size if total > 0 else 0,
+            },
+        )
+
+    def get_trending_songs(self, window: TrendingWindow, limit: int) -> TrendingSongsResponse:
+        """Songs rated most over the last hour or day, ranked from the rollup buckets."""
+        with UnitOfWork() as uow:
+            trending = uow.ratings_repository.trending(window=window, limit=limit)
+            songs = uow.songs_repository.get_by_ids([item["song_id"] for item in trending])
+
+        entries = []
+        for item in trending:
+            song = songs.get(item["song_id"])
+            if song is None:
+                continue
+            entries.append(
+                TrendingSongEntry(
+                    rank=len(entries) + 1,
+                    song=self._song_response(song),
+                    ratings=item["ratings"],
+                    average=item["sum"] / item["count"],
+                )
+            )
+        return TrendingSongsResponse(window=window, songs=entries)
+
+    @staticmethod
+    def _song_response(song: Song) -> SongResponse:
+        return SongResponse(
+            id=str(song.id),
+            artist=song.artist,
+            title=song.title,
+            difficulty=song.difficulty,
+            level=song.level,
+            released=song.released,
+        )
+
+    @classmethod
+    def _stats_response(cls, song_id: str, stats: RatingStats | None) -> RatingStatsResponse:
+        if not stats or stats.count == 0:
+            return RatingStatsResponse(song_id=song_id, average=None, lowest=None, highest=None, count=0)
+
+        histogram = [stats.stars.get(str(star), 0) for star in range(RatingRange.MIN, RatingRange.MAX + 1)]
+        # Stats written before per-star counters existed have a partial histogram; do not
+        # derive percentiles from it.
+        complete = sum(histogram) == stats.count
 
         return RatingStatsResponse(
             song_id=song_id,
-            average=average,
+            average=stats.sum / stats.count,
             lowest=stats.min,
             highest=stats.max,
             count=stats.count,
+            histogram=histogram,
+            median=cls._median(histogram) if complete else None,
+            p90=cls._star_at_rank(histogram, math.ceil(0.9 * stats.count)) if complete else None,
         )
+
+    @classmethod
+    def _median(cls, histogram: list[int]) -> float:
+        total = sum(histogram)
+        lower = cls._star_at_rank(histogram, (total + 1) // 2)
+        upper = cls._star_at_rank(histogram, total // 2 + 1)
+        return (lower + upper) / 2
+
+    @staticmethod
+    def _star_at_rank(histogram: list[int], rank: int) -> int:
+        """Star value of the `rank`-th smallest rating (1-based), read off the per-star counts."""
+        seen = 0
+        for offset, count in enumerate(histogram):
+            seen += count
+            if seen >= rank:
+                return RatingRange.MIN + offset
+        return RatingRange.MAX
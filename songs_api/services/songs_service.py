@@ -1,16 +1,47 @@
 from __future__ import annotations
 
-from songs_api.infrastructure import UnitOfWork
-from songs_api.models.documents import Song
-from songs_api.schemas import AverageDifficultyResponse, SearchSongsResponse, SongResponse, SongsListResponse
+import csv
+import io
+import json
+import math
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+import numpy as np
+from pydantic import ValidationError as PydanticValidationError
+
+from songs_api.api.errors import BadRequestError
+from songs_api.constants import DistributionDefaults, ExportDefaults, ExportFormat, ImportDefaults
+from songs_api.infrastructure import CatalogSnapshot, UnitOfWork, get_cache, get_catalog
+from songs_api.models.documents import RatingStats, Song
+from songs_api.repositories import SongListQuery, SongsRepository, UnsupportedQueryError
+from songs_api.schemas import (
+    AverageDifficultyResponse,
+    DifficultyDistribution,
+    DifficultyDistributionResponse,
+    SearchSongsResponse,
+    SongImportError,
+    SongImportResponse,
+    SongImportRow,
+    SongResponse,
+    SongsListResponse,
+)
+
+EXPORT_FIELDS = ("id", "artist", "title", "difficulty", "level", "released")
+EXPORT_RATING_FIELDS = ("rating_count", "rating_average", "rating_lowest", "rating_highest")
 
 
 class SongsService:
-    def list_songs(self, page: int, page_size: int) -> SongsListResponse:
+    def list_songs(self, page: int, page_size: int, query: SongListQuery | None = None) -> SongsListResponse:
         skip = (page - 1) * page_size
 
-        with UnitOfWork() as uow:
-            songs, total = uow.songs_repository.list_songs(skip=skip, limit=page_size)
+        # ApiError is a frozen dataclass, so it must not propagate through the generator-based
+        # reader context (contextlib sets `__traceback__` on exceptions it re-raises).
+        try:
+            with self._songs_reader() as reader:
+                songs, total = reader.list_songs(skip=skip, limit=page_size, query=query)
+        except UnsupportedQueryError as exc:
+            raise BadRequestError(message=str(exc)) from exc
 
         data = [self._song_to_response(song) for song in songs]
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
@@ -28,8 +59,8 @@ class SongsService:
     def search_songs(self, message: str, page: int, page_size: int) -> SearchSongsResponse:
         skip = (page - 1) * page_size
 
-        with UnitOfWork() as uow:
-            songs, total = uow.songs_repository.search_songs(query=message, skip=skip, limit=page_size)
+        with self._songs_reader() as reader:
+            songs, total = reader.search_songs(query=message, skip=skip, limit=page_size)
 
         data = [self._song_to_response(song) for song in songs]
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
@@ -46,11 +77,181 @@ class SongsService:
         )
 
     def get_average_difficulty(self, level: int | None = None) -> AverageDifficultyResponse:
-        with UnitOfWork() as uow:
-            avg = uow.songs_repository.get_average_difficulty(level=level)
+        with self._songs_reader() as reader:
+            avg = reader.get_average_difficulty(level=level)
 
         return AverageDifficultyResponse(average_difficulty=avg, level=level)
 
+    def get_difficulty_distribution(self, bins: int, level: int | None = None) -> DifficultyDistributionResponse:
+        with self._songs_reader() as reader:
+            levels, difficulties = reader.get_difficulty_columns(level=level)
+
+        if difficulties.size == 0:
+            edges = np.array([], dtype=np.float64)
+        else:
+            low = math.floor(difficulties.min())
+            high = max(math.ceil(difficulties.max()), low + 1)
+            edges = np.linspace(low, high, bins + 1)
+
+        order = np.argsort(levels, kind="stable")
+        level_values, starts = np.unique(levels[order], return_index=True)
+        groups = np.split(difficulties[order], starts[1:]) if level_values.size else []
+
+        return DifficultyDistributionResponse(
+            level=level,
+            bin_edges=edges.tolist(),
+            overall=self._distribution(None, difficulties, edges),
+            levels=[
+                self._distribution(int(value), group, edges) for value, group in zip(level_values, groups, strict=True)
+            ],
+        )
+
+    def export_songs(self, export_format: ExportFormat, include_ratings: bool = False) -> Iterator[str]:
+        """Yield the whole catalog as NDJSON lines or CSV chunks, one chunk per cursor batch.
+
+        Only one batch is held in memory at a time; rating stats are joined per batch with a
+        single `$in` query.
+        """
+        fields = EXPORT_FIELDS + EXPORT_RATING_FIELDS if include_ratings else EXPORT_FIELDS
+
+        with UnitOfWork() as uow:
+            if export_format == ExportFormat.CSV:
+                yield self._csv_chunk([fields])
+
+            for batch in uow.songs_repository.iter_song_batches(ExportDefaults.BATCH_SIZE):
+                rows = [self._export_row(doc) for doc in batch]
+                if include_ratings:
+                    stats = uow.ratings_repository.get_rating_stats_many([row["id"] for row in rows])
+                    for row in rows:
+                        row.update(self._export_rating_columns(stats.get(row["id"])))
+
+                if export_format == ExportFormat.CSV:
+                    yield self._csv_chunk([[row[field] for field in fields] for row in rows])
+                else:
+                    yield "".join(json.dumps(row) + "\n" for row in rows)
+
+    def import_songs(self, lines: Iterable[bytes | str], batch_size: int) -> SongImportResponse:
+        """Validate NDJSON rows as they are read and insert them in unordered batches.
+
+        Invalid or rejected rows are reported by line number without aborting their batch.
+        Song caches and the catalog are invalidated once per inserted batch, not per row.
+        """
+        inserted = failed = batches = 0
+        errors: list[SongImportError] = []
+        batch: list[tuple[int, Song]] = []
+
+        def reject(line_no: int, message: str) -> None:
+            nonlocal failed
+            failed += 1
+            if len(errors) < ImportDefaults.MAX_REPORTED_ERRORS:
+                errors.append(SongImportError(line=line_no, error=message))
+
+        def flush(repository: SongsRepository) -> None:
+            nonlocal inserted, batches
+            write_errors = repository.bulk_insert([song for _, song in batch])
+            for index, message in sorted(write_errors.items()):
+                reject(batch[index][0], message)
+            inserted += len(batch) - len(write_errors)
+            batches += 1
+            batch.clear()
+            self._invalidate_song_reads()
+
+        with UnitOfWork() as uow:
+            for line_no, raw in enumerate(lines, start=1):
+                if not raw.strip():
+                    continue
+                try:
+                    row = SongImportRow.model_validate_json(raw)
+                except PydanticValidationError as exc:
+                    reject(line_no, self._validation_message(exc))
+                    continue
+                batch.append((line_no, Song(**row.model_dump())))
+                if len(batch) >= batch_size:
+                    flush(uow.songs_repository)
+            if batch:
+                flush(uow.songs_repository)
+
+        return SongImportResponse(
+            inserted=inserted,
+            failed=failed,
+            batches=batches,
+            errors=errors,
+            errors_truncated=failed > len(errors),
+        )
+
+    @staticmethod
+    def _validation_message(exc: PydanticValidationError) -> str:
+        error = exc.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        return f"{location}: {error['msg']}" if location else error["msg"]
+
+    @staticmethod
+    def _invalidate_song_reads() -> None:
+        cache = get_cache()
+        if cache:
+            cache.invalidate_pattern("songs:*")
+        catalog = get_catalog()
+        if catalog:
+            catalog.invalidate()
+
+    @staticmethod
+    def _export_row(doc: dict) -> dict:
+        released = doc["released"]
+        return {
+            "id": str(doc["_id"]),
+            "artist": doc["artist"],
+            "title": doc["title"],
+            "difficulty": doc["difficulty"],
+            "level": doc["level"],
+            "released": released.date().isoformat() if hasattr(released, "date") else str(released),
+        }
+
+    @staticmethod
+    def _export_rating_columns(stats: RatingStats | None) -> dict:
+        if not stats or stats.count == 0:
+            return dict.fromkeys(EXPORT_RATING_FIELDS) | {"rating_count": 0}
+        return {
+            "rating_count": stats.count,
+            "rating_average": round(stats.sum / stats.count, 2),
+            "rating_lowest": stats.min,
+            "rating_highest": stats.max,
+        }
+
+    @staticmethod
+    def _csv_chunk(rows: list) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _distribution(level: int | None, values: np.ndarray, edges: np.ndarray) -> DifficultyDistribution:
+        if values.size == 0:
+            return DifficultyDistribution(level=level, count=0, histogram=[], p50=None, p90=None, p99=None)
+
+        histogram, _ = np.histogram(values, bins=edges)
+        p50, p90, p99 = np.percentile(values, DistributionDefaults.PERCENTILES)
+        return DifficultyDistribution(
+            level=level,
+            count=int(values.size),
+            histogram=histogram.tolist(),
+            p50=float(p50),
+            p90=float(p90),
+            p99=float(p99),
+        )
+
+    @staticmethod
+    @contextmanager
+    def _songs_reader() -> Iterator[SongsRepository | CatalogSnapshot]:
+        """Yield the in-memory catalog snapshot when that backend is active, else the Mongo repository."""
+        catalog = get_catalog()
+        snapshot = catalog.snapshot() if catalog else None
+        if snapshot is not None:
+            yield snapshot
+            return
+
+        with UnitOfWork() as uow:
+            yield uow.songs_repository
+
     @staticmethod
     def _song_to_response(song: Song) -> SongResponse:
         return SongResponse(
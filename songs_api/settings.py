@@ -5,7 +5,14 @@ from enum import Enum
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from songs_api.constants import LogFormat, LogLevel, PaginationDefaults
+from songs_api.constants import (
+    LogFormat,
+    LogLevel,
+    PaginationDefaults,
+    RatingsWriteMode,
+    ReadPreferenceMode,
+    SongsBackend,
+)
 
 
 class Environment(str, Enum):
@@ -31,13 +38,116 @@ class Settings(BaseSettings):
     mongo_port: int = 27017
     mongo_replica_set_name: str | None = Field(default=None, description="MongoDB replica set name (e.g., 'rs0')")
 
+    mongo_catalog_read_preference: ReadPreferenceMode = Field(
+        default=ReadPreferenceMode.PRIMARY, description="Read preference for song list/search/analytics reads"
+    )
+    mongo_catalog_max_staleness_seconds: int = Field(
+        default=-1, ge=-1, description="maxStalenessSeconds for catalog reads (-1 = no limit, else >= 90)"
+    )
+    mongo_stats_read_preference: ReadPreferenceMode = Field(
+        default=ReadPreferenceMode.PRIMARY, description="Read preference for rating stats reads"
+    )
+    mongo_stats_max_staleness_seconds: int = Field(
+        default=-1, ge=-1, description="maxStalenessSeconds for rating stats reads (-1 = no limit, else >= 90)"
+    )
+    causal_token_ttl_seconds: int = Field(
+        default=120, description="How long a user's stats reads stay causally consistent with their last rating"
+    )
+
     songs_json_path: str = "songs.json"
 
     max_page_size: int = PaginationDefaults.MAX_PAGE_SIZE
 
+    songs_backend: SongsBackend = Field(
+        default=SongsBackend.MONGO, description="Serve song reads from MongoDB or the in-memory catalog"
+    )
+    catalog_refresh_seconds: int = Field(default=30, description="How often the catalog checks MongoDB for writes")
+    catalog_max_age_seconds: int = Field(default=900, description="Catalog snapshots older than this are reloaded")
+    song_id_index_enabled: bool = Field(
+        default=True, description="Keep an in-memory set of song IDs for existence checks on rating requests"
+    )
+
+    ratings_write_mode: RatingsWriteMode = Field(
+        default=RatingsWriteMode.SYNC,
+        description="Write ratings synchronously, through the write-behind buffer or through the Redis queue",
+    )
+    rating_buffer_flush_size: int = Field(default=500, ge=1, description="Buffered ratings that trigger a flush")
+    rating_buffer_flush_seconds: float = Field(default=1.0, gt=0, description="Maximum time a rating stays buffered")
+    rating_buffer_capacity: int = Field(
+        default=10000, ge=1, description="Maximum buffered ratings per worker before requests get 503"
+    )
+    rating_buffer_put_timeout_seconds: float = Field(
+        default=0.5, ge=0, description="How long a request waits for buffer space before failing"
+    )
+    rating_queue_redis_url: str = Field(
+        default="redis://localhost:6379/2", description="Redis holding the rating queue stream (needs no eviction)"
+    )
+    rating_queue_stream: str = Field(default="ratings:queue", description="Redis Stream key of the rating queue")
+    rating_queue_group: str = Field(default="rating-writers", description="Consumer group applying queued ratings")
+    rating_queue_capacity: int = Field(
+        default=1_000_000, ge=1, description="Queued ratings beyond which requests get 503"
+    )
+    rating_stats_shards: int = Field(
+        default=0, ge=0, description="Counter shards per hot song (0 disables sharded rating counters)"
+    )
+    rating_hot_song_writes_per_second: int = Field(
+        default=50, ge=1, description="Ratings per second, per worker, at which a song switches to sharded counters"
+    )
+    rating_prior_weight: float = Field(
+        default=10.0, gt=0, description="Ratings' worth of the global mean blended into each Bayesian score"
+    )
+    rating_prior_refresh_seconds: float = Field(
+        default=300.0, gt=0, description="How often workers re-read the global mean rating behind Bayesian scores"
+    )
+    rating_stream_enabled: bool = Field(default=True, description="Serve live rating stats over Server-Sent Events")
+    rating_stream_min_interval_seconds: float = Field(
+        default=1.0,
+        ge=0,
+        description="Minimum time between two stats events on one stream; changes in between coalesce",
+    )
+    rating_stream_heartbeat_seconds: float = Field(
+        default=15.0, gt=0, description="Idle time after which a stream sends a keep-alive comment"
+    )
+    rating_stream_max_seconds: float = Field(
+        default=300.0, gt=0, description="Streams are closed after this long; clients reconnect"
+    )
+    rating_stream_max_connections: int = Field(
+        default=1000,
+        ge=1,
+        description="Open streams per gevent worker (make run-streams); at most its --worker-connections",
+    )
+    rating_stream_max_threaded_connections: int = Field(
+        default=4,
+        ge=1,
+        description="Open streams per gthread worker, each holding a request thread; keep it well below the threads",
+    )
+    idempotency_ttl_seconds: int = Field(
+        default=86400, ge=0, description="How long Idempotency-Key responses are replayed (0 ignores the header)"
+    )
+    idempotency_lock_seconds: int = Field(
+        default=600,
+        ge=1,
+        description="How long an unfinished request holds its Idempotency-Key; keep it well above the longest request",
+    )
+
+    password_hash_workers: int = Field(
+        default=2, ge=0, description="Processes per web worker that hash passwords (0 hashes in the request thread)"
+    )
+    password_hash_max_pending: int | None = Field(
+        default=None,
+        ge=1,
+        description="Hashes queued or running per web worker before logins get 503 (default 2x PASSWORD_HASH_WORKERS)",
+    )
+    password_hash_timeout_seconds: float = Field(
+        default=5.0, gt=0, description="How long a request waits for its hash before failing with 503"
+    )
+
     jwt_secret_key: str = "your-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
     jwt_access_token_expire_minutes: int = 60
+    jwt_verified_token_cache_size: int = Field(
+        default=10000, ge=0, description="Verified tokens remembered per worker until they expire (0 = off)"
+    )
 
     @model_validator(mode="after")
     def build_mongo_uri(self) -> Settings:
@@ -89,6 +199,13 @@ class Settings(BaseSettings):
                 self.rate_limit_storage_uri = "memory://"
         return self
 
+    @model_validator(mode="after")
+    def check_rating_buffer_flush_size(self) -> Settings:
+        """A flush size above the capacity is never reached, so only the interval would flush."""
+        if self.rating_buffer_flush_size > self.rating_buffer_capacity:
+            raise ValueError("RATING_BUFFER_FLUSH_SIZE must not exceed RATING_BUFFER_CAPACITY")
+        return self
+
     @property
     def is_production(self) -> bool:
         return self.environment == Environment.PRODUCTION
@@ -5,6 +5,7 @@ from datetime import date
 import mongomock
 import pytest
 import secrets
+import threading
 from mongoengine import connect, disconnect
 
 from songs_api import create_app
@@ -14,6 +15,38 @@ from songs_api.security.jwt_auth import create_access_token
 from songs_api.settings import Environment, Settings
 
 
+def _accept_bulk_sort_argument() -> None:
+    """PyMongo >= 4.11 passes `sort=` to bulk builders, which mongomock 4.3 does not accept."""
+    builder = mongomock.collection.BulkOperationBuilder
+    add_update = builder.add_update
+
+    def patched(self, selector, doc, *args, sort=None, **kwargs):
+        return add_update(self, selector, doc, *args, **kwargs)
+
+    builder.add_update = patched
+
+
+def _serialize_writes() -> None:
+    """Make mongomock updates atomic per call, as single-document updates are on a real server.
+
+    Pipeline updates clear and refill the document, so unsynchronised threads can read it half-written.
+    """
+    lock = threading.RLock()
+    collection = mongomock.collection.Collection
+    for name in ("_update", "_find_and_modify"):
+        method = getattr(collection, name)
+
+        def locked(self, *args, _method=method, **kwargs):
+            with lock:
+                return _method(self, *args, **kwargs)
+
+        setattr(collection, name, locked)
+
+
+_accept_bulk_sort_argument()
+_serialize_writes()
+
+
 @pytest.fixture(scope="function")
 def test_db():
     """Create a test database connection using mongomock."""
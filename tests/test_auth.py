@@ -1,3 +1,14 @@
+import time
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import jwt
+import jwt.api_jwt
+
+from songs_api.security import jwt_auth
+from songs_api.security.jwt_auth import VerifiedTokenCache
+
+
 def test_login_success(client, test_user_credentials):
     """Test successful login returns JWT token."""
     response = client.post(
@@ -47,3 +58,87 @@ def test_protected_route_with_valid_token(client, auth_headers):
     """Test that protected routes accept valid tokens."""
     response = client.get("/api/v1/songs", headers=auth_headers)
     assert response.status_code == 200
+
+
+class _DictCache:
+    enabled = True
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ttl=300):
+        self.values[key] = value
+        return True
+
+
+def test_cached_response_requires_token(client, auth_headers, sample_songs, monkeypatch):
+    """Cache hits are only served to authenticated requests."""
+    cache = _DictCache()
+    monkeypatch.setattr("songs_api.api.caching.get_cache", lambda: cache)
+
+    assert client.get("/api/v1/songs", headers=auth_headers).status_code == 200
+    assert cache.values
+
+    assert client.get("/api/v1/songs").status_code == 401
+    assert client.get("/api/v1/songs", headers={"Authorization": "Bearer invalid-token"}).status_code == 401
+    assert client.get("/api/v1/songs", headers=auth_headers).status_code == 200
+
+
+def test_verified_token_is_not_decoded_again(client, auth_headers, monkeypatch):
+    """A token verified once in this worker skips jwt.decode on later requests."""
+    decode = jwt.decode
+    calls = []
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+
+    for _ in range(3):
+        assert client.get("/api/v1/songs", headers=auth_headers).status_code == 200
+    assert len(calls) <= 1
+
+
+def test_verified_token_cache_evicts_expired_and_least_recent():
+    """Entries are dropped at the token's expiry and beyond the size bound."""
+    cache = VerifiedTokenCache(max_size=2)
+    cache.put(b"expired", "alice", time.time() - 1)
+    assert cache.get(b"expired") is None
+    assert len(cache) == 0
+
+    cache.put(b"a", "alice", time.time() + 60)
+    cache.put(b"b", "bob", time.time() + 60)
+    assert cache.get(b"a") == "alice"
+    cache.put(b"c", "carol", time.time() + 60)
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == "alice"
+    assert cache.get(b"c") == "carol"
+
+
+def test_expired_token_rejected_after_being_cached(app, test_user_credentials, monkeypatch):
+    """A cached token still fails as expired once its expiry passes."""
+    expires_at = int(time.time()) + 60
+    token = jwt.encode(
+        {"sub": test_user_credentials["username"], "exp": expires_at}, "test-secret-key", algorithm="HS256"
+    )
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/songs", headers=headers).status_code == 200
+
+    # Move both the cache's clock and PyJWT's past the expiry instead of sleeping.
+    later = expires_at + 1
+
+    class _Later(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(later, tz or UTC)
+
+    monkeypatch.setattr(jwt_auth, "time", SimpleNamespace(time=lambda: later))
+    monkeypatch.setattr(jwt.api_jwt, "datetime", _Later)
+    response = client.get("/api/v1/songs", headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()["error"] == "Token has expired"
@@ -0,0 +1,85 @@
+"""Tests for the in-memory columnar songs catalog."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from songs_api.constants import SongsBackend, SongSort
+from songs_api.infrastructure import SongCatalog
+from songs_api.models.documents import Song
+from songs_api.repositories import SongListQuery, SongsRepository, UnsupportedQueryError
+from songs_api.settings import Settings
+
+
+@pytest.fixture
+def catalog(test_db):
+    return SongCatalog(Settings(songs_backend=SongsBackend.CATALOG, catalog_refresh_seconds=0))
+
+
+def test_catalog_disabled_for_mongo_backend(test_db):
+    """Test that the catalog serves nothing unless selected as the backend."""
+    catalog = SongCatalog(Settings(songs_backend=SongsBackend.MONGO))
+    assert catalog.snapshot() is None
+
+
+def test_catalog_list_songs(catalog, sample_songs):
+    """Test listing in id order and with index-shaped filters."""
+    snapshot = catalog.snapshot()
+
+    songs, total = snapshot.list_songs(skip=0, limit=2)
+    assert total == 3
+    assert [str(song.id) for song in songs] == [str(sample_songs[0].id), str(sample_songs[1].id)]
+
+    songs, total = snapshot.list_songs(skip=0, limit=10, query=SongListQuery(level=13, sort=SongSort.DIFFICULTY_DESC))
+    assert total == 2
+    assert [song.difficulty for song in songs] == [15.0, 14.6]
+
+    songs, _ = snapshot.list_songs(
+        skip=0, limit=10, query=SongListQuery(artist="The Yousicians", released_from=date(2015, 1, 1))
+    )
+    assert [song.title for song in songs] == ["Lycanthropic Metamorphosis"]
+    assert songs[0].released == date(2016, 10, 26)
+
+
+def test_catalog_rejects_unindexed_shape(catalog, sample_songs):
+    """Test that the catalog enforces the same query whitelist as MongoDB."""
+    with pytest.raises(UnsupportedQueryError):
+        catalog.snapshot().list_songs(skip=0, limit=10, query=SongListQuery(difficulty_min=10))
+
+
+def test_catalog_search_and_average(catalog, sample_songs):
+    """Test case-insensitive substring search and level-filtered averages."""
+    snapshot = catalog.snapshot()
+
+    songs, total = snapshot.search_songs(query="kennel", skip=0, limit=10)
+    assert total == 1
+    assert songs[0].title == "A New Kennel"
+
+    _, total = snapshot.search_songs(query="YOUSICIANS", skip=0, limit=10)
+    assert total == 2
+
+    assert snapshot.get_average_difficulty(level=13) == pytest.approx((14.6 + 15.0) / 2)
+    assert snapshot.get_average_difficulty(level=999) is None
+
+
+def test_catalog_reloads_after_write(catalog, sample_songs):
+    """Test that a version change is picked up on the next read."""
+    assert len(catalog.snapshot()) == 3
+
+    Song(artist="New Artist", title="New Song", difficulty=3.0, level=1, released=date(2020, 1, 1)).save()
+    catalog.invalidate()
+
+    assert len(catalog.snapshot()) == 4
+
+
+def test_catalog_reloads_after_in_place_update(catalog, sample_songs):
+    """Test that an update which keeps the count and newest `_id` still reloads the snapshot."""
+    assert catalog.snapshot().get_average_difficulty(level=13) == pytest.approx((14.6 + 15.0) / 2)
+
+    Song.objects(level=13).update(set__difficulty=1.0)
+    SongsRepository().bump_catalog_version()
+    catalog.invalidate()
+
+    assert catalog.snapshot().get_average_difficulty(level=13) == pytest.approx(1.0)
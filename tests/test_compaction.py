@@ -0,0 +1,89 @@
+"""Tests for compacting old raw ratings into archive buckets."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from songs_api.models.documents import Rating, RatingArchive, RatingStats
+from songs_api.repositories import RatingsRepository
+from songs_api.scripts import compact_ratings as compaction
+from songs_api.scripts.reconcile_ratings import reconcile_ratings
+
+
+def _old_ratings(song_id: str) -> datetime:
+    """Three ratings past a 90 day retention window, over two days; one predates `created_at`."""
+    day = (datetime.now(UTC) - timedelta(days=100)).replace(hour=12, minute=0, second=0, microsecond=0)
+    for offset, rating, created_at in [(0, 4, day), (1, 5, day), (86400, 4, None)]:
+        moment = day + timedelta(seconds=offset)
+        Rating(id=ObjectId.from_datetime(moment), song_id=song_id, rating=rating, created_at=created_at).save()
+    return day.replace(tzinfo=None, hour=0)
+
+
+def test_compaction_archives_and_deletes_old_ratings(test_db, sample_songs):
+    """Test that old ratings become daily star counts and only recent ratings stay raw."""
+    song_id = str(sample_songs[0].id)
+    first_day = _old_ratings(song_id)
+    RatingsRepository().add_rating(song_id=song_id, rating=2)
+
+    assert compaction.compact_ratings(retention_days=90, batch_size=2, max_ratings_per_second=0) == 3
+
+    assert [rating.rating for rating in Rating.objects(song_id=song_id)] == [2]
+    archive = {bucket.day: bucket for bucket in RatingArchive.objects(song_id=song_id)}
+    assert set(archive) == {first_day, first_day + timedelta(days=1)}
+    assert (archive[first_day].count, archive[first_day].stars) == (2, {"4": 1, "5": 1})
+    assert archive[first_day + timedelta(days=1)].stars == {"4": 1}
+    assert compaction.compact_ratings(retention_days=90, max_ratings_per_second=0) == 0
+
+
+def test_compaction_is_rate_limited(test_db, sample_songs, monkeypatch):
+    """Test that batches are paced to the configured ratings per second."""
+    _old_ratings(str(sample_songs[0].id))
+    sleeps = []
+    monkeypatch.setattr(compaction.time, "sleep", sleeps.append)
+
+    compaction.compact_ratings(retention_days=90, batch_size=1, max_ratings_per_second=1)
+
+    assert len(sleeps) == 3
+    assert sleeps[-1] > 2
+
+
+def test_reconcile_counts_archived_ratings(test_db, sample_songs):
+    """Test that compacted ratings still count when stats are recomputed."""
+    song_id = str(sample_songs[0].id)
+    _old_ratings(song_id)
+    RatingsRepository().add_rating(song_id=song_id, rating=1)
+    reconcile_ratings(workers=1)
+
+    compaction.compact_ratings(retention_days=90, max_ratings_per_second=0)
+    result = reconcile_ratings(workers=1)
+
+    assert result.drifted == 0
+    stats = RatingStats.objects(song_id=song_id).first()
+    assert (stats.count, stats.sum, stats.min, stats.max) == (4, 14, 1, 5)
+
+
+def test_interrupted_compaction_is_archived_once(test_db, sample_songs, monkeypatch):
+    """Test that a batch archived but not yet deleted is finished, not archived again, by the next run."""
+    song_id = str(sample_songs[0].id)
+    first_day = _old_ratings(song_id)
+    ratings_coll = Rating._get_collection()
+    delete_many = ratings_coll.delete_many
+
+    def interrupted(*args, **kwargs):
+        raise ConnectionError("stopped between archive and delete")
+
+    monkeypatch.setattr(type(ratings_coll), "delete_many", interrupted)
+    with pytest.raises(ConnectionError):
+        compaction.compact_ratings(retention_days=90, batch_size=2, max_ratings_per_second=0)
+    monkeypatch.setattr(type(ratings_coll), "delete_many", lambda self, *args, **kwargs: delete_many(*args, **kwargs))
+
+    assert compaction.compact_ratings(retention_days=90, batch_size=2, max_ratings_per_second=0) == 3
+
+    archive = {bucket.day: bucket for bucket in RatingArchive.objects(song_id=song_id)}
+    assert (archive[first_day].count, archive[first_day].stars) == (2, {"4": 1, "5": 1})
+    assert archive[first_day + timedelta(days=1)].count == 1
+    reconcile_ratings(workers=1)
+    assert RatingStats.objects(song_id=song_id).first().count == 3
@@ -22,3 +22,35 @@ def test_average_difficulty_requires_auth(client):
     """Test that average difficulty requires authentication."""
     response = client.get("/api/v1/songs/difficulty/average")
     assert response.status_code == 401
+
+
+def test_difficulty_distribution(client, auth_headers, sample_songs):
+    """Test histograms and percentiles overall and per level."""
+    response = client.get("/api/v1/songs/difficulty/distribution?bins=6", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert data["bin_edges"] == [9.0, 10.0, 11.0, 12.0, 13.0, 14.0, 15.0]
+    assert data["overall"]["count"] == 3
+    assert data["overall"]["histogram"] == [1, 0, 0, 0, 0, 2]
+    assert data["overall"]["p50"] == 14.6
+
+    by_level = {entry["level"]: entry for entry in data["levels"]}
+    assert set(by_level) == {9, 13}
+    assert by_level[13]["histogram"] == [0, 0, 0, 0, 0, 2]
+    assert abs(by_level[13]["p90"] - 14.96) < 0.001
+
+
+def test_difficulty_distribution_empty_level(client, auth_headers, sample_songs):
+    """Test distribution for a level with no songs."""
+    response = client.get("/api/v1/songs/difficulty/distribution?level=999", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["overall"]["count"] == 0
+    assert data["levels"] == []
+
+
+def test_difficulty_distribution_requires_auth(client):
+    """Test that difficulty distribution requires authentication."""
+    response = client.get("/api/v1/songs/difficulty/distribution")
+    assert response.status_code == 401
@@ -0,0 +1,60 @@
+"""Tests for the streaming catalog export."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+
+def test_export_ndjson(client, auth_headers, sample_songs):
+    """Test that every song is streamed as one JSON object per line."""
+    response = client.get("/api/v1/songs/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert "songs.ndjson" in response.headers["Content-Disposition"]
+
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["id"] for row in rows] == [str(song.id) for song in sample_songs]
+    assert rows[1]["title"] == "A New Kennel"
+    assert rows[1]["released"] == "2010-02-03"
+    assert "rating_count" not in rows[0]
+
+
+def test_export_csv_with_ratings(client, auth_headers, sample_songs):
+    """Test CSV output with rating stats joined onto each row."""
+    song_id = str(sample_songs[0].id)
+    for rating in (2, 4):
+        client.post("/api/v1/songs/ratings", headers=auth_headers, json={"song_id": song_id, "rating": rating})
+
+    response = client.get("/api/v1/songs/export?format=csv&include_ratings=true", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 3
+    assert rows[0]["id"] == song_id
+    assert rows[0]["rating_count"] == "2"
+    assert rows[0]["rating_average"] == "3.0"
+    assert rows[0]["rating_lowest"] == "2"
+    assert rows[1]["rating_count"] == "0"
+    assert rows[1]["rating_average"] == ""
+
+
+def test_export_empty_catalog(client, auth_headers):
+    """Test that an empty catalog exports only the CSV header."""
+    response = client.get("/api/v1/songs/export?format=csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).strip() == "id,artist,title,difficulty,level,released"
+
+
+def test_export_invalid_format(client, auth_headers):
+    """Test that unknown formats are rejected."""
+    response = client.get("/api/v1/songs/export?format=xml", headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_export_requires_auth(client):
+    """Test that exporting requires authentication."""
+    response = client.get("/api/v1/songs/export")
+    assert response.status_code == 401
@@ -0,0 +1,99 @@
+"""Tests for Idempotency-Key handling on rating writes."""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import UTC, datetime, timedelta
+
+from songs_api.infrastructure import IdempotencyStore
+from songs_api.models.documents import IdempotencyKey, Rating, RatingStats
+
+
+def _post_rating(client, auth_headers, song, rating, key):
+    return client.post(
+        "/api/v1/songs/ratings",
+        json={"song_id": str(song.id), "rating": rating},
+        headers={**auth_headers, "Idempotency-Key": key},
+    )
+
+
+def test_retry_replays_response_without_writing(client, auth_headers, sample_songs):
+    """Test that a repeated key returns the first response and adds no second rating."""
+    first = _post_rating(client, auth_headers, sample_songs[0], 4, "retry-1")
+    retry = _post_rating(client, auth_headers, sample_songs[0], 4, "retry-1")
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert Rating.objects(song_id=str(sample_songs[0].id)).count() == 1
+    assert RatingStats.objects(song_id=str(sample_songs[0].id)).first().count == 1
+
+    assert _post_rating(client, auth_headers, sample_songs[0], 4, "retry-2").status_code == 201
+    assert Rating.objects(song_id=str(sample_songs[0].id)).count() == 2
+
+
+def test_key_reused_for_a_different_request(client, auth_headers, sample_songs):
+    """Test that a key cannot be replayed for a different body."""
+    assert _post_rating(client, auth_headers, sample_songs[0], 4, "reused").status_code == 201
+
+    response = _post_rating(client, auth_headers, sample_songs[0], 2, "reused")
+
+    assert response.status_code == 422
+    assert Rating.objects.count() == 1
+
+
+def test_concurrent_duplicate_is_rejected_while_pending(client, auth_headers, sample_songs):
+    """Test that a duplicate arriving while the first request holds the key gets 409."""
+    body = f'{{"song_id": "{sample_songs[0].id}", "rating": 3}}'.encode()
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=60)
+    # The reservation another worker would hold mid-request.
+    assert store.reserve("ratings:add:testuser:pending", hashlib.sha256(body).hexdigest(), "other") is None
+
+    response = client.post(
+        "/api/v1/songs/ratings",
+        data=body,
+        content_type="application/json",
+        headers={**auth_headers, "Idempotency-Key": "pending"},
+    )
+
+    assert response.status_code == 409
+    assert Rating.objects.count() == 0
+
+
+def test_failed_request_releases_key(client, auth_headers, sample_songs):
+    """Test that an error response is not stored, so the retry runs again."""
+    missing = {"song_id": "507f1f77bcf86cd799439011", "rating": 3}
+    headers = {**auth_headers, "Idempotency-Key": "missing"}
+
+    assert client.post("/api/v1/songs/ratings", json=missing, headers=headers).status_code == 404
+    assert IdempotencyKey.objects.count() == 0
+
+
+def test_abandoned_reservation_is_taken_over(test_db):
+    """Test that a reservation left by a crashed request can be claimed once its lock lapses."""
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=60)
+    assert store.reserve("key", "a", "first") is None
+    assert store.reserve("key", "a", "second").pending
+
+    IdempotencyKey.objects(id="key").update(set__locked_until=datetime.now(UTC) - timedelta(seconds=1))
+
+    assert store.reserve("key", "a", "second") is None
+    store.complete("key", "second", 201, {"ok": True})
+    assert store.reserve("key", "a", "third").body == {"ok": True}
+
+
+def test_slow_request_cannot_touch_its_successors_reservation(test_db):
+    """Test that a request whose lock lapsed can neither release nor complete the key another request took over."""
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=60)
+    assert store.reserve("key", "a", "slow") is None
+    IdempotencyKey.objects(id="key").update(set__locked_until=datetime.now(UTC) - timedelta(seconds=1))
+    assert store.reserve("key", "a", "retry") is None
+
+    store.release("key", "slow")
+    assert store.reserve("key", "a", "third").pending
+    store.complete("key", "slow", 500, {"error": "late"})
+    assert store.reserve("key", "a", "third").pending
+
+    store.complete("key", "retry", 201, {"ok": True})
+    assert store.reserve("key", "a", "third").body == {"ok": True}
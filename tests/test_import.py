@@ -0,0 +1,91 @@
+"""Tests for the streaming bulk song import."""
+
+from __future__ import annotations
+
+import json
+
+from songs_api.models.documents import Song
+
+
+def _ndjson(*rows) -> str:
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+
+def test_import_songs(client, auth_headers, test_db):
+    """Test that valid rows are inserted across several batches."""
+    body = _ndjson(
+        *(
+            {"artist": "Artist", "title": f"Song {i}", "difficulty": 5.5, "level": 3, "released": "2020-01-01"}
+            for i in range(5)
+        )
+    )
+    response = client.post(
+        "/api/v1/songs/import?batch_size=2",
+        headers=auth_headers,
+        data=body,
+        content_type="application/x-ndjson",
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["inserted"] == 5
+    assert data["failed"] == 0
+    assert data["batches"] == 3
+    assert Song.objects.count() == 5
+
+
+def test_import_reports_row_errors(client, auth_headers, test_db):
+    """Test that bad rows are reported by line number while the rest are inserted."""
+    body = _ndjson(
+        {"artist": "A", "title": "Good", "difficulty": 1.0, "level": 1},
+        "{not json",
+        {"artist": "A", "title": "No level", "difficulty": 1.0},
+        "",
+        {"artist": "A", "title": "Also good", "difficulty": 2.0, "level": 2, "released": "2019-05-01"},
+    )
+    response = client.post("/api/v1/songs/import", headers=auth_headers, data=body)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["inserted"] == 2
+    assert data["failed"] == 2
+    assert [error["line"] for error in data["errors"]] == [2, 3]
+    assert data["errors"][1]["error"].startswith("level")
+    assert data["errors_truncated"] is False
+    assert Song.objects(title="Good").first().released is not None
+
+
+def test_import_rejects_duplicate_songs(client, auth_headers, sample_songs):
+    """Test that a song already in the catalog, or repeated in the body, is reported instead of duplicated."""
+    body = _ndjson(
+        {"artist": "The Yousicians", "title": "A New Kennel", "difficulty": 9.1, "level": 9},
+        {"artist": "New", "title": "Once", "difficulty": 3.0, "level": 1},
+        {"artist": "New", "title": "Once", "difficulty": 3.0, "level": 1},
+    )
+    response = client.post("/api/v1/songs/import", headers=auth_headers, data=body)
+
+    data = response.get_json()
+    assert (data["inserted"], data["failed"]) == (1, 2)
+    assert [error["line"] for error in data["errors"]] == [1, 3]
+    assert data["errors"][0]["error"] == "A song with this artist and title already exists"
+    assert Song.objects(artist="The Yousicians", title="A New Kennel").count() == 1
+
+
+def test_import_invalidates_cached_lists(client, auth_headers, sample_songs):
+    """Test that imported songs are visible on the next list request."""
+    assert client.get("/api/v1/songs", headers=auth_headers).get_json()["pagination"]["total"] == 3
+
+    body = _ndjson({"artist": "New", "title": "Imported", "difficulty": 3.0, "level": 1})
+    client.post("/api/v1/songs/import", headers=auth_headers, data=body)
+
+    assert client.get("/api/v1/songs", headers=auth_headers).get_json()["pagination"]["total"] == 4
+
+
+def test_import_invalid_batch_size(client, auth_headers):
+    """Test that the batch size is bounded."""
+    response = client.post("/api/v1/songs/import?batch_size=0", headers=auth_headers, data="")
+    assert response.status_code == 422
+
+
+def test_import_requires_auth(client):
+    """Test that importing requires authentication."""
+    response = client.post("/api/v1/songs/import", data="")
+    assert response.status_code == 401
@@ -0,0 +1,96 @@
+"""Tests for the top-rated and most-rated song leaderboards."""
+
+from __future__ import annotations
+
+from songs_api.models.documents import RatingStats
+from songs_api.repositories import RatingsRepository
+
+
+def _rate(client, auth_headers, song, *ratings):
+    for rating in ratings:
+        response = client.post(
+            "/api/v1/songs/ratings", json={"song_id": str(song.id), "rating": rating}, headers=auth_headers
+        )
+        assert response.status_code == 201
+
+
+def test_top_songs_by_average(client, auth_headers, sample_songs):
+    """Test that songs are ranked by average rating, best first, and unrated songs are left out."""
+    _rate(client, auth_headers, sample_songs[0], 3, 4)
+    _rate(client, auth_headers, sample_songs[1], 5)
+
+    response = client.get("/api/v1/songs/top", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["by"] == "average"
+    assert [entry["song"]["id"] for entry in data["songs"]] == [str(sample_songs[1].id), str(sample_songs[0].id)]
+    assert [entry["rank"] for entry in data["songs"]] == [1, 2]
+    assert data["songs"][1]["average"] == 3.5
+    assert data["songs"][1]["count"] == 2
+
+
+def test_top_songs_by_count(client, auth_headers, sample_songs):
+    """Test that by=count ranks the most-rated songs first."""
+    _rate(client, auth_headers, sample_songs[0], 3, 4)
+    _rate(client, auth_headers, sample_songs[1], 5)
+
+    response = client.get("/api/v1/songs/top?by=count&limit=1", headers=auth_headers)
+
+    assert response.status_code == 200
+    songs = response.get_json()["songs"]
+    assert [entry["song"]["id"] for entry in songs] == [str(sample_songs[0].id)]
+
+
+def test_top_songs_by_level(client, auth_headers, sample_songs):
+    """Test that the level filter uses the song level stored alongside the stats."""
+    _rate(client, auth_headers, sample_songs[0], 2)
+    _rate(client, auth_headers, sample_songs[1], 5)
+    _rate(client, auth_headers, sample_songs[2], 4)
+
+    response = client.get("/api/v1/songs/top?level=13", headers=auth_headers)
+
+    assert response.status_code == 200
+    songs = response.get_json()["songs"]
+    assert [entry["song"]["id"] for entry in songs] == [str(sample_songs[2].id), str(sample_songs[0].id)]
+    assert all(entry["song"]["level"] == 13 for entry in songs)
+
+
+def test_top_songs_includes_batch_ratings(client, auth_headers, sample_songs):
+    """Test that ratings added through the batch endpoint update the leaderboard fields."""
+    response = client.post(
+        "/api/v1/songs/ratings/batch",
+        json={"ratings": [{"song_id": str(sample_songs[2].id), "rating": 5}]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    stats = RatingStats.objects(song_id=str(sample_songs[2].id)).first()
+    assert (stats.level, stats.average) == (13, 5.0)
+
+    songs = client.get("/api/v1/songs/top?level=13", headers=auth_headers).get_json()["songs"]
+    assert [entry["song"]["id"] for entry in songs] == [str(sample_songs[2].id)]
+
+
+def test_top_songs_invalid_params(client, auth_headers, sample_songs):
+    """Test that an unknown ranking or an out-of-range limit is rejected."""
+    assert client.get("/api/v1/songs/top?by=difficulty", headers=auth_headers).status_code == 422
+    assert client.get("/api/v1/songs/top?limit=0", headers=auth_headers).status_code == 422
+    assert client.get("/api/v1/songs/top?limit=101", headers=auth_headers).status_code == 422
+
+
+def test_top_songs_requires_auth(client, sample_songs):
+    """Test that the leaderboard requires authentication."""
+    assert client.get("/api/v1/songs/top").status_code == 401
+
+
+def test_add_rating_stores_level_and_average(test_db, sample_songs):
+    """Test that the repository keeps `average` in step with sum/count for the indexed fallback."""
+    repo = RatingsRepository()
+    song_id = str(sample_songs[1].id)
+
+    repo.add_rating(song_id=song_id, rating=2, level=9)
+    repo.add_rating(song_id=song_id, rating=5, level=9)
+
+    stats = RatingStats.objects(song_id=song_id).first()
+    assert (stats.level, stats.average) == (9, 3.5)
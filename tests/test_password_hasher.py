@@ -0,0 +1,106 @@
+"""Tests for password hashing on the bounded process pool."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from songs_api.infrastructure import PasswordHasher, PasswordHasherBusyError, get_password_hasher, init_password_hasher
+from songs_api.repositories import UsersRepository
+from songs_api.settings import Settings
+
+
+def test_hash_and_verify_on_pool(password_factory):
+    """Test that hashes made in the pool verify, and that latency is recorded."""
+    hasher = PasswordHasher(workers=1, max_pending=4, timeout_seconds=30)
+    password = password_factory()
+    try:
+        password_hash = hasher.hash(password)
+
+        assert hasher.verify(password_hash, password)
+        assert not hasher.verify(password_hash, password_factory())
+    finally:
+        hasher.close()
+
+    metrics = hasher.metrics()
+    assert (metrics["completed"], metrics["pending"], metrics["rejected"]) == (3, 0, 0)
+    assert metrics["latency_ms_max"] >= metrics["latency_ms_avg"] > 0
+
+
+def test_full_queue_fails_fast(password_factory):
+    """Test that a hasher with no free slot rejects work instead of queueing it."""
+    hasher = PasswordHasher(workers=0, max_pending=1, timeout_seconds=30)
+    hasher._slots.acquire()  # A hash already in flight.
+
+    with pytest.raises(PasswordHasherBusyError):
+        hasher.hash(password_factory())
+
+    hasher._slots.release()
+    assert hasher.hash("pw")
+    assert hasher.metrics()["rejected"] == 1
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    """Test that a caller giving up on a slow hash does not free the slot while the hash still runs."""
+    hasher = PasswordHasher(workers=1, max_pending=1, timeout_seconds=0.05)
+    try:
+        with pytest.raises(PasswordHasherBusyError):
+            hasher._run(time.sleep, 0.5)
+
+        assert hasher.metrics()["pending"] == 1
+        with pytest.raises(PasswordHasherBusyError, match="queue is full"):
+            hasher.hash("pw")
+
+        deadline = time.monotonic() + 30
+        while hasher.metrics()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        hasher.timeout_seconds = 30
+        assert hasher.hash("pw")
+    finally:
+        hasher.close()
+
+
+def test_default_bound_follows_pool_size():
+    """Test that the pending bound defaults to twice the hashing processes."""
+    hasher = init_password_hasher(Settings(password_hash_workers=3))
+    try:
+        assert hasher.max_pending == 6
+    finally:
+        init_password_hasher(Settings())
+
+
+def test_login_when_hashing_is_saturated(client, test_user_credentials):
+    """Test that logins get 503 while every hashing slot is taken, and succeed again after."""
+    hasher = get_password_hasher()
+    for _ in range(hasher.max_pending):
+        hasher._slots.acquire()
+
+    response = client.post("/api/v1/auth/login", json=test_user_credentials)
+
+    assert response.status_code == 503
+    for _ in range(hasher.max_pending):
+        hasher._slots.release()
+    assert client.post("/api/v1/auth/login", json=test_user_credentials).status_code == 200
+    assert client.get("/api/v1/metrics").get_json()["password_hashing"]["rejected"] == 1
+
+
+def test_register_hashes_on_pool(client, password_factory):
+    """Test that a user registered through the pool can log in."""
+    credentials = {"username": "pooluser", "password": password_factory()}
+
+    assert client.post("/api/v1/auth/register", json=credentials).status_code == 201
+    assert client.post("/api/v1/auth/login", json=credentials).status_code == 200
+
+
+def test_register_race_is_a_conflict(client, password_factory, monkeypatch):
+    """Test that a username taken while the request was hashing gives 409, not a server error."""
+    credentials = {"username": "raceuser", "password": password_factory()}
+    assert client.post("/api/v1/auth/register", json=credentials).status_code == 201
+    # The existence check ran before the other registration committed.
+    monkeypatch.setattr(UsersRepository, "get_by_username", lambda self, username: None)
+
+    response = client.post("/api/v1/auth/register", json=credentials)
+
+    assert response.status_code == 409
+    assert response.get_json()["error"] == "Username already exists"
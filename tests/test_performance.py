@@ -26,7 +26,7 @@ def large_song_dataset(test_db):
         songs.append(song)
 
     with UnitOfWork() as uow:
-        uow.songs_repository.bulk_insert(songs, load_bulk=False)
+        uow.songs_repository.bulk_insert(songs)
     return songs
 
 
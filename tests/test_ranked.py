@@ -0,0 +1,84 @@
+"""Tests for Bayesian-weighted song ranking."""
+
+from __future__ import annotations
+
+import pytest
+
+from songs_api.infrastructure import RatingPrior
+from songs_api.models.documents import RatingStats, RatingTotals
+from songs_api.repositories import RatingsRepository
+
+
+def _rate_batch(client, auth_headers, ratings):
+    response = client.post(
+        "/api/v1/songs/ratings/batch",
+        json={"ratings": [{"song_id": str(song.id), "rating": rating} for song, rating in ratings]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+
+def test_many_ratings_outrank_a_single_perfect_one(client, auth_headers, sample_songs):
+    """Test that one 5-star rating does not outrank twenty ratings averaging 4.8."""
+    popular, lucky, average = sample_songs
+    # No totals document yet, so the global mean is the midpoint rating (3.0).
+    _rate_batch(client, auth_headers, [(average, 3)] * 10)
+    _rate_batch(client, auth_headers, [(lucky, 5)])
+    _rate_batch(client, auth_headers, [(popular, 5)] * 16 + [(popular, 4)] * 4)
+
+    response = client.get("/api/v1/songs/ranked", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [entry["song"]["id"] for entry in data["data"]] == [str(popular.id), str(lucky.id), str(average.id)]
+    assert data["data"][0]["average"] == 4.8
+    assert data["data"][0]["score"] == 4.2
+    assert data["pagination"]["total"] == 3
+
+
+def test_ranked_songs_by_level_and_page(client, auth_headers, sample_songs):
+    """Test the level filter and that ranks continue across pages."""
+    _rate_batch(client, auth_headers, [(sample_songs[0], 2), (sample_songs[1], 5), (sample_songs[2], 4)])
+
+    response = client.get("/api/v1/songs/ranked?level=13&page=2&page_size=1", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [(entry["rank"], entry["song"]["id"]) for entry in data["data"]] == [(2, str(sample_songs[0].id))]
+    assert data["pagination"]["total_pages"] == 2
+
+
+def test_ranked_songs_requires_auth(client, sample_songs):
+    """Test that the ranked listing requires authentication."""
+    assert client.get("/api/v1/songs/ranked").status_code == 401
+
+
+def test_prior_mean_from_rating_totals(test_db):
+    """Test that the prior only reads the totals document, which refresh() recomputes from rating stats."""
+    RatingStats(song_id="a", count=3, sum=15).save()
+    RatingStats(song_id="b", count=1, sum=1).save()
+    prior = RatingPrior(weight=4, refresh_seconds=300)
+
+    assert prior.mean == 3.0
+    assert RatingTotals.objects.count() == 0
+
+    prior.refresh()
+    assert prior.mean == 4.0
+    assert prior.score(total=1, count=1) == pytest.approx((4 * 4.0 + 1) / 5)
+    assert RatingTotals.objects.get(id="ratings").count == 4
+    assert RatingPrior(weight=4, refresh_seconds=300).mean == 4.0
+
+
+def test_rescore_against_refreshed_prior(test_db, sample_songs):
+    """Test that rescoring moves every stored Bayesian score to the refreshed mean."""
+    song_id = str(sample_songs[0].id)
+    prior = RatingPrior(weight=10, refresh_seconds=300)
+    repository = RatingsRepository(rating_prior=prior)
+    repository.bulk_add_ratings([(song_id, 5), (song_id, 5), (str(sample_songs[1].id), 1)])
+    assert RatingStats.objects(song_id=song_id).first().bayesian == pytest.approx((10 * 3.0 + 10) / 12)
+
+    prior.refresh()
+    assert repository.rescore() == 2
+
+    assert prior.mean == pytest.approx(11 / 3)
+    assert RatingStats.objects(song_id=song_id).first().bayesian == pytest.approx((10 * 11 / 3 + 10) / 12)
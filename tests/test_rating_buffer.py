@@ -0,0 +1,155 @@
+"""Tests for the write-behind rating buffer."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from songs_api.infrastructure import RatingBuffer, RatingBufferFullError
+from songs_api.infrastructure.rating_buffer import _ratings_writer
+from songs_api.models.documents import Rating, RatingStats
+from songs_api.repositories import RatingsRepository
+from songs_api.settings import Settings
+
+
+def _buffer(writer, **overrides) -> RatingBuffer:
+    options = {"flush_size": 100, "flush_interval_seconds": 60.0, "capacity": 1000, "put_timeout_seconds": 0.0}
+    options.update(overrides)
+    return RatingBuffer(writer, **options)
+
+
+def _recorder(batches: list):
+    """A writer that records each batch as `(song_id, rating)` pairs."""
+    return lambda batch: batches.append([(song_id, rating) for _, song_id, rating in batch])
+
+
+def _wait_until(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_flushes_when_size_reached():
+    """Test that reaching the flush size hands one batch to the writer."""
+    batches = []
+    buffer = _buffer(_recorder(batches), flush_size=3)
+
+    for rating in (1, 2, 3):
+        buffer.add("song-a", rating)
+
+    assert _wait_until(lambda: batches == [[("song-a", 1), ("song-a", 2), ("song-a", 3)]])
+    buffer.close()
+
+
+def test_flushes_on_interval():
+    """Test that a partial batch is written once the flush interval passes."""
+    batches = []
+    buffer = _buffer(_recorder(batches), flush_interval_seconds=0.05)
+
+    buffer.add("song-a", 4)
+
+    assert _wait_until(lambda: batches == [[("song-a", 4)]])
+    buffer.close()
+
+
+def test_close_flushes_pending_ratings():
+    """Test that graceful shutdown writes what is still buffered and rejects new ratings."""
+    batches = []
+    buffer = _buffer(_recorder(batches))
+    buffer.add("song-a", 5)
+    buffer.add("song-b", 1)
+
+    buffer.close()
+
+    assert batches == [[("song-a", 5), ("song-b", 1)]]
+    with pytest.raises(RatingBufferFullError):
+        buffer.add("song-a", 3)
+
+
+def test_backpressure_when_full():
+    """Test that a full buffer rejects ratings after the put timeout instead of growing."""
+    release = threading.Event()
+    buffer = _buffer(lambda batch: release.wait(), capacity=2, put_timeout_seconds=0.05)
+
+    buffer.add("song-a", 1)
+    buffer.add("song-a", 2)
+    with pytest.raises(RatingBufferFullError):
+        buffer.add("song-a", 3)
+
+    release.set()
+    buffer.close()
+
+
+def test_failed_flush_is_retried():
+    """Test that a batch the writer fails on is written by a later flush, ahead of newer ratings."""
+    batches = []
+
+    def writer(batch):
+        if not batches:
+            batches.append(None)
+            raise RuntimeError("mongo down")
+        batches.append([(song_id, rating) for _, song_id, rating in batch])
+
+    buffer = _buffer(writer)
+    buffer.add("song-a", 1)
+    assert buffer.flush() == 0
+    assert buffer.metrics() == {"pending": 1, "failed_flushes": 1, "dropped": 0}
+    buffer.add("song-a", 2)
+    buffer.close()
+
+    assert batches == [None, [("song-a", 1), ("song-a", 2)]]
+    assert buffer.metrics() == {"pending": 0, "failed_flushes": 0, "dropped": 0}
+
+
+def test_flusher_retries_with_backoff_and_drops_after_bounded_attempts():
+    """Test that the flusher retries a failing batch after a delay and reports it dropped at the limit."""
+    attempts = []
+
+    def writer(batch):
+        attempts.append(time.monotonic())
+        raise RuntimeError("mongo down")
+
+    buffer = _buffer(writer, flush_size=1, max_flush_attempts=3, retry_backoff_seconds=0.05)
+    buffer.add("song-a", 1)
+
+    assert _wait_until(lambda: buffer.metrics()["dropped"] == 1)
+    assert len(attempts) == 3
+    assert attempts[2] - attempts[1] >= 0.1
+    assert len(buffer) == 0
+    buffer.close()
+
+
+def test_retried_flush_does_not_store_ratings_twice(test_db, sample_songs, monkeypatch):
+    """Test that a batch whose first write failed after storing its ratings is not counted again on retry."""
+    song_id = str(sample_songs[0].id)
+    add_to_rollups = RatingsRepository._add_to_rollups
+    calls = []
+
+    def fail_once(self, ratings, now):
+        calls.append(len(ratings))
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        add_to_rollups(self, ratings, now)
+
+    monkeypatch.setattr(RatingsRepository, "_add_to_rollups", fail_once)
+    buffer = _buffer(_ratings_writer(None))
+    buffer.add(song_id, 4)
+
+    assert buffer.flush() == 0
+    assert buffer.flush() == 1
+
+    assert Rating.objects(song_id=song_id).count() == 1
+    assert RatingStats.objects(song_id=song_id).first().count == 1
+    buffer.close()
+
+
+def test_flush_size_cannot_exceed_capacity():
+    """Test that settings where the size trigger could never fire are rejected."""
+    with pytest.raises(ValidationError, match="RATING_BUFFER_FLUSH_SIZE"):
+        Settings(rating_buffer_flush_size=500, rating_buffer_capacity=100)
@@ -0,0 +1,189 @@
+"""Tests for the Redis Stream rating queue and its consumer."""
+
+from __future__ import annotations
+
+import itertools
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from songs_api.infrastructure import QueuedRating, RatingBufferFullError, RatingQueue
+from songs_api.infrastructure import rating_buffer as rating_buffer_module
+from songs_api.models.documents import Rating, RatingStats
+from songs_api.scripts import consume_ratings
+from songs_api.scripts.consume_ratings import apply_ratings, consume, require_transactions
+
+
+class _StreamRedis:
+    """Just enough of a Redis Streams client for one stream and one consumer group."""
+
+    def __init__(self) -> None:
+        self.entries: dict[str, dict] = {}
+        self.delivered: list[str] = []
+        self.pending: set[str] = set()
+        self._ids = itertools.count(1)
+
+    def pipeline(self, transaction: bool = True):
+        return self
+
+    def execute(self) -> None:
+        pass
+
+    def xlen(self, stream):
+        return len(self.entries)
+
+    def exists(self, stream):
+        return 1
+
+    def xadd(self, stream, fields):
+        entry_id = f"1760000000{next(self._ids):03d}-0"
+        self.entries[entry_id] = {key: str(value) for key, value in fields.items()}
+        return entry_id
+
+    def xgroup_create(self, stream, group, id, mkstream):
+        pass
+
+    def xautoclaim(self, stream, group, consumer, min_idle_time, start_id, count):
+        # Every pending entry counts as idle: it was delivered to a consumer that crashed.
+        claimed = sorted(self.pending)[:count]
+        return ["0-0", [(entry_id, self.entries.get(entry_id)) for entry_id in claimed], []]
+
+    def xreadgroup(self, group, consumer, streams, count, block):
+        new = [entry_id for entry_id in self.entries if entry_id not in self.delivered][:count]
+        self.delivered.extend(new)
+        self.pending.update(new)
+        return [["ratings:queue", [(entry_id, self.entries[entry_id]) for entry_id in new]]] if new else []
+
+    def xack(self, stream, group, *entry_ids):
+        self.pending.difference_update(entry_ids)
+
+    def xdel(self, stream, *entry_ids):
+        for entry_id in entry_ids:
+            self.entries.pop(entry_id, None)
+
+    def xinfo_groups(self, stream):
+        undelivered = sum(entry_id not in self.delivered for entry_id in self.entries)
+        return [{"name": "rating-writers", "pending": len(self.pending), "lag": undelivered}]
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = RatingQueue(_StreamRedis(), stream="ratings:queue", group="rating-writers", capacity=10)
+    monkeypatch.setattr(rating_buffer_module, "_rating_buffer", queue)
+    return queue
+
+
+def test_post_rating_is_queued(client, auth_headers, sample_songs, queue):
+    """Test that in queue mode a rating is appended to the stream and answered with 202."""
+    response = client.post(
+        "/api/v1/songs/ratings", json={"song_id": str(sample_songs[0].id), "rating": 4}, headers=auth_headers
+    )
+
+    assert response.status_code == 202
+    assert list(queue.redis_client.entries.values()) == [{"song_id": str(sample_songs[0].id), "rating": "4"}]
+    assert Rating.objects.count() == 0
+    assert client.get("/api/v1/metrics").get_json()["ratings"] == {"length": 1, "pending": 0, "lag": 1}
+
+
+def test_full_queue_rejects_ratings(client, auth_headers, sample_songs, queue):
+    """Test that a queue at capacity answers 503 instead of growing."""
+    queue.capacity = 1
+    queue.add("other", 3)
+
+    response = client.post(
+        "/api/v1/songs/ratings", json={"song_id": str(sample_songs[0].id), "rating": 4}, headers=auth_headers
+    )
+
+    assert response.status_code == 503
+    with pytest.raises(RatingBufferFullError):
+        queue.add_many([("a", 1), ("b", 2)])
+
+
+def test_consumer_applies_and_acknowledges(test_db, sample_songs, queue):
+    """Test that the consumer bulk-writes queued ratings and removes them from the stream."""
+    song_id = str(sample_songs[0].id)
+    queue.add_many([(song_id, 5), (song_id, 3), (str(sample_songs[1].id), 2)])
+
+    assert consume(queue, "worker-1", batch_size=10, max_batches=1) == 3
+
+    assert queue.metrics() == {"length": 0, "pending": 0, "lag": 0}
+    stats = RatingStats.objects(song_id=song_id).first()
+    assert (stats.count, stats.sum, stats.level) == (2, 8, 13)
+
+
+def test_redelivered_entries_are_applied_once(test_db, sample_songs, queue):
+    """Test that entries a crashed consumer wrote but never acknowledged are not counted twice."""
+    song_id = str(sample_songs[0].id)
+    queue.add_many([(song_id, 5), (song_id, 1)])
+    entries = queue.read("worker-1", count=10, block_ms=0, claim_idle_ms=0)
+    apply_ratings(entries)  # ...and the consumer dies before acknowledging.
+
+    assert consume(queue, "worker-2", batch_size=10, max_batches=1) == 0
+
+    assert queue.metrics()["pending"] == 0
+    assert RatingStats.objects(song_id=song_id).first().count == 2
+    assert Rating.objects(song_id=song_id).count() == 2
+
+
+def test_consumer_retries_write_conflicts(test_db, sample_songs, queue, monkeypatch):
+    """Test that a transient transaction error between consumers reruns the batch instead of failing it."""
+    song_id = str(sample_songs[0].id)
+    queue.add_many([(song_id, 5), (song_id, 1)])
+    conflicts = []
+
+    def conflict_once(entries):
+        if not conflicts:
+            conflicts.append(entries)
+            raise OperationFailure("WriteConflict", code=112, details={"errorLabels": ["TransientTransactionError"]})
+        return apply_ratings(entries)
+
+    monkeypatch.setattr(consume_ratings, "apply_ratings", conflict_once)
+
+    assert consume(queue, "worker-1", batch_size=10, max_batches=1) == 2
+    assert queue.metrics()["pending"] == 0
+    assert RatingStats.objects(song_id=song_id).first().count == 2
+
+
+def test_consumer_survives_failed_batches(test_db, sample_songs, queue, monkeypatch):
+    """Test that a failed read or write is logged and retried, and the unacknowledged batch applied later."""
+    song_id = str(sample_songs[0].id)
+    queue.add_many([(song_id, 4)])
+    monkeypatch.setattr(consume_ratings, "ERROR_BACKOFF_SECONDS", 0)
+    failures = []
+
+    def fail_once(entries):
+        if not failures:
+            failures.append(entries)
+            raise OperationFailure("not primary", code=10107)
+        return apply_ratings(entries)
+
+    monkeypatch.setattr(consume_ratings, "apply_ratings", fail_once)
+
+    # The failed batch is still pending and is claimed again by the next read.
+    assert consume(queue, "worker-1", batch_size=10, max_batches=2) == 1
+    assert queue.metrics()["pending"] == 0
+    assert Rating.objects(song_id=song_id).count() == 1
+
+
+def test_consumer_refuses_to_run_without_transactions(test_db, monkeypatch):
+    """Test that the consumer will not start on a deployment where a batch's writes are not atomic."""
+    with pytest.raises(SystemExit, match="needs MongoDB transactions"):
+        require_transactions()  # mongomock, like a standalone server, has none.
+
+    monkeypatch.setattr(consume_ratings, "transactions_supported", lambda client: True)
+    require_transactions()
+
+
+def test_rating_id_follows_entry_id():
+    """Test that the stored rating `_id` is deterministic and ordered like the stream."""
+    first = QueuedRating("1760000000123-0", "song", 4)
+    second = QueuedRating("1760000000123-1", "song", 4)
+
+    assert first.rating_id == QueuedRating("1760000000123-0", "other", 1).rating_id
+    assert first.rating_id < second.rating_id
+    assert first.rating_id.generation_time.timestamp() == 1760000000
+
+
+def test_metrics_in_sync_mode(client):
+    """Test that the metrics endpoint reports no queue when ratings are written synchronously."""
+    assert client.get("/api/v1/metrics").get_json()["ratings"] is None
@@ -0,0 +1,159 @@
+"""Tests for sharded rating counters on hot songs."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from songs_api.constants import TrendingWindow
+from songs_api.infrastructure import RatingShards, rating_shards
+from songs_api.models.documents import RatingRollup, RatingStats, RatingStatsShard
+from songs_api.repositories import RatingsRepository
+from songs_api.scripts.reconcile_ratings import reconcile_ratings
+
+
+@pytest.fixture(autouse=True)
+def _frozen_clock(monkeypatch):
+    """Keep every write in one second, so a song's hotness does not depend on where the second boundary falls."""
+    monkeypatch.setattr(rating_shards, "time", SimpleNamespace(monotonic=lambda: 1000.5))
+
+
+def _hot_repository(shard_count: int = 4) -> RatingsRepository:
+    return RatingsRepository(rating_shards=RatingShards(shard_count=shard_count, hot_writes_per_second=3))
+
+
+def test_song_turns_hot_after_threshold():
+    """Test that a song is sharded once it reaches the per-second write threshold."""
+    shards = RatingShards(shard_count=4, hot_writes_per_second=3)
+
+    assert [shards.should_shard("song") for _ in range(4)] == [False, False, True, True]
+    assert shards.should_shard("other") is False
+    assert 0 <= shards.pick() < 4
+
+
+def test_hot_song_ratings_go_to_shards_and_reads_merge_them(test_db, sample_songs):
+    """Test that ratings past the threshold hit shard documents and stats reads add them back."""
+    song_id = str(sample_songs[0].id)
+    repository = _hot_repository()
+
+    results = [repository.add_rating(song_id=song_id, rating=rating) for rating in (1, 2, 3, 4, 5, 5)]
+
+    stored = RatingStats.objects(song_id=song_id).first()
+    assert stored.sharded is True
+    assert stored.count == 2
+    assert sum(shard.count for shard in RatingStatsShard.objects(song_id=song_id)) == 4
+    assert results[-1].count == 6
+
+    stats = RatingsRepository().get_rating_stats(song_id)
+    assert (stats.count, stats.sum, stats.min, stats.max) == (6, 20, 1, 5)
+    assert stats.stars == {"1": 1, "2": 1, "3": 1, "4": 1, "5": 2}
+    assert stats.average == 20 / 6
+    assert RatingsRepository().get_rating_stats_many([song_id])[song_id].count == 6
+
+
+def test_sharded_writes_leave_the_stats_document_alone(test_db, sample_songs):
+    """Test that once a song is sharded, its ratings touch neither its stats document nor one shared rollup."""
+    song_id = str(sample_songs[0].id)
+    repository = _hot_repository()
+    for rating in (1, 2, 3):
+        repository.add_rating(song_id=song_id, rating=rating)
+    before = RatingStats._get_collection().find_one({"song_id": song_id})
+    assert before["sharded"] is True
+
+    for rating in (5, 5, 5, 5, 5, 5):
+        repository.add_rating(song_id=song_id, rating=rating)
+
+    assert RatingStats._get_collection().find_one({"song_id": song_id}) == before
+    assert RatingRollup.objects(song_id=song_id, window="hour").count() > 1
+    assert repository.trending(TrendingWindow.HOUR, limit=1)[0]["count"] == 9
+
+    RatingsRepository().fold_shards()
+    assert RatingStats.objects(song_id=song_id).first().average == 36 / 9
+
+
+def test_scores_are_stored_from_merged_stats(test_db, sample_songs):
+    """Test that hot, cooled-down and batch writes all store scores computed with the shards added."""
+    song_id = str(sample_songs[0].id)
+    hot = _hot_repository()
+    for rating in (1, 1, 1, 1, 1):
+        hot.add_rating(song_id=song_id, rating=rating)
+    assert RatingStats.objects(song_id=song_id).first().average == 1.0
+    assert RatingStatsShard.objects(song_id=song_id).count() > 0
+
+    # No longer hot in this worker, but its shards have not been folded yet.
+    cooled = RatingsRepository()
+    assert cooled.add_rating(song_id=song_id, rating=5).count == 6
+    stored = RatingStats.objects(song_id=song_id).first()
+    assert (stored.average, stored.scored_count) == (10 / 6, 6)
+
+    stats = cooled.bulk_add_ratings([(song_id, 5)])[song_id]
+    assert (stats.count, stats.sum) == (7, 15)
+    assert RatingStats.objects(song_id=song_id).first().average == 15 / 7
+
+
+def test_fold_shards_moves_counts_into_stats(test_db, sample_songs):
+    """Test that folding empties the shards and leaves complete stats with a fresh average."""
+    song_id = str(sample_songs[0].id)
+    repository = _hot_repository()
+    for rating in (2, 2, 2, 5, 5):
+        repository.add_rating(song_id=song_id, rating=rating)
+
+    assert RatingsRepository().fold_shards() == 1
+
+    assert RatingStatsShard.objects(song_id=song_id).count() == 0
+    stored = RatingStats.objects(song_id=song_id).first()
+    assert (stored.count, stored.sum, stored.min, stored.max) == (5, 16, 2, 5)
+    assert stored.stars == {"2": 3, "5": 2}
+    assert stored.average == 16 / 5
+    assert RatingsRepository().get_rating_stats(song_id).count == 5
+
+
+def test_reconcile_folds_shards_first(test_db, sample_songs):
+    """Test that reconciling does not mistake unfolded shard counts for drift."""
+    song_id = str(sample_songs[0].id)
+    repository = _hot_repository()
+    for rating in (3, 4, 4, 4):
+        repository.add_rating(song_id=song_id, rating=rating)
+
+    result = reconcile_ratings(workers=1)
+
+    assert result.drifted == 0
+    assert RatingStats.objects(song_id=song_id).first().count == 4
+
+
+def test_interrupted_fold_is_finished_once(test_db, sample_songs, monkeypatch):
+    """Test that a fold stopped after any step loses no ratings and counts none twice."""
+    song_id = str(sample_songs[0].id)
+    repository = _hot_repository(shard_count=1)
+    for rating in (4, 4, 4, 4, 4, 4):
+        repository.add_rating(song_id=song_id, rating=rating)
+
+    # Stopped after claiming a shard: readers still see the claimed counts.
+    shard = RatingStatsShard._get_collection().find_one({"song_id": song_id})
+    RatingsRepository()._claim_shard(shard)
+    assert RatingsRepository().get_rating_stats(song_id).count == 6
+
+    # Stopped after the stats took the counts but before the shard dropped them.
+    shards_coll = RatingStatsShard._get_collection()
+    update_one = shards_coll.update_one
+
+    def crash_on_release(query, update, *args, **kwargs):
+        if "$unset" in update:
+            raise RuntimeError("interrupted")
+        return update_one(query, update, *args, **kwargs)
+
+    monkeypatch.setattr(shards_coll, "update_one", crash_on_release)
+    try:
+        RatingsRepository().fold_shards()
+    except RuntimeError:
+        pass
+    monkeypatch.undo()
+    assert RatingsRepository().get_rating_stats(song_id).count == 6
+
+    RatingsRepository().fold_shards()
+
+    stored = RatingStats.objects(song_id=song_id).first()
+    assert RatingStats.objects(song_id=song_id).count() == 1
+    assert (stored.count, stored.sum, stored.sharded) == (6, 24, False)
+    assert RatingStatsShard.objects(song_id=song_id).count() == 0
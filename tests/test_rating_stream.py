@@ -0,0 +1,123 @@
+"""Tests for live rating stats over Server-Sent Events."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from songs_api.infrastructure import RatingStatsHub, RatingStreamLimitError, get_rating_stats_hub, rating_events
+
+
+@pytest.fixture
+def hub(app):
+    hub = get_rating_stats_hub()
+    hub.min_interval_seconds = 0
+    hub.heartbeat_seconds = 0.01
+    return hub
+
+
+def _stats_event(chunk: bytes) -> dict:
+    event, data = chunk.decode().strip().split("\n")
+    assert event == "event: stats"
+    return json.loads(data.removeprefix("data: "))
+
+
+def test_stream_pushes_stats_after_a_rating(client, auth_headers, sample_songs, hub):
+    """Test that the stream sends the current stats, then the stats after a new rating."""
+    song_id = str(sample_songs[0].id)
+    response = client.get(f"/api/v1/songs/{song_id}/ratings/stream", headers=auth_headers, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    chunks = response.response
+
+    assert next(chunks).startswith(b"retry:")
+    assert _stats_event(next(chunks))["count"] == 0
+
+    for rating in (4, 2):
+        client.post("/api/v1/songs/ratings", json={"song_id": song_id, "rating": rating}, headers=auth_headers)
+
+    # Both ratings landed before the stream woke up: one event with both.
+    stats = _stats_event(next(chunks))
+    assert (stats["count"], stats["average"]) == (2, 3)
+    assert next(chunks) == b": keep-alive\n\n"
+
+    response.close()
+    assert hub.subscriber_count() == 0
+
+
+def test_stream_ends_after_max_duration(client, auth_headers, sample_songs, hub):
+    """Test that streams close after the configured lifetime so clients reconnect."""
+    hub.max_stream_seconds = 0
+
+    response = client.get(f"/api/v1/songs/{sample_songs[0].id}/ratings/stream", headers=auth_headers)
+
+    assert response.get_data().count(b"event: stats") == 1
+    assert hub.subscriber_count() == 0
+
+
+def test_stream_unknown_song(client, auth_headers, hub):
+    """Test that a stream for an unknown song is refused before streaming."""
+    response = client.get("/api/v1/songs/507f1f77bcf86cd799439011/ratings/stream", headers=auth_headers)
+
+    assert response.status_code == 404
+    assert hub.subscriber_count() == 0
+
+
+def test_stream_requires_auth(client, sample_songs):
+    """Test that live stats require authentication."""
+    assert client.get(f"/api/v1/songs/{sample_songs[0].id}/ratings/stream").status_code == 401
+
+
+def test_snapshot_loads_once_per_change():
+    """Test that streams on the same song share one stats load per change."""
+    hub = RatingStatsHub(
+        None, min_interval_seconds=0, heartbeat_seconds=1, max_stream_seconds=1, max_streams=4, max_threaded_streams=4
+    )
+    loads = []
+    first, second = hub.subscribe("song"), hub.subscribe("other")
+    third = hub.subscribe("song")
+
+    hub.publish(["song"])
+
+    assert first.wait(0) and third.wait(0) and not second.wait(0)
+    for _ in range(3):
+        hub.snapshot("song", lambda: loads.append(1) or len(loads))
+    hub.publish(["song"])
+    assert hub.snapshot("song", lambda: loads.append(1) or len(loads)) == 2
+    assert len(loads) == 2
+
+
+def test_streams_beyond_the_worker_limit_get_503(client, auth_headers, sample_songs, hub):
+    """Test that a worker refuses streams past its limit and accepts them again once one closes."""
+    hub.max_threaded_streams = 1
+    url = f"/api/v1/songs/{sample_songs[0].id}/ratings/stream"
+    first = client.get(url, headers=auth_headers, buffered=False)
+    assert first.status_code == 200
+
+    refused = client.get(url, headers=auth_headers)
+    assert refused.status_code == 503
+    assert hub.subscriber_count() == 1
+
+    first.close()
+    second = client.get(url, headers=auth_headers, buffered=False)
+    assert second.status_code == 200
+    second.close()
+
+
+def test_gevent_workers_hold_many_more_streams(monkeypatch):
+    """Test that the thread-sized limit only applies when streams hold request threads."""
+    hub = RatingStatsHub(
+        None, min_interval_seconds=0, heartbeat_seconds=1, max_stream_seconds=1, max_streams=50, max_threaded_streams=2
+    )
+    monkeypatch.setattr(rating_events, "_cooperative", lambda: True)
+
+    subscriptions = [hub.subscribe(f"song-{n}") for n in range(50)]
+    with pytest.raises(RatingStreamLimitError):
+        hub.subscribe("song")
+
+    monkeypatch.setattr(rating_events, "_cooperative", lambda: False)
+    for subscription in subscriptions[2:]:
+        hub.unsubscribe(subscription)
+    with pytest.raises(RatingStreamLimitError):
+        hub.subscribe("song")
@@ -85,3 +85,103 @@ def test_ratings_require_auth(client, sample_songs):
 
     response = client.get(f"/api/v1/songs/{song_id}/ratings")
     assert response.status_code == 401
+
+
+def test_add_ratings_batch(client, auth_headers, sample_songs):
+    """Test that a batch aggregates stats per song and reports unknown songs per item."""
+    first, second = str(sample_songs[0].id), str(sample_songs[1].id)
+    response = client.post(
+        "/api/v1/songs/ratings/batch",
+        headers=auth_headers,
+        json={
+            "ratings": [
+                {"song_id": first, "rating": 2},
+                {"song_id": "507f1f77bcf86cd799439011", "rating": 5},
+                {"song_id": first, "rating": 4},
+                {"song_id": second, "rating": 3},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data["created"], data["queued"], data["not_found"]) == (3, 0, 1)
+    assert [result["status"] for result in data["results"]] == ["created", "not_found", "created", "created"]
+    assert data["results"][0]["stats"]["count"] == 2
+    assert data["results"][0]["stats"]["average"] == pytest.approx(3.0)
+    assert data["results"][0]["stats"]["lowest"] == 2
+    assert data["results"][1]["stats"] is None
+
+    stats = client.get(f"/api/v1/songs/{first}/ratings", headers=auth_headers).get_json()
+    assert stats["count"] == 2
+    assert stats["highest"] == 4
+
+
+def test_add_ratings_batch_validation(client, auth_headers, sample_songs):
+    """Test that empty batches and out-of-range ratings are rejected."""
+    response = client.post("/api/v1/songs/ratings/batch", headers=auth_headers, json={"ratings": []})
+    assert response.status_code == 422
+
+    song_id = str(sample_songs[0].id)
+    response = client.post(
+        "/api/v1/songs/ratings/batch",
+        headers=auth_headers,
+        json={"ratings": [{"song_id": song_id, "rating": 6}]},
+    )
+    assert response.status_code == 422
+
+
+def test_rating_stats_histogram_and_percentiles(client, auth_headers, sample_songs):
+    """Test that per-star counts are maintained and percentiles are derived from them."""
+    song_id = str(sample_songs[0].id)
+    for rating in (1, 4, 5):
+        client.post("/api/v1/songs/ratings", headers=auth_headers, json={"song_id": song_id, "rating": rating})
+    client.post(
+        "/api/v1/songs/ratings/batch",
+        headers=auth_headers,
+        json={"ratings": [{"song_id": song_id, "rating": 4}, {"song_id": song_id, "rating": 5}]},
+    )
+
+    data = client.get(f"/api/v1/songs/{song_id}/ratings", headers=auth_headers).get_json()
+    assert data["count"] == 5
+    assert data["histogram"] == [1, 0, 0, 2, 2]
+    assert data["median"] == pytest.approx(4.0)
+    assert data["p90"] == 5
+
+
+def test_rating_stats_without_star_counters(client, auth_headers, sample_songs):
+    """Test that stats predating per-star counters report no percentiles."""
+    from songs_api.models.documents import RatingStats
+
+    song_id = str(sample_songs[0].id)
+    RatingStats(song_id=song_id, count=2, sum=7, min=3, max=4).save()
+
+    data = client.get(f"/api/v1/songs/{song_id}/ratings", headers=auth_headers).get_json()
+    assert data["average"] == pytest.approx(3.5)
+    assert data["histogram"] == [0, 0, 0, 0, 0]
+    assert data["median"] is None
+    assert data["p90"] is None
+
+
+def test_get_rating_stats_many(client, auth_headers, sample_songs):
+    """Test that stats for several songs come back keyed by ID, with unknown IDs listed separately."""
+    rated, unrated = str(sample_songs[0].id), str(sample_songs[1].id)
+    missing = "507f1f77bcf86cd799439011"
+    client.post("/api/v1/songs/ratings", headers=auth_headers, json={"song_id": rated, "rating": 4})
+
+    response = client.get(
+        f"/api/v1/songs/ratings/stats?ids={rated},{unrated},{missing},not-an-id,{rated}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert list(data["stats"]) == [rated, unrated]
+    assert data["stats"][rated]["average"] == pytest.approx(4.0)
+    assert data["stats"][unrated]["count"] == 0
+    assert data["not_found"] == [missing, "not-an-id"]
+
+
+def test_get_rating_stats_many_validation(client, auth_headers, sample_songs):
+    """Test that the ID list must be present and at most 100 long."""
+    assert client.get("/api/v1/songs/ratings/stats", headers=auth_headers).status_code == 422
+    too_many = ",".join(f"{index:024x}" for index in range(101))
+    assert client.get(f"/api/v1/songs/ratings/stats?ids={too_many}", headers=auth_headers).status_code == 422
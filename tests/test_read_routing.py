@@ -0,0 +1,64 @@
+"""Tests for per-route read preferences and read-your-writes tokens."""
+
+from __future__ import annotations
+
+from bson import Timestamp
+
+from songs_api.constants import ReadPreferenceMode, ReadRoute
+from songs_api.infrastructure import CausalToken, ReadRouter, SystemResources, UnitOfWork
+from songs_api.infrastructure.read_routing import CausalTokenStore
+from songs_api.settings import Settings
+
+
+def test_primary_routes_use_driver_default():
+    """Test that primary routes add no explicit read preference."""
+    router = ReadRouter(Settings())
+
+    assert router.preference(ReadRoute.CATALOG) is None
+    assert router.preference(ReadRoute.STATS) is None
+
+
+def test_secondary_preferred_with_max_staleness():
+    """Test that catalog reads can be routed to secondaries independently of stats reads."""
+    router = ReadRouter(
+        Settings(
+            mongo_catalog_read_preference=ReadPreferenceMode.SECONDARY_PREFERRED,
+            mongo_catalog_max_staleness_seconds=120,
+        )
+    )
+
+    preference = router.preference(ReadRoute.CATALOG)
+    assert preference.document == {"mode": "secondaryPreferred", "maxStalenessSeconds": 120}
+    assert router.preference(ReadRoute.STATS) is None
+
+
+def test_uow_passes_read_router_to_repositories(test_db):
+    """Test that repositories receive the read router from resources."""
+    router = ReadRouter(Settings())
+    with UnitOfWork(SystemResources(read_router=router)) as uow:
+        assert uow.songs_repository.read_router is router
+        assert uow.ratings_repository.read_router is router
+
+
+def test_causal_token_round_trip():
+    """Test that causal tokens survive encoding for storage in Redis."""
+    token = CausalToken(cluster_time={"clusterTime": Timestamp(100, 1)}, operation_time=Timestamp(100, 1))
+
+    decoded = CausalToken.decode(token.encode())
+
+    assert decoded.operation_time == token.operation_time
+    assert decoded.cluster_time["clusterTime"] == Timestamp(100, 1)
+
+
+def test_causal_token_store_expires_local_tokens():
+    """Test the per-process fallback store used when Redis is disabled."""
+    token = CausalToken(cluster_time={"clusterTime": Timestamp(1, 1)}, operation_time=Timestamp(1, 1))
+
+    store = CausalTokenStore(cache=None, ttl_seconds=60)
+    store.remember("alice", token)
+    assert store.recall("alice") == token
+    assert store.recall("bob") is None
+
+    expired = CausalTokenStore(cache=None, ttl_seconds=0)
+    expired.remember("alice", token)
+    assert expired.recall("alice") is None
@@ -0,0 +1,84 @@
+"""Tests for the rating stats reconciliation job."""
+
+from __future__ import annotations
+
+import pytest
+
+from songs_api.models.documents import Rating, RatingStats
+from songs_api.repositories import RatingsRepository
+from songs_api.scripts import reconcile_ratings as reconcile_module
+from songs_api.scripts.reconcile_ratings import partition_song_ids, reconcile_range, reconcile_ratings
+
+
+def _drift(sample_songs) -> tuple[str, str, str]:
+    """Three kinds of drift: a lost stats update, a missing stats document and orphaned stats."""
+    lost, missing, orphaned = (str(song.id) for song in sample_songs)
+    repo = RatingsRepository()
+    repo.add_rating(song_id=lost, rating=2)
+    Rating(song_id=lost, rating=5).save()
+    Rating(song_id=missing, rating=3).save()
+    RatingStats(song_id=orphaned, count=2, sum=8, min=4, max=4, stars={"4": 2}).save()
+    return lost, missing, orphaned
+
+
+def test_reconcile_corrects_drift(test_db, sample_songs):
+    """Test that stats are rewritten from the raw ratings, created when missing and dropped when orphaned."""
+    lost, missing, orphaned = _drift(sample_songs)
+
+    result = reconcile_ratings(workers=1, partitions=2)
+
+    assert (result.songs, result.ratings, result.drifted, result.corrected, result.skipped) == (3, 3, 3, 3, 0)
+    stats = {stats.song_id: stats for stats in RatingStats.objects}
+    assert set(stats) == {lost, missing}
+    assert (stats[lost].count, stats[lost].sum, stats[lost].min, stats[lost].max) == (2, 7, 2, 5)
+    assert stats[lost].stars == {"2": 1, "5": 1}
+    assert stats[lost].average == 3.5
+    assert stats[lost].bayesian == pytest.approx((10 * 3.0 + 7) / 12)
+    assert (stats[missing].count, stats[missing].stars) == (1, {"3": 1})
+
+    assert reconcile_ratings(workers=1).drifted == 0
+
+
+def test_reconcile_keeps_rating_written_during_the_run(test_db, sample_songs, monkeypatch):
+    """Test that a rating landing after the raw ratings were aggregated is not overwritten."""
+    lost, _, _ = _drift(sample_songs)
+    aggregate = reconcile_module.expected_stats
+
+    def aggregate_then_rate(song_ids):
+        expected = aggregate(song_ids)
+        RatingsRepository().add_rating(song_id=lost, rating=4)
+        return expected
+
+    monkeypatch.setattr(reconcile_module, "expected_stats", aggregate_then_rate)
+    result = reconcile_range((None, None))
+    monkeypatch.undo()
+
+    assert result.skipped == 1
+    assert (RatingStats.objects.get(song_id=lost).count, RatingStats.objects.get(song_id=lost).sum) == (2, 6)
+
+    reconcile_range((None, None))
+    assert RatingStats.objects.get(song_id=lost).count == 3
+
+
+def test_reconcile_dry_run_writes_nothing(test_db, sample_songs):
+    """Test that a dry run reports drift without touching rating stats."""
+    lost, _, _ = _drift(sample_songs)
+
+    result = reconcile_range((None, None), dry_run=True)
+
+    assert (result.drifted, result.corrected) == (3, 0)
+    assert len(result.examples) == 3
+    assert RatingStats.objects.get(song_id=lost).count == 1
+    assert RatingStats.objects.count() == 2
+
+
+def test_partition_song_ids_covers_the_whole_range(test_db):
+    """Test that partitions are contiguous and open at both ends."""
+    for index in range(10):
+        RatingStats(song_id=f"{index:024x}", count=1, sum=3).save()
+
+    ranges = partition_song_ids(3)
+
+    assert ranges[0][0] is None and ranges[-1][1] is None
+    assert all(previous[1] == current[0] for previous, current in zip(ranges, ranges[1:], strict=False))
+    assert len(ranges) == 3
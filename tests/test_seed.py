@@ -0,0 +1,91 @@
+"""Tests for the streaming song seed helpers."""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+
+from songs_api import schemas
+from songs_api.infrastructure import SongCatalog
+from songs_api.models.documents import Song
+from songs_api.scripts.seed import iter_line_batches, parse_batch, seed_songs_from_file
+
+
+def test_iter_line_batches_skips_blank_lines(tmp_path):
+    """Test that the file is yielded in fixed-size batches of non-blank lines."""
+    path = tmp_path / "songs.json"
+    path.write_text("a\n\nb\nc\n  \nd\ne\n", encoding="utf-8")
+
+    batches = list(iter_line_batches(str(path), batch_size=2))
+
+    assert [[line.strip() for line in batch] for batch in batches] == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_parse_batch_builds_documents_and_counts_invalid(test_db):
+    """Test that rows become Mongo documents and bad rows are counted, not raised."""
+    lines = [
+        json.dumps({"artist": "A", "title": "T", "difficulty": "9.5", "level": 4, "released": "2012-05-11"}),
+        json.dumps({"artist": "A", "title": "Missing level", "difficulty": 1.0}),
+        "{broken",
+        json.dumps({"artist": "B", "title": "No date", "difficulty": 2.0, "level": 1, "released": ""}),
+    ]
+
+    docs, invalid = parse_batch(lines)
+
+    assert invalid == 2
+    assert [doc["title"] for doc, _ in docs] == ["T", "No date"]
+    assert docs[0][0]["difficulty"] == 9.5
+    assert docs[0][1] == {}
+    assert docs[0][0]["released"] == datetime(2012, 5, 11)
+    assert "_id" not in docs[0][0]
+    assert "released" not in docs[1][0]
+    assert set(docs[1][1]) == {"released"}
+
+
+def test_seed_can_be_rerun(tmp_path, test_db):
+    """Test that seeding the same file twice updates songs in place instead of duplicating them."""
+    path = tmp_path / "songs.json"
+    rows = [
+        {"artist": "A", "title": f"T{i}", "difficulty": 1.0, "level": 1, "released": "2012-05-11"} for i in range(3)
+    ]
+    path.write_text("\n".join(json.dumps(row) for row in rows), encoding="utf-8")
+
+    first = seed_songs_from_file(str(path), batch_size=2)
+    second = seed_songs_from_file(str(path), batch_size=2)
+
+    assert (first.inserted, second.inserted) == (3, 0)
+    assert Song.objects.count() == 3
+
+
+def test_seed_update_bumps_catalog_version(tmp_path, test_db):
+    """Test that songs changed in place by a re-seed move the catalog version, which inserts alone would not."""
+    path = tmp_path / "songs.json"
+    row = {"artist": "A", "title": "T", "difficulty": 1.0, "level": 1, "released": "2012-05-11"}
+    path.write_text(json.dumps(row), encoding="utf-8")
+    seed_songs_from_file(str(path))
+    before = SongCatalog._read_version()
+
+    path.write_text(json.dumps({**row, "difficulty": 2.0}), encoding="utf-8")
+    seed_songs_from_file(str(path))
+
+    assert SongCatalog._read_version()[:2] == before[:2]
+    assert SongCatalog._read_version() != before
+
+
+def test_rerun_keeps_defaulted_release_dates(tmp_path, test_db, monkeypatch):
+    """Test that a blank release date is filled in on insert only, not moved to the day of each re-run."""
+    path = tmp_path / "songs.json"
+    path.write_text(json.dumps({"artist": "A", "title": "No date", "difficulty": 1.0, "level": 1, "released": ""}))
+    seed_songs_from_file(str(path))
+    first_released = Song.objects.get(title="No date").released
+
+    class _Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.fromordinal(first_released.toordinal() + 1)
+
+    monkeypatch.setattr(schemas, "date", _Tomorrow)
+    second = seed_songs_from_file(str(path))
+
+    assert second.inserted == 0
+    assert Song.objects.get(title="No date").released == first_released
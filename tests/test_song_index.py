@@ -0,0 +1,55 @@
+"""Tests for the in-memory song ID existence index."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from bson import ObjectId
+
+from songs_api.infrastructure import SongIdIndex, SystemResources, UnitOfWork
+from songs_api.models.documents import Song
+
+
+def test_index_load_and_lookup(test_db, sample_songs):
+    """Test that loaded IDs are found with their level and unknown IDs are not."""
+    index = SongIdIndex()
+    index.load()
+
+    assert len(index) == 3
+    assert [index.level_of(song.id) for song in sample_songs] == [13, 9, 13]
+    assert ObjectId() not in index
+
+
+def test_index_handles_ids_with_trailing_zero_bytes():
+    """Test exact matching for IDs whose binary form ends in NUL bytes."""
+    song_id = ObjectId(b"abcdefghij\x00\x00")
+    index = SongIdIndex()
+    index.add([(song_id, 7)])
+    index.add([(ObjectId(), 1) for _ in range(10000)])
+
+    assert index.level_of(song_id) == 7
+    assert ObjectId(b"abcdefghij\x00\x01") not in index
+
+
+def test_exists_falls_back_to_mongo_and_learns(test_db, sample_songs):
+    """Test that index misses are checked in MongoDB and remembered."""
+    index = SongIdIndex()
+    with UnitOfWork(SystemResources(song_index=index)) as uow:
+        song_id = sample_songs[0].id
+        assert song_id not in index
+        assert uow.songs_repository.exists(str(song_id)) is True
+        assert index.level_of(song_id) == 13
+
+        assert uow.songs_repository.exists(str(ObjectId())) is False
+        assert uow.songs_repository.exists("not-an-id") is False
+
+
+def test_bulk_insert_updates_index(test_db):
+    """Test that songs inserted through the repository are known without a reload."""
+    index = SongIdIndex()
+    songs = [Song(artist="A", title=f"T{i}", difficulty=1.0, level=1, released=date(2020, 1, 1)) for i in range(3)]
+
+    with UnitOfWork(SystemResources(song_index=index)) as uow:
+        uow.songs_repository.bulk_insert(songs)
+
+    assert all(song.id in index for song in songs)
@@ -1,3 +1,10 @@
+from datetime import date
+
+from songs_api.constants import SongSort
+from songs_api.models.documents import Song
+from songs_api.repositories import SongListQuery, SongsRepository
+
+
 def test_list_songs_empty(client, auth_headers):
     """Test listing songs when database is empty."""
     response = client.get("/api/v1/songs", headers=auth_headers)
@@ -22,3 +29,68 @@ def test_list_songs_requires_auth(client):
     """Test that listing songs requires authentication."""
     response = client.get("/api/v1/songs")
     assert response.status_code == 401
+
+
+def test_list_songs_filter_by_level_sorted_by_difficulty(client, auth_headers, sample_songs):
+    """Test level filter uses difficulty as the natural sort order."""
+    response = client.get("/api/v1/songs?level=13&sort=-difficulty", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [song["difficulty"] for song in data["data"]] == [15.0, 14.6]
+    assert data["pagination"]["total"] == 2
+
+
+def test_list_songs_filter_by_level_and_difficulty_range(client, auth_headers, sample_songs):
+    """Test difficulty range combined with level."""
+    response = client.get("/api/v1/songs?level=13&difficulty_max=14.9", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data["data"]) == 1
+    assert data["data"][0]["title"] == "Lycanthropic Metamorphosis"
+
+
+def test_list_songs_filter_by_artist_and_release_range(client, auth_headers, sample_songs):
+    """Test artist filter with release date range sorted by release date."""
+    response = client.get(
+        "/api/v1/songs?artist=The%20Yousicians&released_from=2009-01-01&sort=released",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [song["title"] for song in data["data"]] == ["A New Kennel", "Lycanthropic Metamorphosis"]
+
+
+def test_list_songs_rejects_unindexed_shape(client, auth_headers, sample_songs):
+    """Test that filter/sort combinations without a backing index are rejected."""
+    response = client.get("/api/v1/songs?difficulty_min=10", headers=auth_headers)
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/songs?level=13&sort=released", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_list_songs_rejects_inverted_range(client, auth_headers, sample_songs):
+    """Test that an inverted difficulty range is a validation error."""
+    response = client.get("/api/v1/songs?level=13&difficulty_min=15&difficulty_max=10", headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_list_songs_pages_ties_in_id_order(client, auth_headers, test_db):
+    """Test that songs with equal sort values page by `_id`, in the sort's direction, without repeats."""
+    songs = [Song(artist="Tie", title=f"Tie {n}", difficulty=7.0, level=5, released=date(2020, 1, 1)) for n in range(4)]
+    Song.objects.insert(songs)
+    ids = [str(song.id) for song in sorted(songs, key=lambda song: song.id)]
+
+    def pages(sort: str) -> list[str]:
+        ids = []
+        for page in range(1, 5):
+            response = client.get(f"/api/v1/songs?level=5&sort={sort}&page={page}&page_size=1", headers=auth_headers)
+            ids.append(response.get_json()["data"][0]["id"])
+        return ids
+
+    assert pages("difficulty") == ids
+    assert pages("-difficulty") == ids[::-1]
+    assert SongsRepository.plan_list_query(SongListQuery(level=5, sort=SongSort.DIFFICULTY_DESC)) == (
+        ("-difficulty", "-id"),
+        "level_1_difficulty_1__id_1",
+    )
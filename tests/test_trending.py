@@ -0,0 +1,70 @@
+"""Tests for time-bucketed rating rollups and trending songs."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from songs_api.constants import TrendingWindow
+from songs_api.models.documents import Rating, RatingRollup
+from songs_api.repositories import RatingsRepository
+
+
+def test_trending_songs_by_recent_ratings(client, auth_headers, sample_songs):
+    """Test that songs are ranked by how many ratings they got in the current window."""
+    ratings = [(sample_songs[2], 4), (sample_songs[2], 2), (sample_songs[0], 5)]
+    response = client.post(
+        "/api/v1/songs/ratings/batch",
+        json={"ratings": [{"song_id": str(song.id), "rating": rating} for song, rating in ratings]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    for window in ("hour", "day"):
+        response = client.get(f"/api/v1/songs/trending?window={window}", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["window"] == window
+        assert [entry["song"]["id"] for entry in data["songs"]] == [str(sample_songs[2].id), str(sample_songs[0].id)]
+        assert data["songs"][0]["ratings"] == 2
+        assert data["songs"][0]["average"] == 3
+
+
+def test_ratings_record_created_at_and_rollups(test_db, sample_songs):
+    """Test that a rating is timestamped and counted in its hourly and daily buckets."""
+    song_id = str(sample_songs[0].id)
+
+    RatingsRepository().add_rating(song_id=song_id, rating=4)
+
+    assert Rating.objects(song_id=song_id).first().created_at is not None
+    rollups = {rollup.window: rollup for rollup in RatingRollup.objects(song_id=song_id)}
+    assert set(rollups) == {"hour", "day"}
+    assert (rollups["hour"].count, rollups["hour"].sum) == (1, 4)
+    assert rollups["day"].expires_at > rollups["hour"].expires_at
+
+
+def test_trending_weights_previous_bucket_by_overlap(test_db):
+    """Test that the previous bucket counts only for the part still inside the sliding window."""
+    # Buckets are stored as naive UTC, like MongoDB returns them. Recent, so the TTL keeps them.
+    current = datetime.now(UTC).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    previous = current - timedelta(hours=1)
+    now = (current + timedelta(minutes=15)).replace(tzinfo=UTC)
+    expires_at = current + timedelta(days=2)
+    for song_id, bucket, count in [("steady", previous, 8), ("steady", current, 1), ("rising", current, 6)]:
+        RatingRollup(
+            song_id=song_id, window="hour", bucket=bucket, count=count, sum=4 * count, expires_at=expires_at
+        ).save()
+
+    trending = RatingsRepository().trending(TrendingWindow.HOUR, limit=10, now=now)
+
+    assert [(item["song_id"], item["ratings"]) for item in trending] == [("steady", 7.0), ("rising", 6.0)]
+
+
+def test_trending_invalid_window(client, auth_headers):
+    """Test that an unknown window is rejected."""
+    assert client.get("/api/v1/songs/trending?window=week", headers=auth_headers).status_code == 422
+
+
+def test_trending_requires_auth(client):
+    """Test that trending songs require authentication."""
+    assert client.get("/api/v1/songs/trending").status_code == 401
@@ -2,7 +2,14 @@
 
 from __future__ import annotations
 
+from types import SimpleNamespace
+
+from pymongo.server_type import SERVER_TYPE
+from pymongo.topology_description import TOPOLOGY_TYPE
+
 from songs_api.infrastructure import SystemResources, UnitOfWork
+from songs_api.infrastructure.database import TransactionSupport
+from songs_api.models.documents import Rating
 from songs_api.repositories import RatingsRepository, SongsRepository, UsersRepository
 
 
@@ -126,6 +133,18 @@ def test_ratings_repository_add_rating(test_db, sample_songs):
     assert stats.max == 4
 
 
+def test_ratings_repository_add_rating_returns_post_update_stats(test_db, sample_songs):
+    """Test that each add_rating returns the stats after its own update."""
+    repo = RatingsRepository()
+    song_id = str(sample_songs[0].id)
+
+    repo.add_rating(song_id=song_id, rating=2)
+    stats = repo.add_rating(song_id=song_id, rating=5)
+
+    assert (stats.count, stats.sum, stats.min, stats.max) == (2, 7, 2, 5)
+    assert Rating.objects(song_id=song_id).count() == 2
+
+
 def test_ratings_repository_get_stats(test_db, sample_songs):
     """Test RatingsRepository.get_rating_stats method directly."""
     repo = RatingsRepository()
@@ -153,3 +172,70 @@ def test_users_repository_create_and_get(test_db, password_factory):
     assert found_user is not None
     assert found_user.username == "newuser"
     assert found_user.check_password(password)
+
+
+class _CountingClient:
+    """Answers `hello` like a single-node replica set and counts the round trips."""
+
+    def __init__(self):
+        self.hello_calls = 0
+        self.admin = self
+
+    def command(self, name):
+        self.hello_calls += 1
+        return {"setName": "rs0", "logicalSessionTimeoutMinutes": 30}
+
+
+def _topology_changed(topology_type, session_timeout=30, server_type=SERVER_TYPE.Standalone):
+    server = SimpleNamespace(server_type=server_type, logical_session_timeout_minutes=session_timeout)
+    description = SimpleNamespace(
+        topology_type=topology_type,
+        logical_session_timeout_minutes=session_timeout,
+        server_descriptions=lambda: {("localhost", 27017): server},
+    )
+    return SimpleNamespace(new_description=description)
+
+
+def test_transaction_support_is_probed_once_per_process():
+    """Test that the topology probe result is cached instead of sent with every unit of work."""
+    support = TransactionSupport()
+    client = _CountingClient()
+
+    assert support.supported(client) is True
+    assert support.supported(client) is True
+    assert client.hello_calls == 1
+
+
+def test_transaction_support_follows_topology_events():
+    """Test that SDAM topology changes update the cached answer without a probe."""
+    support = TransactionSupport()
+    client = _CountingClient()
+
+    support.description_changed(_topology_changed(TOPOLOGY_TYPE.Single))
+    assert support.supported(client) is False
+
+    support.description_changed(_topology_changed(TOPOLOGY_TYPE.ReplicaSetWithPrimary))
+    assert support.supported(client) is True
+    assert client.hello_calls == 0
+
+    support.description_changed(_topology_changed(TOPOLOGY_TYPE.ReplicaSetNoPrimary))
+    assert support.supported(client) is True
+    assert client.hello_calls == 1
+
+
+def test_direct_connection_to_a_primary_supports_transactions():
+    """Test that a directConnection to a replica set primary or mongos is not taken for a standalone."""
+    support = TransactionSupport()
+    client = _CountingClient()
+
+    support.description_changed(_topology_changed(TOPOLOGY_TYPE.Single, server_type=SERVER_TYPE.RSPrimary))
+    assert support.supported(client) is True
+    support.description_changed(_topology_changed(TOPOLOGY_TYPE.Single, server_type=SERVER_TYPE.Mongos))
+    assert support.supported(client) is True
+    support.description_changed(_topology_changed(TOPOLOGY_TYPE.Single, server_type=SERVER_TYPE.RSSecondary))
+    assert support.supported(client) is False
+    assert client.hello_calls == 0
+
+    support.description_changed(_topology_changed(TOPOLOGY_TYPE.Single, server_type=SERVER_TYPE.Unknown))
+    assert support.supported(client) is True
+    assert client.hello_calls == 1